@@ -0,0 +1,112 @@
+"""
+Analytics over several days of logs: CSV day files versus Parquet archives.
+
+Each query loads a week of logs and keeps the error rows of one hour per day,
+first from the CSV files (pd.read_csv plus a timestamp conversion, which is
+what `read_logs_from_date` costs per day) and then from the archives written
+by `BBLogger.compact_logs`, which only read the projected columns and row
+groups that match the predicates.
+
+Usage: python benchmarks/bench_archive.py [--days 7] [--rows-per-day 200000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from bench_utils import LOG_COLUMNS, print_results, synthetic_rows, timed
+from brainboost_configuration_package.BBConfig import BBConfig
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+from brainboost_data_source_logger_package.LogArchive import LogArchive
+
+FIRST_DAY = datetime(2024, 1, 1)
+QUERY_COLUMNS = ['timestamp', 'log_type', 'processing_time']
+
+
+def write_day_files(log_path: str, prefix: str, days: int, rows_per_day: int) -> list:
+    step_ms = max(1, int(86_400_000 / rows_per_day))
+    paths = []
+    for day in range(days):
+        start = FIRST_DAY + timedelta(days=day)
+        path = os.path.join(log_path, f"{prefix}_log_{start.strftime('%Y_%m_%d')}.log")
+        with open(path, 'w', encoding='utf-8', newline='') as log_file:
+            writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(LOG_COLUMNS)
+            writer.writerows(synthetic_rows(rows_per_day, start=start, step_ms=step_ms, seed=day))
+        paths.append(path)
+    return paths
+
+
+def csv_query(paths: list) -> int:
+    matches = 0
+    for day, path in enumerate(paths):
+        start = FIRST_DAY + timedelta(days=day, hours=12)
+        df = pd.read_csv(path, delimiter=',', quotechar="'", encoding='utf-8', header=0)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y%m%d%H%M%S')
+        mask = (df['timestamp'] >= start) & (df['timestamp'] < start + timedelta(hours=1)) & (df['log_type'] == 'error')
+        matches += int(mask.sum())
+    return matches
+
+
+def archive_query(paths: list) -> int:
+    matches = 0
+    for day, path in enumerate(paths):
+        start = FIRST_DAY + timedelta(days=day, hours=12)
+        df = LogArchive.read(
+            LogArchive.archive_path_for(path),
+            columns=QUERY_COLUMNS,
+            start=start,
+            end=start + timedelta(hours=1) - timedelta(seconds=1),
+            filters=[('log_type', '==', 'error')]
+        )
+        matches += len(df)
+    return matches
+
+
+def run(days: int = 7, rows_per_day: int = 200000) -> dict:
+    overrides_backup = BBConfig._overrides.copy()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            BBConfig.override('log_path', tmp_dir)
+            BBConfig.override('log_prefix', 'bench')
+            paths = write_day_files(tmp_dir, 'bench', days, rows_per_day)
+            csv_bytes = sum(os.path.getsize(path) for path in paths)
+            csv_seconds, csv_matches = timed(csv_query, paths)
+            compact_seconds, archives = timed(BBLogger.compact_logs, remove_source=False)
+            archive_bytes = sum(os.path.getsize(path) for path in archives)
+            archive_seconds, archive_matches = timed(archive_query, paths)
+            day_csv_seconds, _ = timed(pd.read_csv, paths[0], delimiter=',', quotechar="'", header=0)
+            day_archive_seconds, _ = timed(BBLogger.read_logs_from_date, FIRST_DAY.strftime('%Y%m%d'))
+        finally:
+            BBConfig._overrides = overrides_backup
+            BBLogger.invalidate_config()
+    assert csv_matches == archive_matches
+    return {
+        'days': days,
+        'rows_per_day': rows_per_day,
+        'matching_rows': archive_matches,
+        'csv_mb': csv_bytes / 1e6,
+        'archive_mb': archive_bytes / 1e6,
+        'compact_ms': compact_seconds * 1000,
+        'csv_query_ms': csv_seconds * 1000,
+        'archive_query_ms': archive_seconds * 1000,
+        'query_speedup': csv_seconds / archive_seconds,
+        'read_day_csv_ms': day_csv_seconds * 1000,
+        'read_day_archive_ms': day_archive_seconds * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--rows-per-day', type=int, default=200000)
+    args = parser.parse_args()
+    print_results(run(days=args.days, rows_per_day=args.rows_per_day))
+
+
+if __name__ == '__main__':
+    main()
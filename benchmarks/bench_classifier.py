@@ -0,0 +1,63 @@
+"""
+Cost of classifying a message's log level.
+
+Compares the legacy classifier (two regexes compiled inside nested functions
+on every call) with LogClassifier's single precompiled pattern, for short and
+very long messages, with and without keywords. An explicit level skips
+classification altogether, so it costs nothing here.
+
+Usage: python benchmarks/bench_classifier.py [--calls 20000] [--long-length 100000]
+"""
+
+import argparse
+import re
+
+from bench_utils import print_results, random_message, timed
+from brainboost_data_source_logger_package.LogClassifier import DEFAULT_CLASSIFIER
+
+
+def legacy_classify(message: str) -> str:
+    def is_error_message(message):
+        error_pattern = re.compile(r'\b(error|errors|exception|exceptions|failed|missing)\b', re.IGNORECASE)
+        return bool(error_pattern.search(message))
+
+    def is_warning_message(message):
+        warning_pattern = re.compile(r'\b(warning|aware|careful)\b', re.IGNORECASE)
+        return bool(warning_pattern.search(message))
+
+    return 'error' if is_error_message(message) else 'warning' if is_warning_message(message) else 'message'
+
+
+def _loop(classify, message: str, calls: int) -> None:
+    for _ in range(calls):
+        classify(message)
+
+
+def run(calls: int = 20000, long_length: int = 100000) -> dict:
+    messages = {
+        'short_plain': 'user 42 opened the dashboard',
+        'short_error': 'request failed with status 500',
+        'long_plain': random_message(long_length).replace('error', 'e r r o r'),
+        'long_warning_at_end': random_message(long_length) + ' careful',
+    }
+    results = {'calls': calls, 'long_length': long_length}
+    for name, message in messages.items():
+        iterations = calls if name.startswith('short') else max(1, calls // 100)
+        assert legacy_classify(message) == DEFAULT_CLASSIFIER.classify(message)
+        legacy_seconds, _ = timed(_loop, legacy_classify, message, iterations)
+        current_seconds, _ = timed(_loop, DEFAULT_CLASSIFIER.classify, message, iterations)
+        results[f'{name}_legacy_us'] = legacy_seconds / iterations * 1e6
+        results[f'{name}_classifier_us'] = current_seconds / iterations * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--long-length', type=int, default=100000)
+    args = parser.parse_args()
+    print_results(run(calls=args.calls, long_length=args.long_length))
+
+
+if __name__ == '__main__':
+    main()
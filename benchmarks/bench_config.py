@@ -0,0 +1,64 @@
+"""
+Per-call cost of resolving BBLogger configuration.
+
+Compares the fields `log()` needs on every call read through `_get_config`
+(a `BBConfig.get` per key plus `_normalize_bool`) against the same fields read
+from the cached `LoggerSettings` snapshot.
+
+Usage: python benchmarks/bench_config.py [--calls 100000]
+"""
+
+import argparse
+
+from bench_utils import print_results, timed
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+HOT_KEYS = (
+    'log_debug_mode',
+    'log_enable_files',
+    'log_enable_terminal_output',
+    'log_enable_database',
+    'log_async',
+    'log_delimiter',
+    'log_columns',
+)
+BOOL_KEYS = {key for key in HOT_KEYS if isinstance(BBLogger._default_config[key], bool)}
+
+
+def resolve_with_get_config(calls: int) -> None:
+    for _ in range(calls):
+        for key in HOT_KEYS:
+            value = BBLogger._get_config(key)
+            if key in BOOL_KEYS:
+                BBLogger._normalize_bool(value)
+
+
+def resolve_with_snapshot(calls: int) -> None:
+    for _ in range(calls):
+        settings = BBLogger._get_settings()
+        for key in HOT_KEYS:
+            getattr(settings, key)
+
+
+def run(calls: int = 100000) -> dict:
+    BBLogger.invalidate_config()
+    get_config_seconds, _ = timed(resolve_with_get_config, calls)
+    snapshot_seconds, _ = timed(resolve_with_snapshot, calls)
+    return {
+        'calls': calls,
+        'keys_per_call': len(HOT_KEYS),
+        'get_config_ns_per_call': get_config_seconds / calls * 1e9,
+        'snapshot_ns_per_call': snapshot_seconds / calls * 1e9,
+        'speedup': get_config_seconds / snapshot_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+    print_results(run(calls=args.calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Event-loop lag while coroutines log continuously, with BBLogger.log() versus await BBLogger.alog().
+
+`--tasks` coroutines each log `--burst` messages, then yield, for `--seconds`,
+with the file and SQLite sinks enabled. A monitor task sleeps `--tick-ms` at a
+time and records how late it wakes up; that lateness is the time the loop spent
+stuck in logging calls. Two modes are compared:
+
+- sync: `BBLogger.log()` called from the coroutines, writing on the loop thread.
+- alog: `await BBLogger.alog()`, which only builds the entry on the loop and
+  leaves the I/O to the writer thread.
+
+Usage: python benchmarks/bench_event_loop_lag.py [--seconds 3] [--tasks 4] [--burst 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from bench_utils import config_overrides, print_results, random_message
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def monitor(stop: asyncio.Event, tick: float, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, time.perf_counter() - started - tick))
+
+
+async def producer(mode: str, stop: asyncio.Event, burst: int, message: str, counter: list) -> None:
+    while not stop.is_set():
+        for _ in range(burst):
+            if mode == 'alog':
+                await BBLogger.alog(message)
+            else:
+                BBLogger.log(message)
+        counter[0] += burst
+        await asyncio.sleep(0)
+
+
+async def run_mode(mode: str, seconds: float, tasks: int, burst: int, tick: float, message: str) -> dict:
+    stop = asyncio.Event()
+    lags, counter = [], [0]
+    workers = [asyncio.ensure_future(monitor(stop, tick, lags))]
+    workers += [asyncio.ensure_future(producer(mode, stop, burst, message, counter)) for _ in range(tasks)]
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*workers)
+    logging_seconds = time.perf_counter() - started
+    await asyncio.get_running_loop().run_in_executor(None, BBLogger.flush)
+    total_seconds = time.perf_counter() - started
+    return {
+        'lag_p50_ms': statistics.median(lags) * 1000,
+        'lag_p99_ms': percentile(lags, 0.99) * 1000,
+        'lag_max_ms': max(lags) * 1000,
+        'ticks': len(lags),
+        'logged': counter[0],
+        'logged_per_second': counter[0] / logging_seconds,
+        'written_per_second': counter[0] / total_seconds,
+    }
+
+
+def run(seconds: float = 3.0, tasks: int = 4, burst: int = 20, tick_ms: float = 1.0, message_bytes: int = 200) -> dict:
+    message = random_message(message_bytes)
+    results = {'seconds': seconds, 'tasks': tasks, 'burst': burst, 'tick_ms': tick_ms}
+    for mode in ('sync', 'alog'):
+        with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+            log_path=tmp_dir, log_sqlite3_path=os.path.join(tmp_dir, 'bench.sqlite3'),
+            log_enable_terminal_output=False, log_enable_files=True, log_enable_database=True,
+            log_async=False,
+        ):
+            results[mode] = asyncio.run(run_mode(mode, seconds, tasks, burst, tick_ms / 1000.0, message))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--tasks', type=int, default=4)
+    parser.add_argument('--burst', type=int, default=20)
+    parser.add_argument('--tick-ms', type=float, default=1.0)
+    parser.add_argument('--message-bytes', type=int, default=200)
+    args = parser.parse_args()
+    print_results(run(seconds=args.seconds, tasks=args.tasks, burst=args.burst, tick_ms=args.tick_ms,
+                      message_bytes=args.message_bytes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Lines/sec of the legacy open-per-message CSV path versus LogFileSink.
+
+The legacy path stats the directory and file, opens the log with 'a+', builds a
+new csv.writer and closes the file for every line, which is what
+`BBLogger._write_to_log_file` did before the sink existed.
+
+Usage: python benchmarks/bench_file_sink.py [--rows 20000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+
+from bench_utils import LOG_COLUMNS, print_results, synthetic_rows, timed
+from brainboost_data_source_logger_package.LogFileSink import LogFileSink
+
+
+def legacy_write(log_file_path: str, rows) -> None:
+    log_path = os.path.dirname(log_file_path)
+    for row in rows:
+        if log_path and not os.path.exists(log_path):
+            os.makedirs(log_path, exist_ok=True)
+        file_exists = os.path.isfile(log_file_path)
+        with open(log_file_path, 'a+', encoding='utf-8', newline='') as log_file:
+            writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+            if not file_exists:
+                writer.writerow(LOG_COLUMNS)
+            writer.writerow(row)
+
+
+def sink_write(log_file_path: str, rows, flush_policy: str) -> None:
+    sink = LogFileSink(LOG_COLUMNS, flush_policy=flush_policy, flush_every=100, flush_interval_ms=100)
+    for row in rows:
+        sink.write(log_file_path, row, row[1])
+    sink.close()
+
+
+def run(rows: int = 20000) -> dict:
+    data = list(synthetic_rows(rows))
+    results = {'rows': rows}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_seconds, _ = timed(legacy_write, os.path.join(tmp_dir, 'legacy.log'), data)
+        results['legacy_lines_per_sec'] = rows / legacy_seconds
+        for policy in LogFileSink.FLUSH_POLICIES:
+            seconds, _ = timed(sink_write, os.path.join(tmp_dir, f'sink_{policy}.log'), data, policy)
+            results[f'sink_{policy}_lines_per_sec'] = rows / seconds
+            results[f'sink_{policy}_speedup'] = legacy_seconds / seconds
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+    print_results(run(rows=args.rows))
+
+
+if __name__ == '__main__':
+    main()
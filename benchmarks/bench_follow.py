@@ -0,0 +1,115 @@
+"""
+Cost of watching a growing log: dashboard polling against BBLogger.follow.
+
+poll_cost: a day file of `--rows` rows grows by `--batch` rows per step. Each
+step is read either the dashboard way (get_total_amount_of_pages, then get_page
+on the last page) or with one LogFollower.read_new() call. Reported per step,
+for two file sizes, to show that follow's cost tracks the new rows, not the file.
+
+latency: a writer thread logs one entry every `--period-ms` while follow()
+consumes them, with inotify and with polling. Reported: delivery latency
+(p50/max) and the CPU time the process spent per delivered entry.
+
+Usage: python benchmarks/bench_follow.py [--rows 1000000] [--batch 100]
+"""
+
+import argparse
+import csv
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from bench_utils import LOG_COLUMNS, config_overrides, print_results, synthetic_rows
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+QUIET = {'log_enable_terminal_output': False, 'log_enable_files': False, 'log_enable_database': False}
+
+
+def append_rows(path: str, rows) -> None:
+    with open(path, 'a', encoding='utf-8', newline='') as log_file:
+        csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL).writerows(rows)
+
+
+def poll_cost(rows: int, batch: int, steps: int) -> dict:
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(log_path=tmp_dir, log_prefix='bench', **QUIET):
+        path = BBLogger._get_log_file_path(day.strftime('%Y_%m_%d'))
+        append_rows(path, [LOG_COLUMNS])
+        append_rows(path, synthetic_rows(rows, start=day, step_ms=1))
+        BBLogger.get_total_amount_of_pages()
+        follower = BBLogger._get_follower(None, from_start=False)
+        new_rows = synthetic_rows(steps * batch, start=day.replace(hour=23), step_ms=1, seed=2)
+        dashboard, follow = [], []
+        for _ in range(steps):
+            append_rows(path, [next(new_rows) for _ in range(batch)])
+            started = time.perf_counter()
+            BBLogger.get_page(BBLogger.get_total_amount_of_pages())
+            dashboard.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            received = follower.read_new()
+            follow.append(time.perf_counter() - started)
+            assert len(received) == batch
+        follower.close()
+    results['dashboard_ms_per_step'] = statistics.mean(dashboard) * 1000
+    results['follow_ms_per_step'] = statistics.mean(follow) * 1000
+    return results
+
+
+def latency(inotify: bool, entries: int, period_ms: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+        log_path=tmp_dir, log_prefix='bench', log_follow_inotify=inotify,
+        **{**QUIET, 'log_enable_files': True}
+    ):
+        BBLogger.log("start")
+        sent = {}
+
+        def write():
+            time.sleep(0.1)
+            for i in range(entries):
+                sent[f"entry {i}"] = time.perf_counter()
+                BBLogger.log(f"entry {i}")
+                time.sleep(period_ms / 1000.0)
+
+        writer = threading.Thread(target=write)
+        cpu_started = time.process_time()
+        writer.start()
+        delays = []
+        for entry in BBLogger.follow(timeout=5):
+            delays.append(time.perf_counter() - sent[entry['message']])
+            if len(delays) == entries:
+                break
+        writer.join()
+        cpu = time.process_time() - cpu_started
+    return {
+        'latency_p50_ms': statistics.median(delays) * 1000,
+        'latency_max_ms': max(delays) * 1000,
+        'cpu_ms_per_entry': cpu / entries * 1000,
+    }
+
+
+def run(rows: int = 1_000_000, batch: int = 100, steps: int = 20, entries: int = 50, period_ms: int = 100) -> dict:
+    results = {'rows': rows, 'batch': batch}
+    for size in (rows // 10, rows):
+        results[f'poll_cost.{size}_rows'] = poll_cost(size, batch, steps)
+    for name, inotify in (('inotify', True), ('polling', False)):
+        results[f'latency.{name}'] = latency(inotify, entries, period_ms)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--entries', type=int, default=50)
+    parser.add_argument('--period-ms', type=int, default=100)
+    args = parser.parse_args()
+    print_results(run(rows=args.rows, batch=args.batch, steps=args.steps, entries=args.entries,
+                      period_ms=args.period_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Memory per queued BBLogEntry and formatting cost, against the previous dict-backed entry.
+
+`legacy` reproduces the former entry: attributes in an instance dict, and a new
+StringIO/csv.writer plus a BBConfig lookup on every str(). Each entry is
+formatted `--sinks` times (terminal line, Slack/Telegram text, webhook JSON),
+as when several sinks and notifications handle the same entry.
+
+Usage: python benchmarks/bench_log_entry.py [--entries 100000] [--sinks 3]
+"""
+
+import argparse
+import csv
+import gc
+import io
+import json
+import time
+import tracemalloc
+
+from bench_utils import print_results, random_message
+from brainboost_configuration_package.BBConfig import BBConfig
+from brainboost_data_source_logger_package.BBLogEntry import BBLogEntry
+
+
+class LegacyBBLogEntry:
+    def __init__(self, process, timestamp, log_type, message, processing_time, code_location, config=None):
+        self.timestamp = timestamp
+        self.log_type = log_type
+        self.process = process
+        self.code_location = code_location
+        self.message = message
+        self.processing_time = processing_time
+        self.config = config
+
+    def __str__(self):
+        output = io.StringIO()
+        try:
+            delimiter = BBConfig.get('log_delimiter')
+        except Exception:
+            delimiter = ','
+        writer = csv.writer(output, delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_ALL)
+        writer.writerow([self.timestamp, self.log_type, self.process, self.code_location, self.message,
+                         self.processing_time])
+        return output.getvalue().strip()
+
+
+def make_entries(entry_class, count: int, messages: list, **kwargs) -> list:
+    return [
+        entry_class('worker_1', '20240101120000', 'message', messages[i % len(messages)], '0.000123',
+                    'service.py:42', **kwargs)
+        for i in range(count)
+    ]
+
+
+def measure_memory(entry_class, count: int, messages: list, **kwargs) -> float:
+    gc.collect()
+    tracemalloc.start()
+    entries = make_entries(entry_class, count, messages, **kwargs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return size / count
+
+
+def measure_formatting(entries: list, sinks: int, legacy: bool) -> float:
+    started = time.perf_counter()
+    for entry in entries:
+        for _ in range(sinks):
+            str(entry)
+            json.dumps(entry.__dict__) if legacy else entry.to_json()
+    return (time.perf_counter() - started) / len(entries) * 1e6
+
+
+def run(entries: int = 100000, sinks: int = 3, message_bytes: int = 100) -> dict:
+    # Messages are shared between entries so the figures are the entries' own overhead.
+    messages = [random_message(message_bytes) for _ in range(100)]
+    results = {'entries': entries, 'sinks': sinks}
+    for name, entry_class, kwargs in (('legacy', LegacyBBLogEntry, {}), ('slotted', BBLogEntry, {'delimiter': ','})):
+        bytes_per_entry = measure_memory(entry_class, entries, messages, **kwargs)
+        format_us = measure_formatting(make_entries(entry_class, entries, messages, **kwargs), sinks,
+                                       name == 'legacy')
+        results[name] = {'bytes_per_entry': bytes_per_entry, 'format_us_per_entry': format_us}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--sinks', type=int, default=3)
+    parser.add_argument('--message-bytes', type=int, default=100)
+    args = parser.parse_args()
+    print_results(run(entries=args.entries, sinks=args.sinks, message_bytes=args.message_bytes))
+
+
+if __name__ == '__main__':
+    main()
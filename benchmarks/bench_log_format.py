@@ -0,0 +1,80 @@
+"""
+Write and parse throughput of the 'csv' and 'jsonl' log formats.
+
+For each format, `--rows` entries are logged to the file sink (plain messages,
+then multi-line messages with quotes and commas, each with two extra fields in
+the 'jsonl' run) and the day is read back with read_logs_from_date, iter_logs
+and the last get_page. The JSON encoder in use (orjson or the standard library)
+is reported with the results.
+
+Usage: python benchmarks/bench_log_format.py [--rows 50000] [--message-bytes 100]
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+from bench_utils import config_overrides, print_results, random_message
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+from brainboost_data_source_logger_package.LogJson import LogJson
+
+
+def run_format(log_format: str, rows: int, message: str) -> dict:
+    fields = {'request_id': 'abc123', 'attempt': 2} if log_format == 'jsonl' else {}
+    day = datetime.now().strftime('%Y%m%d')
+    with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+        log_path=tmp_dir, log_prefix='bench', log_format=log_format, log_enable_files=True,
+        log_enable_terminal_output=False, log_enable_database=False, log_file_flush_policy='count',
+        log_page_size=100,
+    ):
+        started = time.perf_counter()
+        for _ in range(rows):
+            BBLogger.log(message, **fields)
+        BBLogger.flush()
+        write_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        frame = BBLogger.read_logs_from_date(day)
+        read_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        streamed = sum(1 for _ in BBLogger.iter_logs(day + '000000', day + '235959'))
+        iter_seconds = time.perf_counter() - started
+
+        last_page = BBLogger.get_total_amount_of_pages()
+        started = time.perf_counter()
+        BBLogger.get_page(last_page)
+        page_seconds = time.perf_counter() - started
+        BBLogger.shutdown()
+    assert len(frame) == rows and streamed == rows
+    return {
+        'write_lines_per_sec': rows / write_seconds,
+        'read_logs_from_date_rows_per_sec': rows / read_seconds,
+        'iter_logs_rows_per_sec': rows / iter_seconds,
+        'get_last_page_ms': page_seconds * 1000,
+    }
+
+
+def run(rows: int = 50000, message_bytes: int = 100) -> dict:
+    messages = {
+        'plain': random_message(message_bytes),
+        'multiline_quoted': f"{random_message(message_bytes // 2)}\n'quoted', \"double\",\n{random_message(10)}",
+    }
+    results = {'rows': rows, 'json_encoder': LogJson.ENCODER}
+    for name, message in messages.items():
+        for log_format in ('csv', 'jsonl'):
+            results[f'{log_format}.{name}'] = run_format(log_format, rows, message)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--message-bytes', type=int, default=100)
+    args = parser.parse_args()
+    print_results(run(rows=args.rows, message_bytes=args.message_bytes))
+
+
+if __name__ == '__main__':
+    main()
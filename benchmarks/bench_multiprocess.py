@@ -0,0 +1,102 @@
+"""
+Aggregate file-logging throughput of 1-32 forked worker processes.
+
+Every worker calls BBLogger.log() `--rows` times with `--message-bytes` long
+messages, writing either to one shared day file or, with
+`log_file_sharding`, to its own shard. After each run the day is read back
+through `read_logs_from_date`, which merges shards in timestamp order, and
+checked for lost rows, torn rows and extra header rows.
+
+Usage: python benchmarks/bench_multiprocess.py [--processes 1,2,4,8,16,32] [--rows 5000]
+"""
+
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from bench_utils import LOG_COLUMNS, print_results, random_message
+from brainboost_configuration_package.BBConfig import BBConfig
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+
+def worker(rows: int, message: str, start_event) -> None:
+    start_event.wait()
+    for i in range(rows):
+        BBLogger.log(f"{i} {message}")
+    BBLogger.flush()
+
+
+def check_files(log_path: str, expected_rows: int) -> dict:
+    rows = headers = torn = 0
+    for path in glob.glob(os.path.join(log_path, '*.log')):
+        with open(path, 'r', encoding='utf-8', newline='') as log_file:
+            for row in csv.reader(log_file, delimiter=',', quotechar="'"):
+                if row == LOG_COLUMNS:
+                    headers += 1
+                elif len(row) != len(LOG_COLUMNS):
+                    torn += 1
+                else:
+                    rows += 1
+    merged = len(BBLogger.read_logs_from_date(datetime.now().strftime('%Y%m%d')))
+    return {'rows': rows, 'merged_rows': merged, 'lost_rows': expected_rows - rows, 'torn_rows': torn,
+            'header_rows': headers}
+
+
+def run_once(processes: int, rows: int, message_bytes: int, sharding: bool) -> dict:
+    context = multiprocessing.get_context('fork')
+    message = random_message(message_bytes)
+    overrides_backup = BBConfig._overrides.copy()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            for key, value in (('log_path', tmp_dir), ('log_prefix', 'bench'), ('log_enable_files', True),
+                               ('log_enable_terminal_output', False), ('log_enable_database', False),
+                               ('log_file_flush_policy', 'line'), ('log_file_sharding', sharding)):
+                BBConfig.override(key, value)
+            start_event = context.Event()
+            workers = [context.Process(target=worker, args=(rows, message, start_event)) for _ in range(processes)]
+            for process in workers:
+                process.start()
+            started = time.perf_counter()
+            start_event.set()
+            for process in workers:
+                process.join()
+            elapsed = time.perf_counter() - started
+            result = check_files(tmp_dir, processes * rows)
+        finally:
+            BBConfig._overrides = overrides_backup
+            BBLogger.invalidate_config()
+    result.update({
+        'processes': processes,
+        'mode': 'sharded' if sharding else 'shared',
+        'seconds': elapsed,
+        'rows_per_second': processes * rows / elapsed,
+    })
+    return result
+
+
+def run(processes=(1, 2, 4, 8, 16, 32), rows: int = 5000, message_bytes: int = 1024) -> dict:
+    results = [
+        run_once(count, rows, message_bytes, sharding)
+        for count in processes
+        for sharding in (False, True)
+    ]
+    return {'rows_per_process': rows, 'message_bytes': message_bytes, 'runs': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', default='1,2,4,8,16,32')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--message-bytes', type=int, default=1024)
+    args = parser.parse_args()
+    processes = [int(value) for value in args.processes.split(',')]
+    print_results(run(processes=processes, rows=args.rows, message_bytes=args.message_bytes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Latency added to BBLogger.log() by URL notifications, and delivered alerts/sec.
+
+A local stub webhook answers every POST after `--delay-ms`. Three modes are
+compared on a burst of `--alerts` log(url_notification=True) calls:
+
+- legacy: a module-level requests.post per alert on the logging thread, as
+  `log()` did before the notification dispatcher.
+- sync: `log_notification_async` off; the dispatcher still reuses a pooled
+  session and applies timeouts/retries, but delivers on the logging thread.
+- async: the default; alerts are queued and coalesced into batched messages.
+
+Usage: python benchmarks/bench_notifications.py [--alerts 200] [--delay-ms 50]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from bench_utils import print_results
+from brainboost_configuration_package.BBConfig import BBConfig
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+
+class StubHookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.delay)
+        self.server.requests += 1
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(delay: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHookHandler)
+    server.delay = delay
+    server.requests = 0
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_mode(mode: str, alerts: int, url: str) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(alerts):
+        call_started = time.perf_counter()
+        if mode == 'legacy':
+            BBLogger.log(f"alert {i}")
+            requests.post(url, json={'message': f"alert {i}"})
+        else:
+            BBLogger.log(f"alert {i}", url_notification=True)
+        latencies.append(time.perf_counter() - call_started)
+    BBLogger.flush()
+    elapsed = time.perf_counter() - started
+    return {
+        'log_p50_ms': statistics.median(latencies) * 1000,
+        'log_p99_ms': percentile(latencies, 0.99) * 1000,
+        'log_max_ms': max(latencies) * 1000,
+        'delivered_alerts_per_second': alerts / elapsed,
+    }
+
+
+def run(alerts: int = 200, delay_ms: int = 50, batch_interval_ms: int = 100) -> dict:
+    server = start_stub(delay_ms / 1000.0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+    overrides_backup = BBConfig._overrides.copy()
+    results = {'alerts': alerts, 'delay_ms': delay_ms, 'batch_interval_ms': batch_interval_ms}
+    try:
+        for key, value in (('log_enable_terminal_output', False), ('log_enable_files', False),
+                           ('log_enable_database', False), ('log_notification_url', url),
+                           ('log_notification_rate_limit', 0),
+                           ('log_notification_batch_interval_ms', batch_interval_ms)):
+            BBConfig.override(key, value)
+        for mode in ('legacy', 'sync', 'async'):
+            BBConfig.override('log_notification_async', mode == 'async')
+            requests_before = server.requests
+            result = run_mode(mode, alerts, url)
+            result['http_requests'] = server.requests - requests_before
+            results[mode] = result
+            BBLogger.shutdown()
+    finally:
+        BBConfig._overrides = overrides_backup
+        BBLogger.invalidate_config()
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=200)
+    parser.add_argument('--delay-ms', type=int, default=50)
+    parser.add_argument('--batch-interval-ms', type=int, default=100)
+    args = parser.parse_args()
+    print_results(run(alerts=args.alerts, delay_ms=args.delay_ms, batch_interval_ms=args.batch_interval_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Scaling of get_logs_between_timestampt_and_timestampt with `log_read_workers`.
+
+`--days` synthetic day files of `--rows-per-day` rows are written, and a range
+covering all of them except the first and last hour is read with 1 (serial) to
+16 workers, for both `log_read_executor` values. Each point reports the warm
+read time (pool already started; best of `--repeat`) and the speedup over the
+serial read; `startup_ms` is the extra time of the first read, which starts
+the pool. Scaling is bounded by the cores available, reported as `cpus`.
+
+Usage: python benchmarks/bench_parallel_read.py [--days 30] [--rows-per-day 50000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from bench_utils import LOG_COLUMNS, config_overrides, print_results, synthetic_rows, timed
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+QUIET = {'log_enable_terminal_output': False, 'log_enable_files': False, 'log_enable_database': False}
+WORKERS = (1, 2, 4, 8, 16)
+
+
+def write_days(tmp_dir: str, first_day: datetime, days: int, rows_per_day: int) -> None:
+    step_ms = max(1, int(86_400_000 / rows_per_day))
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        path = os.path.join(tmp_dir, f"bench_log_{day.strftime('%Y_%m_%d')}.log")
+        with open(path, 'w', encoding='utf-8', newline='') as log_file:
+            writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(LOG_COLUMNS)
+            writer.writerows(synthetic_rows(rows_per_day, start=day, step_ms=step_ms, seed=offset))
+
+
+def measure(t1: str, t2: str, workers: int, executor: str, repeat: int) -> dict:
+    with config_overrides(log_read_workers=workers, log_read_executor=executor):
+        try:
+            first, df = timed(BBLogger.get_logs_between_timestampt_and_timestampt, t1, t2)
+            warm = min(timed(BBLogger.get_logs_between_timestampt_and_timestampt, t1, t2)[0]
+                       for _ in range(repeat))
+        finally:
+            BBLogger.shutdown()
+    return {'ms': warm * 1000, 'startup_ms': max(0.0, first - warm) * 1000, 'rows': len(df)}
+
+
+def run(days: int = 30, rows_per_day: int = 50000, repeat: int = 3) -> dict:
+    first_day = datetime(2024, 1, 1)
+    t1 = first_day.replace(hour=1).strftime('%Y%m%d%H%M%S')
+    t2 = (first_day + timedelta(days=days - 1)).replace(hour=23).strftime('%Y%m%d%H%M%S')
+    results = {'days': days, 'rows': days * rows_per_day, 'cpus': os.cpu_count()}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_days(tmp_dir, first_day, days, rows_per_day)
+        with config_overrides(log_path=tmp_dir, log_prefix='bench', **QUIET):
+            # Builds the day indexes, so every configuration reads the same warm files.
+            serial = measure(t1, t2, 1, 'process', repeat)
+            results['serial'] = serial
+            for executor in ('process', 'thread'):
+                for workers in WORKERS[1:]:
+                    point = measure(t1, t2, workers, executor, repeat)
+                    assert point['rows'] == serial['rows']
+                    point['speedup'] = serial['ms'] / point['ms']
+                    results[f'{executor}.{workers}'] = point
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--rows-per-day', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print_results(run(days=args.days, rows_per_day=args.rows_per_day, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Latency of a short timestamp-range query over a large day file.
+
+The legacy path reads the whole day with pd.read_csv, converts every timestamp
+and then masks, which is what `get_logs_between_timestampt_and_timestampt` did
+before range pruning. The pruned path binary-searches the file's LogIndex for
+t1 and stops at the first row past t2. The first pruned query also builds the
+index; later queries reuse it.
+
+Usage: python benchmarks/bench_range_query.py [--rows 500000] [--window-minutes 5]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from bench_utils import LOG_COLUMNS, print_results, synthetic_rows, timed
+from brainboost_configuration_package.BBConfig import BBConfig
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+DAY = datetime(2024, 1, 1)
+
+
+def write_day_file(log_path: str, prefix: str, rows: int) -> str:
+    step_ms = max(1, int(86_400_000 / rows))
+    path = os.path.join(log_path, f"{prefix}_log_{DAY.strftime('%Y_%m_%d')}.log")
+    with open(path, 'w', encoding='utf-8', newline='') as log_file:
+        writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(LOG_COLUMNS)
+        writer.writerows(synthetic_rows(rows, start=DAY, step_ms=step_ms))
+    return path
+
+
+def legacy_query(path: str, dt1: datetime, dt2: datetime) -> pd.DataFrame:
+    df = pd.read_csv(path, delimiter=',', quotechar="'", encoding='utf-8', header=0)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y%m%d%H%M%S')
+    return df.loc[(df['timestamp'] >= dt1) & (df['timestamp'] <= dt2)].reset_index(drop=True)
+
+
+def run(rows: int = 500000, window_minutes: int = 5) -> dict:
+    dt2 = DAY + timedelta(days=1) - timedelta(seconds=1)
+    dt1 = dt2 - timedelta(minutes=window_minutes)
+    t1, t2 = dt1.strftime('%Y%m%d%H%M%S'), dt2.strftime('%Y%m%d%H%M%S')
+    overrides_backup = BBConfig._overrides.copy()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            BBConfig.override('log_path', tmp_dir)
+            BBConfig.override('log_prefix', 'bench')
+            path = write_day_file(tmp_dir, 'bench', rows)
+            legacy_seconds, legacy_df = timed(legacy_query, path, dt1, dt2)
+            cold_seconds, _ = timed(BBLogger.get_logs_between_timestampt_and_timestampt, t1, t2)
+            warm_seconds, pruned_df = timed(BBLogger.get_logs_between_timestampt_and_timestampt, t1, t2)
+        finally:
+            BBConfig._overrides = overrides_backup
+            BBLogger.invalidate_config()
+    assert len(legacy_df) == len(pruned_df)
+    return {
+        'rows': rows,
+        'window_minutes': window_minutes,
+        'matching_rows': len(pruned_df),
+        'legacy_ms': legacy_seconds * 1000,
+        'pruned_first_query_ms': cold_seconds * 1000,
+        'pruned_ms': warm_seconds * 1000,
+        'speedup': legacy_seconds / warm_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--window-minutes', type=int, default=5)
+    args = parser.parse_args()
+    print_results(run(rows=args.rows, window_minutes=args.window_minutes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Read API latency with the 'files' and 'sqlite' `log_read_backend`, on one large day.
+
+The same `--rows` synthetic rows for today are written to a CSV day file and,
+through SQLiteLogSink (which maintains the day counters and rowid marks), to
+the `logs` table. Each read API is then timed against both backends:
+
+- pages: get_total_amount_of_pages (file index vs `log_days` counter).
+- get_page_ms.{first,middle,last}: one page (file index seek vs `log_marks` keyset).
+- range_ms.middle: get_logs_in_range for 1000 rows in the middle of the day.
+- between_ms.1h: get_logs_between_timestampt_and_timestampt over one hour.
+- filtered_ms.1h: iter_logs over one hour with log_type and process filters.
+
+The default is the 10M-row day the SQLite backend targets; building it takes
+several minutes and a few GB of disk, so use --rows for a quick run.
+
+Usage: python benchmarks/bench_read_backends.py [--rows 10000000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_utils import LOG_COLUMNS, config_overrides, print_results, synthetic_rows, timed
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+from brainboost_data_source_logger_package.SQLiteLogSink import SQLiteLogSink
+
+QUIET = {'log_enable_terminal_output': False, 'log_enable_files': False, 'log_enable_database': False}
+
+
+def build_stores(tmp_dir: str, rows: int, day: datetime) -> dict:
+    step_ms = max(1, int(86_400_000 / rows))
+    csv_path = os.path.join(tmp_dir, f"bench_log_{day.strftime('%Y_%m_%d')}.log")
+    db_path = os.path.join(tmp_dir, 'bench.sqlite3')
+    started = time.perf_counter()
+    with open(csv_path, 'w', encoding='utf-8', newline='') as log_file:
+        writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(LOG_COLUMNS)
+        writer.writerows(synthetic_rows(rows, start=day, step_ms=step_ms))
+    csv_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sink = SQLiteLogSink(db_path, LOG_COLUMNS, batch_size=50000, flush_interval_ms=0, synchronous='OFF')
+    for row in synthetic_rows(rows, start=day, step_ms=step_ms):
+        sink.write(row)
+    sink.close()
+    db_seconds = time.perf_counter() - started
+    return {
+        'db_path': db_path,
+        'build_s.files': csv_seconds,
+        'build_s.sqlite': db_seconds,
+        'size_mb.files': os.path.getsize(csv_path) / 1e6,
+        'size_mb.sqlite': os.path.getsize(db_path) / 1e6,
+    }
+
+
+def measure(day: datetime) -> dict:
+    results = {}
+    date = day.strftime('%Y_%m_%d')
+    # The file index is built by the first read; time it separately from the warm reads.
+    seconds, pages = timed(BBLogger.get_total_amount_of_pages)
+    results['pages_ms.first_call'] = seconds * 1000
+    seconds, pages = timed(BBLogger.get_total_amount_of_pages)
+    results['pages_ms'] = seconds * 1000
+    for name, page in (('first', 1), ('middle', max(1, pages // 2)), ('last', pages)):
+        seconds, _ = timed(BBLogger.get_page, page)
+        results[f'get_page_ms.{name}'] = seconds * 1000
+    total_rows = pages * BBLogger._get_settings().log_page_size
+    middle = max(1, total_rows // 2)
+    seconds, _ = timed(BBLogger.get_logs_in_range, date, middle, middle + 999)
+    results['range_ms.middle'] = seconds * 1000
+
+    t1 = day.replace(hour=12).strftime('%Y%m%d%H%M%S')
+    t2 = (day.replace(hour=13) - timedelta(seconds=1)).strftime('%Y%m%d%H%M%S')
+    seconds, df = timed(BBLogger.get_logs_between_timestampt_and_timestampt, t1, t2)
+    results['between_ms.1h'] = seconds * 1000
+    results['between_rows.1h'] = len(df)
+    filters = {'log_type': 'error', 'process': ['worker_1', 'worker_2']}
+    seconds, entries = timed(lambda: list(BBLogger.iter_logs(t1, t2, filters=filters)))
+    results['filtered_ms.1h'] = seconds * 1000
+    results['filtered_rows.1h'] = len(entries)
+    return results
+
+
+def run(rows: int = 10_000_000, page_size: int = 100) -> dict:
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    results = {'rows': rows, 'page_size': page_size}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stores = build_stores(tmp_dir, rows, day)
+        results.update({key: value for key, value in stores.items() if key != 'db_path'})
+        for backend in ('files', 'sqlite'):
+            with config_overrides(log_path=tmp_dir, log_prefix='bench', log_sqlite3_path=stores['db_path'],
+                                  log_page_size=page_size, log_read_backend=backend, **QUIET):
+                results[backend] = measure(day)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--page-size', type=int, default=100)
+    args = parser.parse_args()
+    print_results(run(rows=args.rows, page_size=args.page_size))
+
+
+if __name__ == '__main__':
+    main()
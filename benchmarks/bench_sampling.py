@@ -0,0 +1,64 @@
+"""
+Cost of log() in a hot loop with each `log_sampling` mode, and how many lines reach the file.
+
+A single call site logs `--calls` plain messages to the file sink. `off` writes
+every one; the sampled modes decide before the entry is built, so a suppressed
+call only pays for the frame lookup and the per-site counter. `every_n_1` keeps
+every entry and so measures the overhead of the sampling check itself.
+
+Usage: python benchmarks/bench_sampling.py [--calls 50000]
+"""
+
+import argparse
+import tempfile
+import time
+
+from bench_utils import config_overrides, print_results, random_message
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+MODES = {
+    'off': {},
+    'every_n_1': {'log_sampling': 'every_n', 'log_sampling_every_n': 1},
+    'every_n_100': {'log_sampling': 'every_n', 'log_sampling_every_n': 100},
+    'probability_1pct': {'log_sampling': 'probability', 'log_sampling_probability': 0.01},
+    'token_bucket_100': {'log_sampling': 'token_bucket', 'log_sampling_rate_per_s': 100.0,
+                         'log_sampling_burst': 100},
+}
+
+
+def run_mode(values: dict, calls: int, message: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+        log_path=tmp_dir, log_enable_files=True, log_enable_terminal_output=False, log_enable_database=False,
+        **values
+    ):
+        started = time.perf_counter()
+        for _ in range(calls):
+            BBLogger.log(message)
+        elapsed = time.perf_counter() - started
+        BBLogger.flush()
+        lines = sum(BBLogger._count_file_rows(path) for path in BBLogger._open_log_files())
+        BBLogger.shutdown()
+    return {
+        'log_us': elapsed / calls * 1e6,
+        'calls_per_second': calls / elapsed,
+        'lines_written': lines,
+    }
+
+
+def run(calls: int = 50000) -> dict:
+    message = random_message(100)
+    results = {'calls': calls}
+    for name, values in MODES.items():
+        results[name] = run_mode(values, calls, message)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+    print_results(run(calls=args.calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+BBLogger.search against a full scan, over a month of logs.
+
+`--days` day files of `--rows-per-day` synthetic rows are written, and every
+`--needle-every`-th message mentions "checkout timeout". The same query runs as:
+
+- full_scan: read_logs_from_date for every day and a case-insensitive
+  `str.contains` in pandas, as callers had to do before search().
+- files_cold: search() with no sidecar index yet, so it indexes the month first.
+- files_warm: search() again; only rows appended since are indexed.
+- sqlite: search() with `log_read_backend` 'sqlite', on a `logs` table whose
+  FTS5 index was maintained at insert time (`log_search_index`).
+
+Usage: python benchmarks/bench_search.py [--days 30] [--rows-per-day 100000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from bench_utils import LOG_COLUMNS, config_overrides, print_results, synthetic_rows, timed
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+from brainboost_data_source_logger_package.SQLiteLogSink import SQLiteLogSink
+
+QUIET = {'log_enable_terminal_output': False, 'log_enable_files': False, 'log_enable_database': False}
+NEEDLE = 'checkout timeout'
+
+
+def day_rows(day: datetime, rows: int, needle_every: int):
+    step_ms = max(1, int(86_400_000 / rows))
+    for i, row in enumerate(synthetic_rows(rows, start=day, step_ms=step_ms, seed=day.toordinal())):
+        if i % needle_every == 0:
+            row[4] = f"{NEEDLE} after {i % 7} retries for order {i}"
+        yield row
+
+
+def build(tmp_dir: str, first_day: datetime, days: int, rows_per_day: int, needle_every: int) -> dict:
+    db_path = os.path.join(tmp_dir, 'bench.sqlite3')
+    sink = SQLiteLogSink(db_path, LOG_COLUMNS, batch_size=50000, flush_interval_ms=0, synchronous='OFF',
+                         search_index=True)
+    started = time.perf_counter()
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        path = os.path.join(tmp_dir, f"bench_log_{day.strftime('%Y_%m_%d')}.log")
+        with open(path, 'w', encoding='utf-8', newline='') as log_file:
+            writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(LOG_COLUMNS)
+            for row in day_rows(day, rows_per_day, needle_every):
+                writer.writerow(row)
+                sink.write(row)
+    sink.close()
+    return {'db_path': db_path, 'build_s': time.perf_counter() - started}
+
+
+def full_scan(first_day: datetime, days: int) -> int:
+    matches = []
+    for offset in range(days):
+        df = BBLogger.read_logs_from_date((first_day + timedelta(days=offset)).strftime('%Y%m%d'))
+        matches.append(df[df['message'].str.contains(NEEDLE, case=False, regex=False, na=False)])
+    return len(pd.concat(matches))
+
+
+def run(days: int = 30, rows_per_day: int = 100000, needle_every: int = 10000, page_size: int = 100) -> dict:
+    first_day = datetime(2024, 1, 1)
+    t1 = first_day.strftime('%Y%m%d%H%M%S')
+    t2 = (first_day + timedelta(days=days) - timedelta(seconds=1)).strftime('%Y%m%d%H%M%S')
+    results = {'days': days, 'rows': days * rows_per_day, 'page_size': page_size}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        built = build(tmp_dir, first_day, days, rows_per_day, needle_every)
+        results['build_s'] = built['build_s']
+        with config_overrides(log_path=tmp_dir, log_prefix='bench', log_sqlite3_path=built['db_path'],
+                              log_page_size=page_size, **QUIET):
+            seconds, matches = timed(full_scan, first_day, days)
+            results['full_scan'] = {'ms': seconds * 1000, 'matches': matches}
+            for name in ('files_cold', 'files_warm'):
+                seconds, df = timed(BBLogger.search, NEEDLE, t1, t2)
+                results[name] = {'ms': seconds * 1000, 'first_page_rows': len(df)}
+            with config_overrides(log_read_backend='sqlite'):
+                seconds, df = timed(BBLogger.search, NEEDLE, t1, t2)
+                results['sqlite'] = {'ms': seconds * 1000, 'first_page_rows': len(df)}
+    for name in ('files_warm', 'sqlite'):
+        results[name]['speedup_vs_full_scan'] = results['full_scan']['ms'] / results[name]['ms']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--rows-per-day', type=int, default=100000)
+    parser.add_argument('--needle-every', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=100)
+    args = parser.parse_args()
+    print_results(run(days=args.days, rows_per_day=args.rows_per_day, needle_every=args.needle_every,
+                      page_size=args.page_size))
+
+
+if __name__ == '__main__':
+    main()
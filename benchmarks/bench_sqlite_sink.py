@@ -0,0 +1,65 @@
+"""
+Rows/sec of the legacy per-row SQLite path versus the batched SQLiteLogSink.
+
+The legacy path opens a connection, inserts one row, commits and closes for every
+log line, which is what `BBLogger._write_to_database` did before the sink existed.
+
+Usage: python benchmarks/bench_sqlite_sink.py [--rows 5000] [--batch-size 100]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+
+from bench_utils import LOG_COLUMNS, print_results, synthetic_rows, timed
+from brainboost_data_source_logger_package.SQLiteLogSink import SQLiteLogSink
+
+
+def legacy_insert(db_path: str, rows) -> None:
+    columns_str = ", ".join([f"{col} TEXT" for col in LOG_COLUMNS])
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS logs ({columns_str});")
+    conn.commit()
+    conn.close()
+    insert_sql = f"INSERT INTO logs ({', '.join(LOG_COLUMNS)}) VALUES ({', '.join(['?' for _ in LOG_COLUMNS])});"
+    for row in rows:
+        conn = sqlite3.connect(db_path)
+        conn.execute(insert_sql, row)
+        conn.commit()
+        conn.close()
+
+
+def sink_insert(db_path: str, rows, batch_size: int, synchronous: str) -> None:
+    sink = SQLiteLogSink(db_path, LOG_COLUMNS, batch_size=batch_size, flush_interval_ms=0, synchronous=synchronous)
+    for row in rows:
+        sink.write(row)
+    sink.close()
+
+
+def run(rows: int = 5000, batch_size: int = 100, synchronous: str = 'NORMAL') -> dict:
+    data = list(synthetic_rows(rows))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_seconds, _ = timed(legacy_insert, os.path.join(tmp_dir, 'legacy.sqlite3'), data)
+        sink_seconds, _ = timed(sink_insert, os.path.join(tmp_dir, 'sink.sqlite3'), data, batch_size, synchronous)
+    return {
+        'rows': rows,
+        'batch_size': batch_size,
+        'synchronous': synchronous,
+        'legacy_rows_per_sec': rows / legacy_seconds,
+        'sink_rows_per_sec': rows / sink_seconds,
+        'speedup': legacy_seconds / sink_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--synchronous', default='NORMAL')
+    args = parser.parse_args()
+    print_results(run(rows=args.rows, batch_size=args.batch_size, synchronous=args.synchronous))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+BBLogger.stats rollups against grouping the raw logs in pandas.
+
+write_us_per_entry: BBLogger.log to a file, with and without `log_metrics`,
+for `--entries` entries.
+
+queries: `--days` day files of `--rows-per-day` synthetic rows are written,
+and the same rows are recorded in the rollups with LogMetrics. Two questions
+are then answered both ways, over the whole period minus its first and last
+hour (so the minute and hour rollups are used at the edges):
+
+- errors_per_minute_per_process: error counts by minute and process.
+- top_code_locations: the 10 code_locations with the most entries.
+
+stats also reports p50_p99_by_process, processing_time percentiles per process
+from the sketches (no pandas counterpart is timed).
+
+pandas: get_logs_between_timestampt_and_timestampt then groupby, as callers
+had to do before stats(). stats: BBLogger.stats with `log_metrics` on.
+
+Usage: python benchmarks/bench_stats.py [--days 30] [--rows-per-day 50000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_utils import LOG_COLUMNS, config_overrides, print_results, synthetic_rows, timed
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+from brainboost_data_source_logger_package.LogMetrics import LogMetrics
+
+QUIET = {'log_enable_terminal_output': False, 'log_enable_files': False, 'log_enable_database': False}
+
+
+def write_cost(entries: int) -> dict:
+    results = {}
+    for name, enabled in (('files', False), ('files+metrics', True)):
+        with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+            log_path=tmp_dir, log_prefix='bench', log_metrics=enabled, **{**QUIET, 'log_enable_files': True}
+        ):
+            started = time.perf_counter()
+            for i in range(entries):
+                BBLogger.log(f"request {i} served")
+            BBLogger.flush()
+            results[name] = (time.perf_counter() - started) / entries * 1e6
+    return results
+
+
+def build(tmp_dir: str, first_day: datetime, days: int, rows_per_day: int) -> float:
+    metrics = LogMetrics(os.path.join(tmp_dir, 'bench_metrics.sqlite3'), flush_interval_ms=60000)
+    step_ms = max(1, int(86_400_000 / rows_per_day))
+    started = time.perf_counter()
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        path = os.path.join(tmp_dir, f"bench_log_{day.strftime('%Y_%m_%d')}.log")
+        with open(path, 'w', encoding='utf-8', newline='') as log_file:
+            writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(LOG_COLUMNS)
+            for row in synthetic_rows(rows_per_day, start=day, step_ms=step_ms, seed=offset):
+                writer.writerow(row)
+                metrics.record(row[0], row[1], row[2], row[3], row[5])
+        metrics.flush()
+    metrics.close()
+    return time.perf_counter() - started
+
+
+def with_pandas(t1: str, t2: str) -> dict:
+    df = BBLogger.get_logs_between_timestampt_and_timestampt(t1, t2)
+    errors = df[df['log_type'] == 'error']
+    per_minute = errors.groupby([errors['timestamp'].dt.floor('min'), 'process']).size()
+    top = df['code_location'].value_counts().head(10)
+    return {'errors_per_minute_per_process': per_minute, 'top_code_locations': top}
+
+
+def run(days: int = 30, rows_per_day: int = 50000, entries: int = 20000) -> dict:
+    first_day = datetime(2024, 1, 1)
+    t1 = first_day.replace(hour=1).strftime('%Y%m%d%H%M%S')
+    t2 = (first_day + timedelta(days=days - 1)).replace(hour=22, minute=59, second=59).strftime('%Y%m%d%H%M%S')
+    results = {'days': days, 'rows': days * rows_per_day, 'write_us_per_entry': write_cost(entries)}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results['build_s'] = build(tmp_dir, first_day, days, rows_per_day)
+        with config_overrides(log_path=tmp_dir, log_prefix='bench', log_metrics=True, **QUIET):
+            seconds, expected = timed(with_pandas, t1, t2)
+            results['pandas_ms.both_queries'] = seconds * 1000
+            seconds, per_minute = timed(BBLogger.stats, t1, t2, group_by=['minute', 'process'],
+                                        filters={'log_type': 'error'})
+            results['stats_ms.errors_per_minute_per_process'] = seconds * 1000
+            assert per_minute['count'].sum() == expected['errors_per_minute_per_process'].sum()
+            seconds, top = timed(lambda: BBLogger.stats(t1, t2, group_by='code_location').head(10))
+            results['stats_ms.top_code_locations'] = seconds * 1000
+            assert list(top['count']) == list(expected['top_code_locations'])
+            seconds, _ = timed(BBLogger.stats, t1, t2, group_by='process', percentiles=(50, 99))
+            results['stats_ms.p50_p99_by_process'] = seconds * 1000
+    results['speedup'] = results['pandas_ms.both_queries'] / (
+        results['stats_ms.errors_per_minute_per_process'] + results['stats_ms.top_code_locations']
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--rows-per-day', type=int, default=50000)
+    parser.add_argument('--entries', type=int, default=20000)
+    args = parser.parse_args()
+    print_results(run(days=args.days, rows_per_day=args.rows_per_day, entries=args.entries))
+
+
+if __name__ == '__main__':
+    main()
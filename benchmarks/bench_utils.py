@@ -0,0 +1,71 @@
+"""
+Shared helpers for the standalone benchmark scripts in this directory.
+
+Every script can be run directly from the repository root, e.g.
+`python benchmarks/bench_sqlite_sink.py`, and prints its results as JSON.
+"""
+
+import json
+import os
+import random
+import string
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+LOG_COLUMNS = ['timestamp', 'log_type', 'process', 'code_location', 'message', 'processing_time']
+LOG_TYPES = ('message', 'message', 'message', 'warning', 'error')
+
+
+def random_message(length: int = 50, rng: random.Random = random) -> str:
+    return ''.join(rng.choices(string.ascii_letters + string.digits + ' ', k=length))
+
+
+def synthetic_rows(count: int, start: datetime = None, step_ms: int = 10, message_length: int = 50, seed: int = 1):
+    """Yield `count` log rows with monotonically increasing timestamps."""
+    rng = random.Random(seed)
+    current = start or datetime(2024, 1, 1)
+    step = timedelta(milliseconds=step_ms)
+    for i in range(count):
+        yield [
+            current.strftime('%Y%m%d%H%M%S'),
+            rng.choice(LOG_TYPES),
+            f"worker_{i % 4}",
+            f"bench.py:{i % 50}",
+            random_message(message_length, rng),
+            f"{rng.random():.6f}",
+        ]
+        current += step
+
+
+def timed(func, *args, **kwargs):
+    """Run `func` once and return (elapsed_seconds, result)."""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def print_results(results: dict) -> None:
+    print(json.dumps(results, indent=2, sort_keys=True))
+
+
+@contextmanager
+def config_overrides(**values):
+    """Apply BBConfig overrides for the duration of a block and restore the previous ones."""
+    from brainboost_configuration_package.BBConfig import BBConfig
+    from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+    overrides_backup = BBConfig._overrides.copy()
+    try:
+        for key, value in values.items():
+            BBConfig.override(key, value)
+        yield
+    finally:
+        BBLogger.shutdown()
+        BBConfig._overrides = overrides_backup
+        BBLogger.invalidate_config()
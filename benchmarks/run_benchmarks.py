@@ -0,0 +1,306 @@
+"""
+Benchmark suite for the BBLogger hot paths, with baseline comparison.
+
+Suites:
+- sinks: log() cost with each sink (none, terminal, files, database, files+database, async files).
+- message_sizes: log() cost to the file sink for 50 B, 1 KiB and 16 KiB messages.
+- classifier: level classification cost for short and long messages.
+- get_page: first, middle and last page of a large day file.
+- range_query: get_logs_between_timestampt_and_timestampt over 1, 7 and 30 synthetic days.
+- threads: aggregate log() throughput from 1, 4 and 16 threads.
+- processes: aggregate log() throughput from 1 and 4 forked processes writing shards.
+
+Every metric records its unit and whether lower or higher is better. Each
+suite runs --repeat times and keeps the best value of every metric to damp
+noise. Results are written as JSON; with --baseline, each metric is compared
+against a saved run and the script exits with status 1 if any got worse by
+more than --tolerance (a fraction, 0.25 = 25%).
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json [--suites sinks,threads] [--quick]
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from bench_utils import LOG_COLUMNS, REPO_ROOT, config_overrides, random_message, synthetic_rows, timed
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+from brainboost_data_source_logger_package.LogClassifier import DEFAULT_CLASSIFIER
+
+QUIET = {'log_enable_terminal_output': False, 'log_enable_files': False, 'log_enable_database': False}
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def per_call_us(calls: int, func, *args) -> float:
+    seconds, _ = timed(lambda: [func(*args) for _ in range(calls)])
+    return seconds / calls * 1e6
+
+
+def write_day_file(path: str, rows: int, day: datetime) -> None:
+    step_ms = max(1, int(86_400_000 / rows))
+    with open(path, 'w', encoding='utf-8', newline='') as log_file:
+        writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(LOG_COLUMNS)
+        writer.writerows(synthetic_rows(rows, start=day, step_ms=step_ms, seed=day.toordinal()))
+
+
+# -- suites ------------------------------------------------------------------------
+
+
+def suite_sinks(scale: float) -> dict:
+    calls = int(20000 * scale)
+    message = random_message(100)
+    variants = {
+        'none': {},
+        'terminal': {'log_enable_terminal_output': True},
+        'files': {'log_enable_files': True},
+        'database': {'log_enable_database': True},
+        'files_database': {'log_enable_files': True, 'log_enable_database': True},
+        'async_files': {'log_enable_files': True, 'log_async': True},
+    }
+    results = {}
+    for name, values in variants.items():
+        with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+            log_path=tmp_dir, log_sqlite3_path=os.path.join(tmp_dir, 'bench.sqlite3'), **{**QUIET, **values}
+        ), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            for _ in range(calls):
+                BBLogger.log(message)
+            log_seconds = time.perf_counter() - started
+            BBLogger.flush()
+            total_seconds = time.perf_counter() - started
+        results[f'log_us.{name}'] = metric(log_seconds / calls * 1e6, 'us/call', 'lower')
+        if name == 'async_files':
+            results[f'log_until_flushed_us.{name}'] = metric(total_seconds / calls * 1e6, 'us/call', 'lower')
+    return results
+
+
+def suite_message_sizes(scale: float) -> dict:
+    calls = int(10000 * scale)
+    results = {}
+    for size in (50, 1024, 16384):
+        message = random_message(size)
+        with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+            log_path=tmp_dir, **{**QUIET, 'log_enable_files': True}
+        ):
+            results[f'log_us.files.{size}B'] = metric(per_call_us(calls, BBLogger.log, message), 'us/call', 'lower')
+    return results
+
+
+def suite_classifier(scale: float) -> dict:
+    calls = int(50000 * scale)
+    messages = {
+        'short_plain': 'user 42 opened the dashboard',
+        'short_error': 'request failed with status 500',
+        'long_plain': random_message(10000),
+    }
+    return {
+        f'classify_us.{name}': metric(per_call_us(calls, DEFAULT_CLASSIFIER.classify, message), 'us/call', 'lower')
+        for name, message in messages.items()
+    }
+
+
+def suite_get_page(scale: float) -> dict:
+    rows = int(200000 * scale)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(log_path=tmp_dir, log_prefix='bench', **QUIET):
+        day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        write_day_file(BBLogger._get_log_file_path(), rows, day)
+        cold_seconds, _ = timed(BBLogger.get_page, 1)
+        results['get_page_ms.first_call'] = metric(cold_seconds * 1000, 'ms', 'lower')
+        last_page = BBLogger.get_total_amount_of_pages()
+        for name, page in (('first', 1), ('middle', max(1, last_page // 2)), ('last', last_page)):
+            seconds, _ = timed(BBLogger.get_page, page)
+            results[f'get_page_ms.{name}'] = metric(seconds * 1000, 'ms', 'lower')
+    return results
+
+
+def suite_range_query(scale: float) -> dict:
+    rows_per_day = int(20000 * scale)
+    first_day = datetime(2024, 1, 1)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(log_path=tmp_dir, log_prefix='bench', **QUIET):
+        for day in range(30):
+            current = first_day + timedelta(days=day)
+            write_day_file(os.path.join(tmp_dir, f"bench_log_{current.strftime('%Y_%m_%d')}.log"), rows_per_day, current)
+        for days in (1, 7, 30):
+            t1 = first_day.strftime('%Y%m%d%H%M%S')
+            t2 = (first_day + timedelta(days=days) - timedelta(seconds=1)).strftime('%Y%m%d%H%M%S')
+            seconds, df = timed(BBLogger.get_logs_between_timestampt_and_timestampt, t1, t2)
+            results[f'range_query_ms.{days}d'] = metric(seconds * 1000, 'ms', 'lower')
+            results[f'range_query_rows_per_sec.{days}d'] = metric(len(df) / seconds, 'rows/s', 'higher')
+    return results
+
+
+def suite_threads(scale: float) -> dict:
+    calls = int(20000 * scale)
+    message = random_message(100)
+    results = {}
+    for threads in (1, 4, 16):
+        per_thread = max(1, calls // threads)
+        with tempfile.TemporaryDirectory() as tmp_dir, config_overrides(
+            log_path=tmp_dir, **{**QUIET, 'log_enable_files': True}
+        ):
+            barrier = threading.Barrier(threads + 1)
+
+            def worker():
+                barrier.wait()
+                for _ in range(per_thread):
+                    BBLogger.log(message)
+
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            for thread in workers:
+                thread.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for thread in workers:
+                thread.join()
+            BBLogger.flush()
+            elapsed = time.perf_counter() - started
+        results[f'threads_lines_per_sec.{threads}'] = metric(per_thread * threads / elapsed, 'lines/s', 'higher')
+    return results
+
+
+def suite_processes(scale: float) -> dict:
+    if not hasattr(os, 'fork'):
+        return {}
+    import bench_multiprocess
+    rows = int(5000 * scale)
+    return {
+        f'processes_lines_per_sec.{processes}': metric(
+            bench_multiprocess.run_once(processes, rows, 100, sharding=True)['rows_per_second'], 'lines/s', 'higher'
+        )
+        for processes in (1, 4)
+    }
+
+
+SUITES = {
+    'sinks': suite_sinks,
+    'message_sizes': suite_message_sizes,
+    'classifier': suite_classifier,
+    'get_page': suite_get_page,
+    'range_query': suite_range_query,
+    'threads': suite_threads,
+    'processes': suite_processes,
+}
+
+
+# -- running and comparing ---------------------------------------------------------
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def best_of(runs: list) -> dict:
+    """Merge repeated runs of a suite, keeping the best value of every metric."""
+    best = {}
+    for metrics in runs:
+        for name, result in metrics.items():
+            previous = best.get(name)
+            if previous is None:
+                best[name] = result
+            elif (result['value'] < previous['value']) == (result['better'] == 'lower'):
+                best[name] = result
+    return best
+
+
+def run(suites=None, scale: float = 1.0, repeat: int = 3) -> dict:
+    results = {}
+    for name in suites or SUITES:
+        print(f"running {name}...", file=sys.stderr)
+        results[name] = best_of([SUITES[name](scale) for _ in range(max(1, repeat))])
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'scale': scale,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Return one row per metric present in both runs: (suite, metric, baseline, current, change, regressed).
+    `change` is positive when the metric got worse.
+    """
+    rows = []
+    for suite, metrics in current['results'].items():
+        for name, result in metrics.items():
+            previous = baseline.get('results', {}).get(suite, {}).get(name)
+            if not previous or not previous['value']:
+                continue
+            ratio = result['value'] / previous['value']
+            if result['better'] == 'lower':
+                change = ratio - 1
+            else:
+                change = 1 / ratio - 1 if ratio else float('inf')
+            rows.append((suite, name, previous['value'], result['value'], change, change > tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--suites', default=','.join(SUITES), help='Comma-separated suites to run.')
+    parser.add_argument('--quick', action='store_true', help='Run every suite at a tenth of its size.')
+    parser.add_argument('--output', help='Write the results JSON to this file.')
+    parser.add_argument('--save-baseline', help='Write the results JSON as the new baseline.')
+    parser.add_argument('--baseline', help='Compare against this baseline JSON.')
+    parser.add_argument('--repeat', type=int, default=3, help='Run every suite this many times and keep the best.')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    suites = [name.strip() for name in args.suites.split(',') if name.strip()]
+    unknown = [name for name in suites if name not in SUITES]
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(unknown)}. Expected any of {', '.join(SUITES)}.")
+
+    results = run(suites, scale=0.1 if args.quick else 1.0, repeat=args.repeat)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+    if not args.baseline:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    for suite, name, previous, value, change, regressed in rows:
+        flag = 'REGRESSION' if regressed else 'ok'
+        verdict = f"{change:.1%} worse" if change > 0 else f"{-change:.1%} better"
+        print(f"{flag:<10} {suite}/{name}: {previous:.4g} -> {value:.4g} ({verdict})")
+    regressions = [row for row in rows if row[5]]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Optional
+
+from brainboost_data_source_logger_package.BBLogger import BBLogger
+
+
+class AsyncBBLogger:
+    """
+    asyncio front end for BBLogger. Entries are built on the event loop; the file,
+    database and notification I/O is done by BBLogger's writer thread with `log_async`,
+    and in the loop's default executor otherwise. flush and shutdown wait in the
+    default executor too.
+    """
+
+    @classmethod
+    async def log(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+                  level: Optional[str] = None, **fields):
+        """
+        Log a message. Its level is inferred from keywords unless `level` is given;
+        extra keyword arguments are stored as structured fields.
+        """
+        await BBLogger._alog(message, level, telegram, slack, url_notification, 3, fields)
+
+    @classmethod
+    async def error(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+                    **fields):
+        """
+        Log a message as an error without scanning it for keywords.
+        """
+        await BBLogger._alog(message, 'error', telegram, slack, url_notification, 3, fields)
+
+    @classmethod
+    async def warning(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+                      **fields):
+        """
+        Log a message as a warning without scanning it for keywords.
+        """
+        await BBLogger._alog(message, 'warning', telegram, slack, url_notification, 3, fields)
+
+    @classmethod
+    async def follow(cls, filters: Optional[dict] = None, from_start: bool = False,
+                     timeout: Optional[float] = None):
+        """
+        Yield the entries appended to today's log files as they are written. See BBLogger.follow.
+        """
+        async for entry in BBLogger.afollow(filters, from_start, timeout):
+            yield entry
+
+    @classmethod
+    async def flush(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Wait, without blocking the event loop, until every queued entry has been written
+        and pending notifications have been sent. See BBLogger.flush.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, BBLogger.flush, timeout)
+
+    @classmethod
+    async def shutdown(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Drain the queue, stop the writer thread and close the sinks without blocking the
+        event loop. See BBLogger.shutdown.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, BBLogger.shutdown, timeout)
@@ -0,0 +1,160 @@
+import threading
+from collections import deque
+
+
+class AsyncLogWriter:
+    """
+    Bounded in-memory queue drained by a dedicated writer thread.
+
+    Producers call `submit()` and return immediately; the writer thread hands
+    every queued item to `handler`. When the queue is full the configured
+    backpressure policy decides what happens:
+
+    - 'block': the producer waits until the writer frees a slot.
+    - 'drop_oldest': the oldest queued item is discarded to make room.
+    - 'drop_newest': the item being submitted is discarded.
+    """
+
+    BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+    def __init__(self, handler, max_size: int = 10000, backpressure: str = 'block', name: str = 'BBLoggerWriter'):
+        backpressure = str(backpressure or 'block').lower()
+        if backpressure not in self.BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Invalid backpressure policy: {backpressure}. Expected one of {', '.join(self.BACKPRESSURE_POLICIES)}."
+            )
+        self._handler = handler
+        self._max_size = max(1, int(max_size))
+        self._backpressure = backpressure
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        return self.dropped_oldest + self.dropped_newest
+
+    @property
+    def backpressure(self) -> str:
+        return self._backpressure
+
+    def submit(self, item, block: bool = True) -> bool:
+        """
+        Queue an item for the writer thread.
+
+        :param block: With the 'block' policy and a full queue, return False instead of
+                      waiting; the item is then neither queued nor counted as dropped.
+        :return: True if the item was queued, False if it was dropped (or not queued).
+        """
+        if threading.current_thread() is self._thread:
+            # Logging from inside a sink must not wait on its own queue.
+            self._handle(item)
+            return True
+
+        with self._lock:
+            if self._closed:
+                self.dropped_newest += 1
+                return False
+            if len(self._queue) >= self._max_size:
+                if self._backpressure == 'drop_newest':
+                    self.dropped_newest += 1
+                    return False
+                if self._backpressure == 'drop_oldest':
+                    self._queue.popleft()
+                    self.dropped_oldest += 1
+                elif not block:
+                    return False
+                else:
+                    while len(self._queue) >= self._max_size and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        self.dropped_newest += 1
+                        return False
+            self._queue.append(item)
+            self.enqueued += 1
+            self._not_empty.notify()
+            return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued item has been handed to the handler.
+
+        :return: True if the queue drained, False if the timeout expired first.
+        """
+        if threading.current_thread() is self._thread:
+            return True
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Drain the queue and stop the writer thread.
+
+        :return: True if the writer thread exited within the timeout.
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'failed': self.failed,
+                'dropped_oldest': self.dropped_oldest,
+                'dropped_newest': self.dropped_newest,
+                'dropped': self.dropped,
+                'pending': len(self._queue) + self._in_flight,
+            }
+
+    def _handle(self, item) -> bool:
+        try:
+            self._handler(item)
+            return True
+        except Exception as e:
+            print(f"Failed to write queued log entry: {e}")
+            return False
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._not_empty.wait()
+                if not self._queue:
+                    self._idle.notify_all()
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                self._in_flight = len(batch)
+                self._not_full.notify_all()
+
+            failed = 0
+            for item in batch:
+                if not self._handle(item):
+                    failed += 1
+
+            with self._lock:
+                self.written += len(batch) - failed
+                self.failed += failed
+                self._in_flight = 0
+                if not self._queue:
+                    self._idle.notify_all()
@@ -1,12 +1,21 @@
 # BBLogEntry.py
 
-import csv
-import io
-import json
 from brainboost_configuration_package.BBConfig import BBConfig
+from brainboost_data_source_logger_package.LogJson import LogJson
 
 class BBLogEntry:
-    def __init__(self, process, timestamp, log_type, message, processing_time, code_location,config=None):
+    """
+    A single log record. Entries are built once by BBLogger and then only read by the
+    sinks, so the fields live in slots and every serialization (terminal line, JSON)
+    is computed on first use and reused by every sink and notification that needs it.
+    `fields` holds the extra key/value pairs passed to `log(..., **fields)`.
+    """
+
+    __slots__ = ('timestamp', 'log_type', 'process', 'code_location', 'message', 'processing_time', 'config',
+                 'delimiter', 'fields', '_line', '_json')
+
+    def __init__(self, process, timestamp, log_type, message, processing_time, code_location, config=None,
+                 delimiter=None, fields=None):
         self.timestamp = timestamp
         self.log_type = log_type
         self.process = process
@@ -14,22 +23,47 @@ class BBLogEntry:
         self.message = message
         self.processing_time = processing_time
         self.config = config
+        self.delimiter = delimiter
+        self.fields = fields
+        self._line = None
+        self._json = None
+
+    @property
+    def row(self) -> tuple:
+        """The values in log column order: timestamp, log_type, process, code_location, message, processing_time."""
+        return (self.timestamp, self.log_type, self.process, self.code_location, self.message, self.processing_time)
+
+    def to_dict(self) -> dict:
+        """The log columns followed by the extra fields, as written to JSON Lines files and URL notifications."""
+        record = {
+            'timestamp': self.timestamp,
+            'log_type': self.log_type,
+            'process': self.process,
+            'code_location': self.code_location,
+            'message': self.message,
+            'processing_time': self.processing_time
+        }
+        if self.fields:
+            for key, value in self.fields.items():
+                # Extra fields never shadow the log columns.
+                record.setdefault(key, value)
+        return record
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = LogJson.dumps(self.to_dict())
+        return self._json
 
     def __str__(self):
-        # Use csv module to handle proper escaping
-        output = io.StringIO()
-        try:
-            delimiter = BBConfig.get('log_delimiter')
-        except Exception:
-            delimiter = ','
-        writer = csv.writer(output, delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_ALL)
-
-        writer.writerow([
-            self.timestamp,
-            self.log_type,
-            self.process,
-            self.code_location,
-            self.message,
-            self.processing_time
-        ])
-        return output.getvalue().strip()
+        if self._line is None:
+            delimiter = self.delimiter
+            if delimiter is None:
+                try:
+                    delimiter = BBConfig.get('log_delimiter')
+                except Exception:
+                    delimiter = ','
+            # Same output as csv.writer with QUOTE_ALL: every field quoted, quotes doubled.
+            self._line = delimiter.join(
+                '"' + ('' if value is None else str(value)).replace('"', '""') + '"' for value in self.row
+            )
+        return self._line
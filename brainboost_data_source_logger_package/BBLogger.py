@@ -1,14 +1,37 @@
+import asyncio
+import atexit
+import contextvars
 import os
 import sys
+import threading
+import time
 import traceback
-import re
-from typing import Optional
-import csv
+from concurrent.futures import BrokenExecutor
+from contextlib import closing
+from functools import partial
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
 import requests
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
 from brainboost_data_source_logger_package.Notifications import Notifications
+from brainboost_data_source_logger_package.NotificationDispatcher import NotificationDispatcher
+from brainboost_data_source_logger_package.AsyncLogWriter import AsyncLogWriter
+from brainboost_data_source_logger_package.SQLiteLogSink import SQLiteLogSink
+from brainboost_data_source_logger_package.SQLiteLogReader import SQLiteLogReader
+from brainboost_data_source_logger_package.LogFileSink import LogFileSink
+from brainboost_data_source_logger_package.LogIndex import LogIndex
+from brainboost_data_source_logger_package.LogReader import LogReader
+from brainboost_data_source_logger_package.LogArchive import LogArchive
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+from brainboost_data_source_logger_package.LogSampler import LogSampler
+from brainboost_data_source_logger_package.LogSearchIndex import LogSearchIndex
+from brainboost_data_source_logger_package.LogMetrics import LogMetrics
+from brainboost_data_source_logger_package.LogFollower import LogFollower
+from brainboost_data_source_logger_package.ParallelLogReader import ParallelLogReader
+from brainboost_data_source_logger_package.LoggerSettings import LoggerSettings
+from brainboost_data_source_logger_package.LogClassifier import DEFAULT_CLASSIFIER, LogClassifier, parse_level_keywords
 
 
 from brainboost_data_source_logger_package.BBLogEntry import BBLogEntry  # Replace with actual import path
@@ -16,10 +39,35 @@ from brainboost_configuration_package.BBConfig import BBConfig
 
 class BBLogger:
     _process_name: Optional[str] = None
+    # Time of the most recent log() call in the process; it only decides which file is current.
     _last_time: Optional[datetime] = None
-    _delta: Optional[datetime] = None
+    # Time of the previous log() call of the current thread or asyncio task, for processing_time.
+    _last_log_time: contextvars.ContextVar = contextvars.ContextVar('bblogger_last_log_time', default=None)
     _config_disabled: bool = False
     _log_file_path: Optional[str] = None
+    _log_file_path_lock = threading.Lock()
+    _settings: Optional[LoggerSettings] = None
+    _config_generation: int = 0
+    _config_checked_at: float = 0.0
+    _code_location_cache: dict = {}
+    _code_location_cache_limit: int = 10000
+    # (log_level_keywords source, classifier), swapped as one object so threads never pair them up wrongly.
+    _classifier_state: tuple = (None, DEFAULT_CLASSIFIER)
+    _async_writer: Optional[AsyncLogWriter] = None
+    _async_lock = threading.Lock()
+    _sqlite_sink: Optional[SQLiteLogSink] = None
+    _file_sink: Optional[LogFileSink] = None
+    _metrics: Optional[LogMetrics] = None
+    _file_sink_settings: Optional[tuple] = None
+    _file_sink_snapshot: Optional[LoggerSettings] = None
+    _sink_lock = threading.Lock()
+    _atexit_registered: bool = False
+    _notifier: Optional[NotificationDispatcher] = None
+    _notifier_settings: Optional[tuple] = None
+    _read_pool: Optional[ParallelLogReader] = None
+    _read_pool_settings: Optional[tuple] = None
+    # (log_sampling settings, sampler or None), swapped as one object like _classifier_state.
+    _sampler_state: tuple = (None, None)
     _default_config = {
         'log_debug_mode': True,
         'log_enable_files': False,
@@ -30,11 +78,59 @@ class BBLogger:
         'log_path': 'logs',
         'log_prefix': 'brainboost',
         'log_delimiter': ',',
+        'log_format': 'csv',
         'log_page_size': 100,
         'log_notification_slack': '',
         'log_notification_url': '',
         'log_file_naming': 'daily',
-        'log_file_name_convention': 'YYYY_MM_DD_HH_MM_SS-[process]-log.log'
+        'log_file_name_convention': 'YYYY_MM_DD_HH_MM_SS-[process]-log.log',
+        'log_async': False,
+        'log_async_queue_size': 10000,
+        'log_async_backpressure': 'block',
+        'log_sqlite3_batch_size': 100,
+        'log_sqlite3_flush_interval_ms': 1000,
+        'log_sqlite3_synchronous': 'NORMAL',
+        'log_sqlite3_wal': True,
+        'log_sqlite3_max_buffered_rows': 10000,
+        'log_read_backend': 'files',
+        'log_read_workers': 1,
+        'log_read_executor': 'process',
+        'log_search_index': False,
+        'log_metrics': False,
+        'log_metrics_flush_interval_ms': 1000,
+        'log_follow_inotify': True,
+        'log_follow_min_interval_ms': 50,
+        'log_follow_max_interval_ms': 1000,
+        'log_file_buffer_size': 65536,
+        'log_file_flush_policy': 'line',
+        'log_file_flush_every': 100,
+        'log_file_flush_interval_ms': 1000,
+        'log_config_check_interval_ms': 1000,
+        'log_code_location': 'fast',
+        'log_code_location_cache': True,
+        'log_level_keywords': None,
+        'log_index_stride': 1000,
+        'log_archive_remove_source': True,
+        'log_file_sharding': False,
+        'log_file_rotate_bytes': 0,
+        'log_file_rotate_hourly': False,
+        'log_file_compression': '',
+        'log_retention_days': 0,
+        'log_retention_bytes': 0,
+        'log_sampling': '',
+        'log_sampling_every_n': 100,
+        'log_sampling_probability': 0.01,
+        'log_sampling_rate_per_s': 100.0,
+        'log_sampling_burst': 100,
+        'log_sampling_summary_interval_ms': 10000,
+        'log_notification_async': True,
+        'log_notification_timeout_ms': 5000,
+        'log_notification_retries': 3,
+        'log_notification_backoff_ms': 500,
+        'log_notification_rate_limit': 20,
+        'log_notification_batch_interval_ms': 1000,
+        'log_notification_max_batch': 50,
+        'log_notification_queue_size': 1000
     }
 
     @classmethod
@@ -80,6 +176,101 @@ class BBLogger:
         except Exception:
             return cls._default_config.get(key)
 
+    @classmethod
+    def invalidate_config(cls) -> None:
+        """
+        Discard the resolved configuration snapshot so the next call re-reads BBConfig.
+        Called automatically by `BBConfig.override`; the config file's mtime is also
+        checked at most once per `log_config_check_interval_ms`.
+        """
+        cls._config_generation += 1
+
+    @classmethod
+    def _config_file_signature(cls) -> tuple:
+        config_file = getattr(BBConfig, '_config_file', None)
+        if not config_file:
+            return (None, None)
+        try:
+            return (config_file, os.stat(config_file).st_mtime_ns)
+        except (OSError, TypeError):
+            return (config_file, None)
+
+    @classmethod
+    def _build_settings(cls) -> LoggerSettings:
+        generation = cls._config_generation
+        values = {}
+        for key, default in cls._default_config.items():
+            value = cls._get_config(key)
+            if isinstance(default, bool):
+                value = cls._normalize_bool(value)
+            elif isinstance(default, int):
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    value = default
+            values[key] = value
+        settings = LoggerSettings(
+            values,
+            generation=generation,
+            config_signature=cls._config_file_signature(),
+            check_interval=max(0, values['log_config_check_interval_ms']) / 1000.0
+        )
+        cls._settings = settings
+        cls._config_checked_at = time.monotonic()
+        return settings
+
+    @classmethod
+    def _get_settings(cls) -> LoggerSettings:
+        """
+        Return the resolved configuration snapshot, rebuilding it only after
+        `BBConfig.override` was called or the config file changed on disk.
+        """
+        settings = cls._settings
+        if settings is not None and settings.generation == cls._config_generation:
+            now = time.monotonic()
+            if now - cls._config_checked_at < settings.check_interval:
+                return settings
+            cls._config_checked_at = now
+            if cls._config_file_signature() == settings.config_signature:
+                return settings
+        return cls._build_settings()
+
+    @classmethod
+    def _get_code_location(cls, settings: LoggerSettings, depth: int) -> str:
+        """
+        Return 'file.py:lineno' of the frame `depth` levels above this method.
+
+        `log_code_location` selects how it is captured:
+        - 'fast': read only the caller's frame via sys._getframe.
+        - 'traceback': materialize the whole stack with traceback.extract_stack.
+        - 'off': skip capture and record 'Unknown'.
+        With `log_code_location_cache`, the string is memoized per file and line.
+        """
+        mode = settings.log_code_location
+        if mode == 'off':
+            return 'Unknown'
+        if mode != 'traceback' and hasattr(sys, '_getframe'):
+            try:
+                frame = sys._getframe(depth)
+            except ValueError:
+                return 'Unknown'
+            code = frame.f_code
+            lineno = frame.f_lineno
+            if not settings.log_code_location_cache:
+                return f"{os.path.basename(code.co_filename)}:{lineno}"
+            key = (code.co_filename, lineno)
+            location = cls._code_location_cache.get(key)
+            if location is None:
+                if len(cls._code_location_cache) >= cls._code_location_cache_limit:
+                    cls._code_location_cache.clear()
+                location = f"{os.path.basename(code.co_filename)}:{lineno}"
+                cls._code_location_cache[key] = location
+            return location
+
+        stack = traceback.extract_stack()
+        caller = stack[-(depth + 1)] if len(stack) >= depth + 1 else None
+        return f"{os.path.basename(caller.filename)}:{caller.lineno}" if caller else 'Unknown'
+
     @classmethod
     def _ensure_parent_dir(cls, path: str) -> None:
         dir_path = os.path.dirname(path)
@@ -95,11 +286,12 @@ class BBLogger:
     @classmethod
     def _safe_print(cls, value) -> None:
         try:
-            print(value)
+            # One write per line, so lines printed by concurrent threads never run together.
+            print(f"{value}\n", end='')
         except UnicodeEncodeError:
             encoding = sys.stdout.encoding or "utf-8"
             safe_text = str(value).encode(encoding, errors="backslashreplace").decode(encoding, errors="ignore")
-            print(safe_text)
+            print(f"{safe_text}\n", end='')
 
     @classmethod
     def _format_log_file_name(cls, convention: str, now: datetime, log_prefix: str) -> str:
@@ -111,146 +303,474 @@ class BBLogger:
         return file_name
 
     @classmethod
-    def _get_log_file_path(cls, date: Optional[str] = None) -> str:
-        log_path = cls._get_config('log_path')
-        log_prefix = cls._get_config('log_prefix')
+    def _get_log_file_path(cls, date: Optional[str] = None, current_date: Optional[str] = None,
+                           hour: Optional[str] = None) -> str:
+        """
+        :param date: Return the daily file of this 'YYYY_MM_DD' date, whatever the naming mode.
+        :param current_date: The 'YYYY_MM_DD' date to write to in daily mode; defaults to the
+                             date of the most recent log() call.
+        :param hour: In daily mode, return the file of this 'HH' hour of the day (with
+                     `log_file_rotate_hourly`).
+        """
+        settings = cls._get_settings()
+        log_path = settings.log_path
+        log_prefix = settings.log_prefix
         if date:
             return os.path.join(log_path, f"{log_prefix}_log_{date}.log")
 
-        naming = str(cls._get_config('log_file_naming') or 'daily').lower()
+        naming = str(settings.log_file_naming or 'daily').lower()
         if naming == 'per_run':
             if cls._log_file_path:
                 return cls._log_file_path
-            convention = cls._get_config('log_file_name_convention') or 'YYYY_MM_DD_HH_MM_SS-[process]-log.log'
-            now = cls._last_time or datetime.now()
-            file_name = cls._format_log_file_name(convention, now, log_prefix)
-            cls._log_file_path = os.path.join(log_path, file_name)
+            with cls._log_file_path_lock:
+                # Threads racing on the first log() of the run must agree on one name.
+                if not cls._log_file_path:
+                    convention = settings.log_file_name_convention or 'YYYY_MM_DD_HH_MM_SS-[process]-log.log'
+                    now = cls._last_time or datetime.now()
+                    file_name = cls._format_log_file_name(convention, now, log_prefix)
+                    cls._log_file_path = os.path.join(log_path, file_name)
             return cls._log_file_path
 
-        current_date = (cls._last_time or datetime.now()).strftime('%Y_%m_%d')
-        return os.path.join(log_path, f"{log_prefix}_log_{current_date}.log")
+        if current_date is None:
+            current_date = (cls._last_time or datetime.now()).strftime('%Y_%m_%d')
+        log_file_path = os.path.join(log_path, f"{log_prefix}_log_{current_date}.log")
+        return LogRotation.hour_path(log_file_path, hour) if hour else log_file_path
 
     @classmethod
-    def _initialize_database(cls):
-        db_path = cls._get_config('log_sqlite3_path')
+    def _get_sqlite_sink(cls) -> Optional[SQLiteLogSink]:
+        settings = cls._get_settings()
+        db_path = settings.log_sqlite3_path
         if not db_path:
-            return
-        cls._ensure_parent_dir(db_path)
-        if not os.path.exists(db_path):
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            columns = cls._get_config('log_columns')
-            columns_str = ", ".join([f"{col} TEXT" for col in columns])
-            cursor.execute(f"CREATE TABLE logs ({columns_str});")
-            conn.commit()
-            conn.close()
+            return None
+        sink = cls._sqlite_sink
+        if sink is not None and sink.db_path == db_path:
+            return sink
+        with cls._sink_lock:
+            sink = cls._sqlite_sink
+            if sink is None or sink.db_path != db_path:
+                if sink is not None:
+                    sink.close()
+                try:
+                    sink = SQLiteLogSink(
+                        db_path,
+                        settings.log_columns,
+                        batch_size=settings.log_sqlite3_batch_size,
+                        flush_interval_ms=settings.log_sqlite3_flush_interval_ms,
+                        synchronous=settings.log_sqlite3_synchronous or 'NORMAL',
+                        wal=settings.log_sqlite3_wal,
+                        mark_stride=settings.log_index_stride or 1000,
+                        search_index=settings.log_search_index,
+                        max_buffered_rows=settings.log_sqlite3_max_buffered_rows or 10000
+                    )
+                except ValueError as e:
+                    print(f'Failed to open log database: {e}')
+                    cls._sqlite_sink = None
+                    return None
+                cls._sqlite_sink = sink
+                cls._register_atexit()
+            return sink
+
+    @classmethod
+    def _get_sqlite_reader(cls) -> Optional[SQLiteLogReader]:
+        """
+        Return the reader of the `logs` table if `log_read_backend` is 'sqlite', else None.
+        The table and its row counters are created (and counted from existing rows) first.
+        """
+        settings = cls._get_settings()
+        backend = str(settings.log_read_backend or 'files').lower()
+        if backend == 'files':
+            return None
+        if backend != 'sqlite':
+            print(f"Invalid log_read_backend: {backend}. Reading from the log files.")
+            return None
+        sink = cls._get_sqlite_sink()
+        if sink is None:
+            return None
+        sink.ensure_schema()
+        return SQLiteLogReader(sink.db_path, settings.log_columns)
+
+    @classmethod
+    def _get_metrics_path(cls, settings: LoggerSettings) -> str:
+        return os.path.join(settings.log_path, f"{settings.log_prefix}_metrics.sqlite3")
+
+    @classmethod
+    def _get_metrics(cls) -> LogMetrics:
+        settings = cls._get_settings()
+        metrics_settings = (cls._get_metrics_path(settings), settings.log_metrics_flush_interval_ms)
+        metrics = cls._metrics
+        if metrics is not None and (metrics.db_path, metrics.flush_interval_ms) == metrics_settings:
+            return metrics
+        with cls._sink_lock:
+            metrics = cls._metrics
+            if metrics is None or (metrics.db_path, metrics.flush_interval_ms) != metrics_settings:
+                if metrics is not None:
+                    metrics.close()
+                metrics = LogMetrics(*metrics_settings)
+                cls._metrics = metrics
+                cls._register_atexit()
+            return metrics
+
+    @classmethod
+    def _record_metrics(cls, log_entry: BBLogEntry) -> None:
+        try:
+            cls._get_metrics().record(log_entry.timestamp, log_entry.log_type, log_entry.process,
+                                      log_entry.code_location, log_entry.processing_time)
+        except sqlite3.Error as e:
+            print(f'Failed to write log metrics: {e}')
+
+    @classmethod
+    def _get_read_pool(cls) -> Optional[ParallelLogReader]:
+        """
+        Return the pool reading the days of a range in parallel, or None if `log_read_workers`
+        is 1 (0 means one worker per CPU).
+        """
+        settings = cls._get_settings()
+        workers = settings.log_read_workers or os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        pool_settings = (workers, str(settings.log_read_executor or 'process').lower())
+        pool = cls._read_pool
+        if pool is not None and cls._read_pool_settings == pool_settings:
+            return pool
+        with cls._sink_lock:
+            if cls._read_pool is None or cls._read_pool_settings != pool_settings:
+                try:
+                    new_pool = ParallelLogReader(*pool_settings)
+                except ValueError as e:
+                    print(f"{e} Reading days one at a time.")
+                    return None
+                previous = cls._read_pool
+                cls._read_pool = new_pool
+                cls._read_pool_settings = pool_settings
+                if previous is not None:
+                    previous.shutdown(wait=False)
+                cls._register_atexit()
+            return cls._read_pool
+
+    @classmethod
+    def _initialize_database(cls):
+        sink = cls._get_sqlite_sink()
+        if sink is not None:
+            sink.ensure_schema()
 
     @classmethod
     def _write_to_database(cls, log_entry: BBLogEntry):
-        db_path = cls._get_config('log_sqlite3_path')
-        if not db_path:
+        sink = cls._get_sqlite_sink()
+        if sink is None:
+            return
+        try:
+            sink.write(log_entry.row)
+        except sqlite3.Error as e:
+            print(f'Failed to write to database: {e}')
+
+    @classmethod
+    def _get_file_sink(cls) -> Optional[LogFileSink]:
+        snapshot = cls._get_settings()
+        if cls._file_sink is not None and cls._file_sink_snapshot is snapshot:
+            return cls._file_sink
+        settings = (
+            tuple(snapshot.log_columns),
+            snapshot.log_delimiter,
+            snapshot.log_file_buffer_size,
+            snapshot.log_file_flush_policy or 'line',
+            snapshot.log_file_flush_every,
+            snapshot.log_file_flush_interval_ms,
+            snapshot.log_index_stride,
+            snapshot.log_file_rotate_bytes,
+            str(snapshot.log_format or 'csv').lower()
+        )
+        if cls._file_sink is not None and cls._file_sink_settings == settings:
+            cls._file_sink_snapshot = snapshot
+            return cls._file_sink
+        with cls._sink_lock:
+            if cls._file_sink is not None and cls._file_sink_settings == settings:
+                return cls._file_sink
+            (columns, delimiter, buffer_size, flush_policy, flush_every, flush_interval_ms, index_stride,
+             rotate_bytes, log_format) = settings
+            try:
+                sink = LogFileSink(
+                    columns,
+                    delimiter=delimiter,
+                    buffer_size=buffer_size,
+                    flush_policy=flush_policy,
+                    flush_every=flush_every,
+                    flush_interval_ms=flush_interval_ms,
+                    index_stride=index_stride,
+                    rotate_bytes=rotate_bytes,
+                    on_segment_closed=cls._schedule_log_maintenance,
+                    log_format=log_format
+                )
+            except ValueError as e:
+                print(f'Failed to open log file: {e}')
+                return None
+            if cls._file_sink is not None:
+                cls._file_sink.close()
+            cls._file_sink = sink
+            cls._file_sink_settings = settings
+            cls._file_sink_snapshot = snapshot
+            cls._register_atexit()
+        # Compress what earlier runs left uncompressed and apply retention.
+        cls._schedule_log_maintenance()
+        return sink
+
+    @classmethod
+    def _schedule_log_maintenance(cls, closed_path: Optional[str] = None) -> None:
+        """
+        Compress closed log segments and enforce retention on a background thread,
+        according to `log_file_compression`, `log_retention_days` and `log_retention_bytes`.
+        Called whenever the file sink stops writing to a file.
+        """
+        settings = cls._get_settings()
+        compression = str(settings.log_file_compression or '').lower()
+        if compression in ('none', 'off', 'false'):
+            compression = ''
+        if not (compression or settings.log_retention_days or settings.log_retention_bytes):
             return
-        cls._ensure_parent_dir(db_path)
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        columns = cls._get_config('log_columns')
-        cursor.execute(
-            f"INSERT INTO logs ({', '.join(columns)}) VALUES ({', '.join(['?' for _ in columns])});",
-            [
-                log_entry.timestamp,
-                log_entry.log_type,
-                log_entry.process,
-                log_entry.code_location,
-                log_entry.message,
-                log_entry.processing_time
-            ]
+        LogRotation.maintain_in_background(
+            settings.log_path,
+            settings.log_prefix,
+            compression or None,
+            max_age_days=settings.log_retention_days,
+            max_bytes=settings.log_retention_bytes,
+            keep=cls._open_log_files
         )
-        conn.commit()
-        conn.close()
 
     @classmethod
-    def _write_to_log_file(cls, log_entry: BBLogEntry):
-        log_path = cls._get_config('log_path')
-        log_file_path = cls._get_log_file_path()
-        if log_path and not os.path.exists(log_path):
-            os.makedirs(log_path, exist_ok=True)
-        file_exists = os.path.isfile(log_file_path)
+    def _open_log_files(cls) -> List[str]:
+        sink = cls._file_sink
+        path = sink.path if sink is not None else None
+        return [path] if path else []
 
+    @classmethod
+    def _write_to_log_file(cls, log_entry: BBLogEntry):
+        sink = cls._get_file_sink()
+        if sink is None:
+            return
+        # Entries go to the file of their own day (and hour), even when written later by the async writer.
+        timestamp = log_entry.timestamp
+        settings = cls._get_settings()
+        log_file_path = cls._get_log_file_path(
+            current_date=f"{timestamp[:4]}_{timestamp[4:6]}_{timestamp[6:8]}",
+            hour=timestamp[8:10] if settings.log_file_rotate_hourly else None
+        )
+        if settings.log_file_sharding:
+            log_file_path = cls._get_shard_path(log_file_path)
+        data = (log_entry.to_json() + '\n').encode('utf-8') if sink.log_format == 'jsonl' else None
         try:
-            with open(log_file_path, 'a+', encoding='utf-8', newline='') as log_file:
-                writer = csv.writer(
-                    log_file,
-                    delimiter=cls._get_config('log_delimiter'),
-                    quotechar="'",
-                    quoting=csv.QUOTE_MINIMAL
-                )
-                if not file_exists:
-                    writer.writerow(cls._get_config('log_columns'))
-                writer.writerow([
-                    log_entry.timestamp,
-                    log_entry.log_type,
-                    log_entry.process,
-                    log_entry.code_location,
-                    log_entry.message,
-                    log_entry.processing_time
-                ])
+            sink.write(log_file_path, log_entry.row, log_entry.log_type, data)
         except IOError as e:
             print(f'Failed to write to log file: {e}')
 
+    @classmethod
+    def _get_shard_path(cls, log_file_path: str) -> str:
+        """
+        Return this process's shard of a log file, e.g. `brainboost_log_2024_01_10.4242.log`.
+        With `log_file_sharding`, every process appends only to its own shard, so rows
+        from different workers never interleave and each shard gets exactly one header.
+        """
+        root, ext = os.path.splitext(log_file_path)
+        return f"{root}.{os.getpid()}{ext}"
+
+    @classmethod
+    def _get_day_files(cls, log_file_path: str) -> List[str]:
+        """
+        Return the existing files holding the rows of `log_file_path`: the file itself,
+        its rotated (possibly compressed) segments and its per-process shards.
+        """
+        return [path for group in cls._get_day_groups(log_file_path) for path in group]
+
+    @classmethod
+    def _get_day_groups(cls, log_file_path: str) -> List[List[str]]:
+        """
+        Return the existing files of `log_file_path` per writer (the shared file, then
+        each per-process shard), each list in write order across hourly and size segments.
+        """
+        return LogRotation.segment_groups(log_file_path)
+
+    @classmethod
+    def _merge_rows(cls, sources: List[Iterator[List[str]]]) -> Iterator[List[str]]:
+        return LogReader.merge_rows(sources, cls._get_settings().log_columns.index('timestamp'))
+
+    @classmethod
+    def _count_file_rows(cls, path: str) -> int:
+        if LogRotation.is_compressed(path):
+            settings = cls._get_settings()
+            return LogRotation.count_rows(path, lambda compressed_path: sum(
+                1 for _ in LogReader.iter_log_file(compressed_path, settings.log_columns, settings.log_delimiter)
+            ))
+        return cls._get_log_index(path).total_rows
+
+    @classmethod
+    def _file_has_header(cls, path: str) -> bool:
+        # Compressed segments were all written by the file sink, whose rows always have named
+        # columns: CSV files start with a header row and JSON Lines records name their fields.
+        if LogRotation.is_compressed(path):
+            return True
+        index = cls._get_log_index(path)
+        return index.has_header or index.format == 'jsonl'
+
+
+    @classmethod
+    def _iter_group_rows(cls, paths: List[str]) -> Iterator[List[str]]:
+        settings = cls._get_settings()
+        for path in paths:
+            yield from LogReader.iter_log_file(path, settings.log_columns, settings.log_delimiter)
+
+    @classmethod
+    def _read_day_rows(cls, groups: List[List[str]], start_row: int, count: int) -> List[List[str]]:
+        """
+        Read `count` rows starting at the 0-based `start_row` of the timestamp-ordered
+        union of a day's files. The segments of a single writer follow each other, so
+        segments before `start_row` are skipped by their row counts and plain files are
+        entered through their index.
+        """
+        if len(groups) > 1:
+            sources = [cls._iter_group_rows(group) for group in groups]
+            return list(islice(cls._merge_rows(sources), start_row, start_row + count))
+        settings = cls._get_settings()
+        rows = []
+        for path in groups[0] if groups else []:
+            if len(rows) >= count:
+                break
+            file_rows = cls._count_file_rows(path)
+            if start_row >= file_rows:
+                start_row -= file_rows
+                continue
+            wanted = count - len(rows)
+            if LogRotation.is_compressed(path):
+                file_iter = LogReader.iter_log_file(path, settings.log_columns, settings.log_delimiter)
+                rows.extend(islice(file_iter, start_row, start_row + wanted))
+            else:
+                rows.extend(cls._get_log_index(path).read_rows(start_row, wanted))
+            start_row = 0
+        return rows
+
+    @classmethod
+    def _get_log_index(cls, log_file_path: str) -> LogIndex:
+        """
+        Return the up-to-date byte-offset index of a CSV log file, building or
+        extending its sidecar `.idx` file as needed.
+        """
+        settings = cls._get_settings()
+        stride = settings.log_index_stride
+        return LogIndex.for_file(
+            log_file_path,
+            settings.log_columns,
+            settings.log_delimiter,
+            stride=stride or 1000,
+            persist=stride > 0
+        )
+
+    @classmethod
+    def _get_archive_path(cls, log_file_path: str) -> Optional[str]:
+        """
+        Return the columnar archive of a daily log file if it has been compacted.
+        """
+        if not LogArchive.is_available():
+            return None
+        archive_path = LogArchive.archive_path_for(log_file_path)
+        return archive_path if os.path.exists(archive_path) else None
+
+    @classmethod
+    def compact_logs(cls, before_date: Optional[str] = None, remove_source: Optional[bool] = None) -> List[str]:
+        """
+        Convert closed daily log files under `log_path` to columnar (Parquet) archives.
+        The read APIs use an archive instead of its CSV file once it exists.
+
+        :param before_date: Only days strictly before this 'YYYYMMDD' date are compacted. Defaults to today.
+        :param remove_source: Delete the CSV file and its index once the archive is verified.
+                              Defaults to `log_archive_remove_source`.
+        :return: List of the archive paths written.
+        :raises ValueError: If the date format is incorrect.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        if before_date is None:
+            before_date = datetime.now().strftime('%Y%m%d')
+        elif not isinstance(before_date, str) or len(before_date) != 8 or not before_date.isdigit():
+            raise ValueError("Date must be a string in 'YYYYMMDD' format, e.g., '20240110'.")
+
+        cls._flush_sinks()
+        settings = cls._get_settings()
+        if remove_source is None:
+            remove_source = settings.log_archive_remove_source
+        log_path = settings.log_path
+        if not os.path.isdir(log_path):
+            return []
+
+        day_file = LogRotation.day_file_pattern(settings.log_prefix)
+        days = sorted({
+            ''.join(match.groups()[:3]) for match in map(day_file.match, os.listdir(log_path)) if match
+        })
+        archives = []
+        for date_str in days:
+            if date_str >= before_date:
+                continue
+            log_file_path = cls._get_log_file_path(f"{date_str[:4]}_{date_str[4:6]}_{date_str[6:]}")
+            day_files = cls._get_day_files(log_file_path)
+            with cls._sink_lock:
+                if cls._file_sink is not None and cls._file_sink.path in day_files:
+                    # Still open from before midnight; the next log() call opens today's file.
+                    cls._file_sink.close()
+            try:
+                archives.append(LogArchive.compact(
+                    log_file_path,
+                    settings.log_columns,
+                    settings.log_delimiter,
+                    remove_source=remove_source,
+                    shard_paths=[path for path in day_files if path != log_file_path]
+                ))
+            except (IOError, ValueError) as e:
+                print(f"Failed to compact log file {log_file_path}: {e}")
+        return archives
+
     @classmethod
     def get_page(cls, page_num: int) -> pd.DataFrame:
         """
         Retrieve a specific page of log entries from today's log file as a pandas DataFrame.
 
+        With `log_read_backend` set to 'sqlite', this and the other read APIs query the
+        `logs` table of `log_sqlite3_path` instead, with the same DataFrame output.
+
         :param page_num: The page number to retrieve (1-based).
         :return: pandas DataFrame containing log entries for the specified page.
         :raises FileNotFoundError: If today's log file does not exist.
         :raises ValueError: If the page number is invalid.
         """
+        cls._flush_sinks()
         # Retrieve page size from configuration
-        page_size = cls._get_config('log_page_size')
-        
+        page_size = cls._get_settings().log_page_size
+
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            day = datetime.now().strftime('%Y%m%d')
+            total_rows = reader.count_day(day)
+            if not total_rows:
+                raise FileNotFoundError(f"No log entries for today in {reader.db_path}")
+            total_pages = (total_rows + page_size - 1) // page_size
+            if page_num < 1 or page_num > total_pages:
+                raise ValueError(f"Invalid page number: {page_num}. Total pages available: {total_pages}.")
+            rows = reader.read_day(day, (page_num - 1) * page_size, page_size)
+            return LogReader.raw_frame(rows, reader.columns)
+
         # Construct the log file path
         log_file_path = cls._get_log_file_path()
 
-        # Check if the log file exists
-        if not os.path.exists(log_file_path):
+        # Check if the log file (or any of its segments or per-process shards) exists
+        groups = cls._get_day_groups(log_file_path)
+        if not groups:
             raise FileNotFoundError(f"Log file for today does not exist: {log_file_path}")
 
         try:
-            # Open and read the log file
-            with open(log_file_path, 'r', encoding='utf-8') as log_file:
-                reader = csv.reader(
-                    log_file,
-                    delimiter=cls._get_config('log_delimiter'),
-                    quotechar="'"
-                )
-                logs = list(reader)
-
-                # Extract headers if present
-                if logs and logs[0] == cls._get_config('log_columns'):
-                    headers = logs[0]
-                    logs = logs[1:]
-                else:
-                    headers = cls._get_config('log_columns')
-
-                total_logs = len(logs)
-                total_pages = (total_logs + page_size - 1) // page_size  # Ceiling division
+            total_rows = sum(cls._count_file_rows(path) for group in groups for path in group)
+            total_pages = (total_rows + page_size - 1) // page_size
 
-                # Validate page number
-                if page_num < 1 or page_num > total_pages:
-                    raise ValueError(f"Invalid page number: {page_num}. Total pages available: {total_pages}.")
+            # Validate page number
+            if page_num < 1 or page_num > total_pages:
+                raise ValueError(f"Invalid page number: {page_num}. Total pages available: {total_pages}.")
 
-                # Calculate start and end indices for slicing
-                start_index = (page_num - 1) * page_size
-                end_index = start_index + page_size
-
-                # Slice the logs for the requested page
-                selected_logs = logs[start_index:end_index]
-
-                # Convert the selected logs to a pandas DataFrame
-                df = pd.DataFrame(selected_logs, columns=headers)
-                return df
+            # Seek to the page through the segment row counts and indexes and parse only its rows
+            selected_logs = cls._read_day_rows(groups, (page_num - 1) * page_size, page_size)
+            return LogReader.raw_frame(selected_logs, cls._get_settings().log_columns)
 
         except IOError as e:
             print(f"Failed to read log file: {e}")
@@ -266,32 +786,41 @@ class BBLogger:
         :param end_line: The ending line number (inclusive).
         :return: Pandas DataFrame of log entries within the specified range.
         """
-        log_file_path = os.path.join(cls._get_config('log_path'), f"{cls._get_config('log_prefix')}_log_{date}.log")
-
-        if not os.path.exists(log_file_path):
+        cls._flush_sinks()
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            day = date.replace('_', '')
+            total_lines = reader.count_day(day)
+            if not total_lines:
+                raise FileNotFoundError(f"No log entries for {date} in {reader.db_path}")
+            if start_line < 1 or end_line > total_lines or start_line > end_line:
+                raise ValueError(f"Invalid range: start_line={start_line}, end_line={end_line}, total_lines={total_lines}")
+            rows = reader.read_day(day, start_line - 1, end_line - start_line + 1)
+            return LogReader.raw_frame(rows, reader.columns)
+
+        log_file_path = cls._get_log_file_path(date)
+        archive_path = cls._get_archive_path(log_file_path)
+
+        if archive_path:
+            total_lines = LogArchive.count_rows(archive_path)
+            if start_line < 1 or end_line > total_lines or start_line > end_line:
+                raise ValueError(f"Invalid range: start_line={start_line}, end_line={end_line}, total_lines={total_lines}")
+            return LogArchive.read(archive_path).iloc[start_line - 1:end_line].reset_index(drop=True)
+
+        groups = cls._get_day_groups(log_file_path)
+        if not groups:
             raise FileNotFoundError(f"Log file for {date} does not exist: {log_file_path}")
 
         try:
-            with open(log_file_path, 'r', encoding='utf-8') as log_file:
-                reader = csv.reader(
-                    log_file,
-                    delimiter=cls._get_config('log_delimiter'),
-                    quotechar="'"
-                )
-                logs = list(reader)
+            day_files = [path for group in groups for path in group]
+            total_lines = sum(cls._count_file_rows(path) for path in day_files)
+            headers = cls._get_settings().log_columns if any(map(cls._file_has_header, day_files)) else None
 
-                # Skip header row if it exists
-                if logs and logs[0] == cls._get_config('log_columns'):
-                    headers = logs[0]
-                    logs = logs[1:]
-                else:
-                    headers = None
+            if start_line < 1 or end_line > total_lines or start_line > end_line:
+                raise ValueError(f"Invalid range: start_line={start_line}, end_line={end_line}, total_lines={total_lines}")
 
-                if start_line < 1 or end_line > len(logs) or start_line > end_line:
-                    raise ValueError(f"Invalid range: start_line={start_line}, end_line={end_line}, total_lines={len(logs)}")
-
-                selected_logs = logs[start_line - 1:end_line]
-                return pd.DataFrame(selected_logs, columns=headers)
+            selected_logs = cls._read_day_rows(groups, start_line - 1, end_line - start_line + 1)
+            return LogReader.raw_frame(selected_logs, headers)
         except IOError as e:
             print(f"Failed to read log file: {e}")
             return pd.DataFrame()
@@ -300,45 +829,49 @@ class BBLogger:
     def get_total_amount_of_pages(cls, date: Optional[str] = None) -> int:
         """
         Calculate the total number of pages available in a log file based on the page size.
+        The row count comes from the file's index, so only rows appended since the last
+        call are parsed.
 
         :param date: The date of the log file in YYYY_MM_DD format. If not provided, today's log is used.
-        :param page_size: The number of log entries per page. Defaults to 100.
         :return: Total number of pages available.
         :raises Exception: If no logs are available for today and no date is provided.
         """
-        page_size = cls._get_config('log_page_size')
+        cls._flush_sinks()
+        page_size = cls._get_settings().log_page_size
         if date is None:
             date = datetime.now().strftime('%Y_%m_%d')
             is_today = True
         else:
             is_today = False
+
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            try:
+                total_rows = reader.count_day(date.replace('_', ''))
+            except (FileNotFoundError, sqlite3.Error):
+                total_rows = 0
+            if not total_rows and is_today:
+                raise Exception("No logs available")
+            return (total_rows + page_size - 1) // page_size
+
         if is_today:
             log_file_path = cls._get_log_file_path()
         else:
-            log_file_path = os.path.join(cls._get_config('log_path'), f"{cls._get_config('log_prefix')}_log_{date}.log")
+            log_file_path = cls._get_log_file_path(date)
+            archive_path = cls._get_archive_path(log_file_path)
+            if archive_path:
+                return (LogArchive.count_rows(archive_path) + page_size - 1) // page_size
 
-        if not os.path.exists(log_file_path):
+        day_files = cls._get_day_files(log_file_path)
+        if not day_files:
             if is_today:
                 raise Exception("No logs available")
             else:
                 return 0  # Or you can choose to raise an exception for missing dates as well
 
         try:
-            with open(log_file_path, 'r', encoding='utf-8') as log_file:
-                reader = csv.reader(
-                    log_file,
-                    delimiter=cls._get_config('log_delimiter'),
-                    quotechar="'"
-                )
-                logs = list(reader)
-
-                # Remove header row if it exists
-                if logs and logs[0] == cls._get_config('log_columns'):
-                    logs = logs[1:]
-
-                total_entries = len(logs)
-                total_pages = (total_entries + page_size - 1) // page_size  # Ceiling division
-                return total_pages
+            total_rows = sum(cls._count_file_rows(path) for path in day_files)
+            return (total_rows + page_size - 1) // page_size
         except IOError as e:
             if is_today:
                 raise Exception("No logs available")
@@ -346,12 +879,18 @@ class BBLogger:
                 return 0  # Or handle the error as needed
             
     @classmethod
-    def read_logs_from_date(cls, date: str) -> pd.DataFrame:
+    def read_logs_from_date(cls, date: str, chunksize: Optional[int] = None):
         """
         Read log lines from a specific date and return them as a pandas DataFrame.
 
         :param date: The date of the log file in 'YYYYMMDD' format, e.g., '20240110'.
-        :return: pandas DataFrame containing the log entries.
+        :param chunksize: If given, return an iterator of DataFrames with at most this many rows each
+                          instead of loading the whole file at once.
+        :return: pandas DataFrame containing the log entries, or an iterator of DataFrames. Days compacted
+                 with `compact_logs` come back with a datetime `timestamp` and categorical `log_type`/`process`.
+                 Days split into rotated segments or `log_file_sharding` shards are read across all their
+                 (possibly compressed) files in timestamp order; in chunks, they have the dtypes of
+                 `iter_log_frames`.
         :raises ValueError: If the date format is incorrect.
         :raises FileNotFoundError: If the log file for the given date does not exist.
         """
@@ -359,155 +898,934 @@ class BBLogger:
         if not isinstance(date, str) or len(date) != 8 or not date.isdigit():
             raise ValueError("Date must be a string in 'YYYYMMDD' format, e.g., '20240110'.")
 
+        cls._flush_sinks()
+        settings = cls._get_settings()
         # Convert to 'YYYY_MM_DD'
         formatted_date = f"{date[:4]}_{date[4:6]}_{date[6:]}"
 
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            if not reader.count_day(date):
+                raise FileNotFoundError(f"No log entries for date {date} in {reader.db_path}")
+            columns = reader.columns
+            if chunksize is not None:
+                return (LogReader.infer_dtypes(frame, columns)
+                        for frame in cls._chunk_raw_frames(reader.iter_day(date), chunksize))
+            return LogReader.infer_dtypes(LogReader.raw_frame(list(reader.iter_day(date)), columns), columns)
+
         # Construct log file path
-        log_file_path = os.path.join(
-            cls._get_config('log_path'),
-            f"{cls._get_config('log_prefix')}_log_{formatted_date}.log"
-        )
+        log_file_path = cls._get_log_file_path(formatted_date)
 
-        if not os.path.exists(log_file_path):
+        # Compacted days are read from their columnar archive
+        archive_path = cls._get_archive_path(log_file_path)
+        if archive_path:
+            if chunksize is not None:
+                return LogArchive.iter_frames(archive_path, chunksize)
+            return LogArchive.read(archive_path)
+
+        groups = cls._get_day_groups(log_file_path)
+        if not groups:
             raise FileNotFoundError(f"Log file for date {date} does not exist: {log_file_path}")
 
         try:
-            # Determine if the log file has a header
-            with open(log_file_path, 'r', encoding='utf-8') as f:
-                first_line = f.readline().strip()
-                has_header = first_line == ",".join(cls._get_config('log_columns'))
-
-            # Read the log file into a pandas DataFrame
-            df = pd.read_csv(
-                log_file_path,
-                delimiter=cls._get_config('log_delimiter'),
-                quotechar="'",
-                encoding='utf-8',
-                header=0 if has_header else None,
-                names=cls._get_config('log_columns') if not has_header else None
-            )
-
-            return df
+            day_files = [path for group in groups for path in group]
+            if len(day_files) > 1:
+                # Segments of one writer are read in sequence; per-process shards are merged
+                # back into timestamp order
+                if chunksize is not None:
+                    sources = [cls._iter_group_rows(group) for group in groups]
+                    return cls._chunk_frames(cls._merge_rows(sources), chunksize)
+                df = pd.concat([cls._read_csv_log(path, settings) for path in day_files], ignore_index=True)
+                if len(groups) == 1:
+                    return df
+                return df.sort_values('timestamp', kind='stable', ignore_index=True)
+
+            return cls._read_csv_log(day_files[0], settings, chunksize)
         except Exception as e:
             print(f"Failed to read log file: {e}")
-            return pd.DataFrame()
-        
+            return pd.DataFrame() if chunksize is None else iter(())
+
     @classmethod
-    def get_logs_between_timestampt_and_timestampt(cls, t1: str, t2: str) -> pd.DataFrame:
-        """
-        Retrieve all log entries between two timestamps across multiple log files.
+    def _read_csv_log(cls, log_file_path: str, settings: LoggerSettings, chunksize: Optional[int] = None):
+        if LogReader.file_format(log_file_path) == 'jsonl':
+            return cls._read_jsonl_log(log_file_path, settings, chunksize)
+
+        # Determine if the log file has a header
+        with LogRotation.open_binary(log_file_path) as f:
+            first_line = f.readline().decode('utf-8').strip()
+            has_header = first_line == settings.log_delimiter.join(settings.log_columns)
+
+        # Read the log file (compressed segments are decompressed by pandas) into a DataFrame
+        return pd.read_csv(
+            log_file_path,
+            delimiter=settings.log_delimiter,
+            quotechar="'",
+            encoding='utf-8',
+            header=0 if has_header else None,
+            names=settings.log_columns if not has_header else None,
+            chunksize=chunksize
+        )
 
-        :param t1: The start timestamp in 'YYYYMMDDHHMMSS' format.
-        :param t2: The end timestamp in 'YYYYMMDDHHMMSS' format.
-        :return: pandas DataFrame containing log entries between t1 and t2.
-        :raises ValueError: If the timestamp formats are incorrect or t1 > t2.
-        """
+    @classmethod
+    def _read_jsonl_log(cls, log_file_path: str, settings: LoggerSettings, chunksize: Optional[int] = None):
+        # Extra fields become extra columns; log columns get the dtypes read_csv would infer.
+        columns = settings.log_columns
+        rows = LogReader.iter_log_file(log_file_path, columns, settings.log_delimiter)
+        if chunksize is None:
+            return LogReader.infer_dtypes(LogReader.raw_frame(list(rows), columns), columns)
+        return (LogReader.infer_dtypes(frame, columns) for frame in cls._chunk_raw_frames(rows, chunksize))
+
+    @classmethod
+    def _chunk_raw_frames(cls, rows: Iterator[List], chunksize: int) -> Iterator[pd.DataFrame]:
+        columns = cls._get_settings().log_columns
+        while True:
+            chunk = list(islice(rows, chunksize))
+            if not chunk:
+                return
+            yield LogReader.raw_frame(chunk, columns)
+
+    @classmethod
+    def _parse_timestamp_range(cls, t1: str, t2: str) -> Tuple[datetime, datetime]:
         # Validate and parse timestamps
         try:
             dt1 = datetime.strptime(t1, '%Y%m%d%H%M%S')
             dt2 = datetime.strptime(t2, '%Y%m%d%H%M%S')
-        except ValueError as ve:
+        except (TypeError, ValueError) as ve:
             raise ValueError("Timestamps must be in 'YYYYMMDDHHMMSS' format.") from ve
 
         if dt1 > dt2:
             raise ValueError("Start timestamp t1 must be less than or equal to end timestamp t2.")
+        return dt1, dt2
 
+    @classmethod
+    def _dates_between(cls, dt1: datetime, dt2: datetime) -> List[str]:
         # Generate list of dates between dt1 and dt2 inclusive
         date_list = []
         current_date = dt1.date()
         end_date = dt2.date()
         while current_date <= end_date:
-            date_str = current_date.strftime('%Y%m%d')  # 'YYYYMMDD'
-            date_list.append(date_str)
+            date_list.append(current_date.strftime('%Y%m%d'))  # 'YYYYMMDD'
             current_date += timedelta(days=1)
+        return date_list
+
+    @classmethod
+    def _iter_rows_between(cls, t1: str, t2: str, filters: Optional[dict] = None) -> Iterator[List[str]]:
+        """
+        Validate the arguments eagerly and return a generator of raw rows with
+        t1 <= timestamp <= t2 across day files.
+        """
+        dt1, dt2 = cls._parse_timestamp_range(t1, t2)
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            cls._flush_sinks()
+            return reader.iter_range(dt1.strftime('%Y%m%d%H%M%S'), dt2.strftime('%Y%m%d%H%M%S'), filters)
+        predicate = LogReader.compile_filters(filters, cls._get_settings().log_columns)
+        return cls._stream_rows(dt1, dt2, predicate)
+
+    @classmethod
+    def _day_sources(cls, dt1: datetime, dt2: datetime) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Yield (date, CSV path, archive path or None) for every day between dt1 and dt2 that has logs.
+        """
+        for date_str in cls._dates_between(dt1, dt2):
+            log_file_path = cls._get_log_file_path(f"{date_str[:4]}_{date_str[4:6]}_{date_str[6:]}")
+            archive_path = cls._get_archive_path(log_file_path)
+            if archive_path or cls._get_day_files(log_file_path):
+                yield date_str, log_file_path, archive_path
+
+    @classmethod
+    def _stream_rows(cls, dt1: datetime, dt2: datetime, predicate) -> Iterator[List[str]]:
+        cls._flush_sinks()
+        columns = cls._get_settings().log_columns
+        first_date = dt1.strftime('%Y%m%d')
+        for date_str, log_file_path, archive_path in cls._day_sources(dt1, dt2):
+            if archive_path:
+                rows = LogArchive.frame_to_rows(LogArchive.read(archive_path, columns=columns, start=dt1, end=dt2))
+            else:
+                rows = cls._stream_day_rows(log_file_path, dt1, dt2, seek=date_str == first_date)
+            for row in rows:
+                if predicate is None or predicate(row):
+                    yield row
 
-        # Initialize list to collect DataFrames
-        log_dfs = []
-        for date_str in date_list:
+    @classmethod
+    def _stream_day_rows(cls, log_file_path: str, dt1: datetime, dt2: datetime, seek: bool) -> Iterator[List[str]]:
+        settings = cls._get_settings()
+        return LogReader.stream_day_rows(
+            cls._get_day_groups(log_file_path), settings.log_columns, settings.log_delimiter,
+            dt1.strftime('%Y%m%d%H%M%S'), dt2.strftime('%Y%m%d%H%M%S'), seek, settings.log_index_stride
+        )
+
+    @classmethod
+    def iter_logs(cls, t1: str, t2: str, filters: Optional[dict] = None) -> Iterator[dict]:
+        """
+        Stream log entries between two timestamps, one dict per entry, using constant memory
+        regardless of how many days or bytes are scanned.
+
+        :param t1: The start timestamp in 'YYYYMMDDHHMMSS' format.
+        :param t2: The end timestamp in 'YYYYMMDDHHMMSS' format.
+        :param filters: Optional `{column: condition}` mapping; a condition is a value, a collection
+                        of accepted values, or a callable taking the column value.
+        :return: Generator of `{column: value}` dicts in timestamp order, including the extra
+                 fields of entries written in the 'jsonl' format.
+        :raises ValueError: If the timestamp formats are incorrect, t1 > t2 or a filter column is unknown.
+        """
+        columns = cls._get_settings().log_columns
+        return (LogReader.row_to_dict(row, columns) for row in cls._iter_rows_between(t1, t2, filters))
+
+    @classmethod
+    def iter_log_frames(cls, t1: str, t2: str, filters: Optional[dict] = None,
+                        chunksize: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Stream log entries between two timestamps as DataFrames of at most `chunksize` rows,
+        with the same columns and dtypes as `get_logs_between_timestampt_and_timestampt`.
+
+        :raises ValueError: If the timestamp formats are incorrect, t1 > t2, a filter column
+                            is unknown or chunksize is not positive.
+        """
+        if not chunksize or chunksize < 1:
+            raise ValueError("chunksize must be a positive integer.")
+        return cls._chunk_frames(cls._iter_rows_between(t1, t2, filters), chunksize)
+
+    @classmethod
+    def _chunk_frames(cls, rows: Iterator[List[str]], chunksize: int) -> Iterator[pd.DataFrame]:
+        columns = cls._get_settings().log_columns
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunksize:
+                yield LogReader.rows_to_frame(chunk, columns)
+                chunk = []
+        if chunk:
+            yield LogReader.rows_to_frame(chunk, columns)
+
+    @classmethod
+    def get_logs_between_timestampt_and_timestampt(cls, t1: str, t2: str, chunksize: Optional[int] = None):
+        """
+        Retrieve all log entries between two timestamps across multiple log files.
+
+        :param t1: The start timestamp in 'YYYYMMDDHHMMSS' format.
+        :param t2: The end timestamp in 'YYYYMMDDHHMMSS' format.
+        :param chunksize: If given, return an iterator of DataFrames (see `iter_log_frames`)
+                          instead of a single DataFrame.
+        :return: pandas DataFrame containing log entries between t1 and t2. With `log_read_workers`
+                 above 1, the days are read by a pool of `log_read_executor` workers ('process' or
+                 'thread'); the result is the same, in the same order.
+        :raises ValueError: If the timestamp formats are incorrect or t1 > t2.
+        """
+        if chunksize is not None:
+            return cls.iter_log_frames(t1, t2, chunksize=chunksize)
+
+        dt1, dt2 = cls._parse_timestamp_range(t1, t2)
+        cls._flush_sinks()
+        columns = cls._get_settings().log_columns
+        first_date = dt1.strftime('%Y%m%d')
+
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            rows = list(reader.iter_range(dt1.strftime('%Y%m%d%H%M%S'), dt2.strftime('%Y%m%d%H%M%S')))
+            if not rows:
+                print("No log entries found between the specified timestamps.")
+                return pd.DataFrame()
+            return LogReader.rows_to_frame(rows, columns)
+
+        # Only the rows between t1 and t2 are parsed: compacted days are filtered by the
+        # Parquet reader, the first CSV day is entered through a binary search on its index
+        # and reading stops at the first row past t2. With `log_read_workers`, days are
+        # read in parallel and each worker returns only the rows in range.
+        settings = cls._get_settings()
+        days = [
+            (cls._get_day_groups(log_file_path) if not archive_path else [], archive_path, date_str == first_date)
+            for date_str, log_file_path, archive_path in cls._day_sources(dt1, dt2)
+        ]
+        read_args = (columns, settings.log_delimiter, settings.log_index_stride, dt1, dt2)
+        pool = cls._get_read_pool() if len(days) > 1 else None
+        frames = None
+        if pool is not None:
             try:
-                df = cls.read_logs_from_date(date_str)
-                log_dfs.append(df)
-            except FileNotFoundError:
-                print(f"Log file for date {date_str} does not exist. Skipping.")
-            except Exception as e:
-                print(f"Failed to read log file for date {date_str}: {e}")
-
-        if not log_dfs:
+                frames = pool.read_days(days, *read_args)
+            except BrokenExecutor as e:
+                print(f"Parallel log read failed, reading days one at a time: {e}")
+        if frames is None:
+            frames = [ParallelLogReader.read_day(*read_args, day) for day in days]
+        frames = [frame for frame in frames if len(frame)]
+
+        if not frames:
             print("No log entries found between the specified timestamps.")
             return pd.DataFrame()
 
-        # Concatenate all DataFrames
-        all_logs_df = pd.concat(log_dfs, ignore_index=True)
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
 
-        # Convert 'timestamp' to datetime
+    @classmethod
+    def _get_follower(cls, filters: Optional[dict], from_start: bool) -> LogFollower:
+        settings = cls._get_settings()
+        return LogFollower(
+            settings.log_path,
+            lambda date: cls._get_day_files(cls._get_log_file_path(date)),
+            settings.log_columns,
+            settings.log_delimiter,
+            filters=filters,
+            from_start=from_start,
+            use_inotify=settings.log_follow_inotify,
+            min_interval_ms=settings.log_follow_min_interval_ms,
+            max_interval_ms=settings.log_follow_max_interval_ms
+        )
+
+    @classmethod
+    def follow(cls, filters: Optional[dict] = None, from_start: bool = False,
+               timeout: Optional[float] = None) -> Iterator[dict]:
+        """
+        Yield the entries appended to today's log files as they are written, like `tail -f`.
+
+        Only new bytes are parsed: the offset reached in each file of the day is remembered.
+        At midnight, the rest of the previous day is yielded before following the next day's
+        files. Between reads the generator blocks on an inotify watch of `log_path` (Linux,
+        `log_follow_inotify`) or polls, backing off from `log_follow_min_interval_ms` to
+        `log_follow_max_interval_ms` while nothing is written. Daily file naming only.
+
+        :param filters: Optional `{column: condition}` mapping, as for `iter_logs`.
+        :param from_start: Start with the entries already in today's files instead of only new ones.
+        :param timeout: Stop once no entry arrived for this many seconds. Follows forever if None.
+        :return: Generator of `{column: value}` dicts, in timestamp order within each read.
+        :raises ValueError: If a filter column is unknown.
+        """
+        follower = cls._get_follower(filters, from_start)
+        return cls._follow(follower, timeout)
+
+    @classmethod
+    def _follow(cls, follower: LogFollower, timeout: Optional[float]) -> Iterator[dict]:
         try:
-            all_logs_df['timestamp'] = pd.to_datetime(all_logs_df['timestamp'], format='%Y%m%d%H%M%S')
-        except Exception as e:
-            print(f"Failed to convert 'timestamp' to datetime: {e}")
+            idle_since = time.monotonic()
+            while True:
+                entries = follower.read_new()
+                if entries:
+                    yield from entries
+                    idle_since = time.monotonic()
+                    continue
+                remaining = None if timeout is None else timeout - (time.monotonic() - idle_since)
+                if remaining is not None and remaining <= 0:
+                    return
+                follower.wait(remaining)
+        finally:
+            follower.close()
+
+    @classmethod
+    async def afollow(cls, filters: Optional[dict] = None, from_start: bool = False,
+                      timeout: Optional[float] = None):
+        """
+        Async generator variant of `follow`. Files are read on the default executor and the
+        inotify watch is registered with the event loop, so the loop is never blocked.
+        """
+        follower = cls._get_follower(filters, from_start)
+        loop = asyncio.get_running_loop()
+        try:
+            idle_since = time.monotonic()
+            while True:
+                entries = await loop.run_in_executor(None, follower.read_new)
+                if entries:
+                    for entry in entries:
+                        yield entry
+                    idle_since = time.monotonic()
+                    continue
+                remaining = None if timeout is None else timeout - (time.monotonic() - idle_since)
+                if remaining is not None and remaining <= 0:
+                    return
+                await follower.async_wait(remaining)
+        finally:
+            follower.close()
+
+    @classmethod
+    def search(cls, query: str, t1: str, t2: str, log_type: Optional[str] = None, page: int = 1,
+               page_size: Optional[int] = None) -> pd.DataFrame:
+        """
+        Full-text search of the log messages between two timestamps, best match first.
+
+        Every word of `query` must start a word of the message, case-insensitively; matches
+        are ranked by BM25 relevance. With `log_read_backend` 'sqlite', the FTS5 index of the
+        `logs` table is used: it is built by the first search (or when the table is created,
+        with `log_search_index`) and then kept up to date by every insert. Otherwise a sidecar
+        index, `{log_prefix}_search.sqlite3` under `log_path`, is first brought up to date with
+        the day files between t1 and t2, parsing only the rows written since the previous search.
+
+        :param query: The words to look for.
+        :param t1: The start timestamp in 'YYYYMMDDHHMMSS' format.
+        :param t2: The end timestamp in 'YYYYMMDDHHMMSS' format.
+        :param log_type: Only return entries of this level.
+        :param page: The 1-based page of results.
+        :param page_size: Results per page. Defaults to `log_page_size`.
+        :return: pandas DataFrame of the log columns and a `score` column (higher is more relevant),
+                 with a datetime `timestamp`.
+        :raises ValueError: If the timestamp formats are incorrect, t1 > t2 or page < 1.
+        :raises RuntimeError: If the sqlite3 module lacks FTS5.
+        """
+        dt1, dt2 = cls._parse_timestamp_range(t1, t2)
+        if page < 1:
+            raise ValueError(f"Invalid page number: {page}.")
+        cls._flush_sinks()
+        settings = cls._get_settings()
+        columns = settings.log_columns
+        page_size = page_size or settings.log_page_size
+        t1, t2 = dt1.strftime('%Y%m%d%H%M%S'), dt2.strftime('%Y%m%d%H%M%S')
+
+        reader = cls._get_sqlite_reader()
+        if reader is not None:
+            with closing(sqlite3.connect(reader.db_path)) as conn:
+                if not LogSearchIndex.table_exists(conn):
+                    with conn:
+                        conn.execute("BEGIN IMMEDIATE;")
+                        LogSearchIndex.create(conn)
+                rows = LogSearchIndex.query(conn, columns, query, t1, t2, log_type, page_size, (page - 1) * page_size)
+        else:
+            index = LogSearchIndex(
+                os.path.join(settings.log_path, f"{settings.log_prefix}_search.sqlite3"), columns, settings.log_delimiter
+            )
+            with closing(index.connect()) as conn:
+                for date_str in cls._dates_between(dt1, dt2):
+                    log_file_path = cls._get_log_file_path(f"{date_str[:4]}_{date_str[4:6]}_{date_str[6:]}")
+                    archive_path = cls._get_archive_path(log_file_path)
+                    index.update(conn, date_str, [archive_path] if archive_path else cls._get_day_files(log_file_path))
+                rows = LogSearchIndex.query(conn, columns, query, t1, t2, log_type, page_size, (page - 1) * page_size)
+        return LogReader.rows_to_frame(rows, list(columns) + ['score'])
+
+    @classmethod
+    def stats(cls, t1: str, t2: str, group_by=None, filters: Optional[dict] = None,
+              percentiles: Tuple[float, ...] = ()) -> pd.DataFrame:
+        """
+        Entry counts and processing_time statistics between two timestamps, from the rollups
+        kept with `log_metrics` (in `{log_prefix}_metrics.sqlite3` under `log_path`), without
+        reading the logs. Rollups are per minute: t1 and t2 are rounded down to the minute
+        and every minute from t1's through t2's is counted.
+
+        For example, errors per minute per process:
+        `stats(t1, t2, group_by=['minute', 'process'], filters={'log_type': 'error'})`, and the
+        busiest code locations: `stats(t1, t2, group_by='code_location').head(10)`.
+
+        :param t1: The start timestamp in 'YYYYMMDDHHMMSS' format.
+        :param t2: The end timestamp in 'YYYYMMDDHHMMSS' format.
+        :param group_by: A column or list of columns among 'log_type', 'process' and 'code_location',
+                         plus at most one time bucket, 'minute', 'hour' or 'day'. None for totals.
+        :param filters: Optional `{column: condition}` mapping over the same three columns; a condition
+                        is a value, a collection of accepted values, or a callable taking the value.
+        :param percentiles: processing_time percentiles to estimate within 1%, e.g. (50, 99). None by default.
+        :return: pandas DataFrame with the group columns (a datetime column for the time bucket),
+                 `count` and `processing_time_sum`, `_mean`, `_min`, `_max` and `_p<percentile>`
+                 in seconds; by time bucket then count, or by descending count.
+        :raises ValueError: If the timestamp formats are incorrect, t1 > t2 or a column is unknown.
+        """
+        dt1, dt2 = cls._parse_timestamp_range(t1, t2)
+        if group_by is None:
+            group_by = []
+        elif isinstance(group_by, str):
+            group_by = [group_by]
+        cls._flush_sinks()
+        settings = cls._get_settings()
+        if not settings.log_metrics and cls._metrics is None and not os.path.exists(cls._get_metrics_path(settings)):
+            print("No log metrics recorded; enable log_metrics to collect them.")
             return pd.DataFrame()
+        return cls._get_metrics().query(dt1, dt2, group_by, filters, percentiles)
+
+    @classmethod
+    def _get_classifier(cls, settings: LoggerSettings) -> LogClassifier:
+        source = settings.log_level_keywords
+        current_source, classifier = cls._classifier_state
+        if source == current_source:
+            return classifier
+        try:
+            keywords = parse_level_keywords(source)
+        except ValueError as e:
+            print(f"Invalid log_level_keywords, using the default keywords: {e}")
+            keywords = None
+        classifier = LogClassifier(keywords) if keywords else DEFAULT_CLASSIFIER
+        cls._classifier_state = (source, classifier)
+        return classifier
+
+    @classmethod
+    def log(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+            level: Optional[str] = None, **fields):
+        """
+        Log a message. Its level is inferred from keywords unless `level` is given.
+
+        Extra keyword arguments are stored as structured fields: written to the file in
+        the 'jsonl' `log_format` and included in URL notifications.
+        """
+        cls._log(message, level, telegram, slack, url_notification, 3, fields)
+
+    @classmethod
+    def error(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+              **fields):
+        """
+        Log a message as an error without scanning it for keywords.
+        """
+        cls._log(message, 'error', telegram, slack, url_notification, 3, fields)
+
+    @classmethod
+    def warning(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+                **fields):
+        """
+        Log a message as a warning without scanning it for keywords.
+        """
+        cls._log(message, 'warning', telegram, slack, url_notification, 3, fields)
+
+    @classmethod
+    async def alog(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False,
+                   level: Optional[str] = None, **fields):
+        """
+        Log a message from a coroutine without blocking the event loop.
+
+        The entry is built on the loop, with processing_time measured per asyncio task. With
+        `log_async` it is handed to the writer thread like log() entries; if the queue is full
+        under the 'block' backpressure policy, only this coroutine waits. Otherwise the file,
+        database and notification I/O runs in the loop's default executor and alog() returns
+        once the entry is written, so entries keep their order with those of log().
+        """
+        await cls._alog(message, level, telegram, slack, url_notification, 3, fields)
 
-        # Filter logs between t1 and t2
-        mask = (all_logs_df['timestamp'] >= dt1) & (all_logs_df['timestamp'] <= dt2)
-        filtered_logs_df = all_logs_df.loc[mask].reset_index(drop=True)
+    @classmethod
+    async def _alog(cls, message, level: Optional[str], telegram: bool, slack: bool, url_notification: bool,
+                    depth: int, fields: Optional[dict] = None):
+        settings = cls._get_settings()
+        if not settings.log_debug_mode:
+            return
+        if settings.log_sampling and level != 'error':
+            keep, level = cls._sample(settings, message, level, depth + 1)
+            for summary in cls._sampling_summaries(settings):
+                await cls._asubmit(settings, (summary, False, False, False))
+            if not keep:
+                return
+        await cls._asubmit(
+            settings,
+            (cls._build_entry(settings, message, level, depth + 1, fields), telegram, slack, url_notification)
+        )
+
+    @classmethod
+    async def _asubmit(cls, settings: LoggerSettings, item) -> None:
+        loop = asyncio.get_running_loop()
+        writer = cls._get_async_writer() if settings.log_async else None
+        if writer is None:
+            await loop.run_in_executor(None, cls._handle_queued_entry, item)
+        elif not writer.submit(item, block=False) and writer.backpressure == 'block':
+            await loop.run_in_executor(None, writer.submit, item)
 
-        return filtered_logs_df
+    @classmethod
+    def _build_entry(cls, settings: LoggerSettings, message, level: Optional[str], depth: int,
+                     fields: Optional[dict] = None) -> BBLogEntry:
+        log_type = level or cls._get_classifier(settings).classify(message)
+
+        # processing_time is the time since the previous log() of this thread or asyncio task.
+        now = datetime.now()
+        last_log_time = cls._last_log_time.get()
+        cls._last_log_time.set(now)
+        cls._last_time = now
+
+        code_location = cls._get_code_location(settings, depth)
+
+        return BBLogEntry(
+            process=cls._get_process_name(),
+            timestamp=now.strftime('%Y%m%d%H%M%S'),
+            log_type=log_type,
+            message=message,
+            processing_time=str((now - last_log_time).total_seconds()) if last_log_time else '0',
+            code_location=code_location,
+            delimiter=settings.log_delimiter,
+            fields=fields or None
+        )
 
-        
     @classmethod
-    def log(cls, message, telegram: bool = False, slack: bool = False, url_notification: bool = False):
-        if cls._normalize_bool(cls._get_config('log_debug_mode')):
+    def _log(cls, message, level: Optional[str], telegram: bool, slack: bool, url_notification: bool, depth: int,
+             fields: Optional[dict] = None):
+        settings = cls._get_settings()
+        if settings.log_debug_mode:
+            if settings.log_sampling and level != 'error':
+                keep, level = cls._sample(settings, message, level, depth + 1)
+                for summary in cls._sampling_summaries(settings):
+                    cls._submit(settings, (summary, False, False, False))
+                if not keep:
+                    return
+
+            log_entry = cls._build_entry(settings, message, level, depth + 1, fields)
+            cls._submit(settings, (log_entry, telegram, slack, url_notification))
 
-            def is_error_message(message):
-                error_pattern = re.compile(r'\b(error|errors|exception|exceptions|failed|missing)\b', re.IGNORECASE)
-                return bool(error_pattern.search(message))
+    @classmethod
+    def _submit(cls, settings: LoggerSettings, item) -> None:
+        if settings.log_async:
+            writer = cls._get_async_writer()
+            if writer is not None:
+                writer.submit(item)
+                return
+        cls._handle_queued_entry(item)
 
-            def is_warning_message(message):
-                warning_pattern = re.compile(r'\b(warning|aware|careful)\b', re.IGNORECASE)
-                return bool(warning_pattern.search(message))
+    @classmethod
+    def _get_sampler(cls, settings: LoggerSettings) -> Optional[LogSampler]:
+        sampler_settings = (
+            settings.log_sampling,
+            settings.log_sampling_every_n,
+            settings.log_sampling_probability,
+            settings.log_sampling_rate_per_s,
+            settings.log_sampling_burst,
+            settings.log_sampling_summary_interval_ms
+        )
+        current_settings, sampler = cls._sampler_state
+        if sampler_settings == current_settings:
+            return sampler
+        try:
+            sampler = LogSampler(*sampler_settings)
+        except (TypeError, ValueError) as e:
+            print(f"Invalid log_sampling settings, logging every entry: {e}")
+            sampler = None
+        cls._sampler_state = (sampler_settings, sampler)
+        return sampler
 
-            log_type = 'error' if is_error_message(message) else 'warning' if is_warning_message(message) else 'message'
+    @classmethod
+    def _sample(cls, settings: LoggerSettings, message, level: Optional[str], depth: int) -> Tuple[bool, Optional[str]]:
+        """
+        Apply `log_sampling` to a call before its entry is built.
 
-            cls._delta = datetime.now() - cls._last_time if cls._last_time else None
-            cls._last_time = datetime.now()
-            current_date = cls._last_time.strftime('%Y_%m_%d')
+        The call site is the frame `depth - 1` levels above this method. An unlabelled
+        message is only classified once its call site's sample rejects it, so that errors
+        are always kept.
 
-            stack = traceback.extract_stack()
-            caller = stack[-2] if len(stack) >= 2 else None
-            code_location = f"{os.path.basename(caller.filename)}:{caller.lineno}" if caller else 'Unknown'
+        :return: Whether to log the entry, and its level if it had to be classified.
+        """
+        sampler = cls._get_sampler(settings)
+        if sampler is None:
+            return True, level
+        frame = sys._getframe(depth - 1)
+        code = frame.f_code
+        site = (code.co_filename, code.co_firstlineno, frame.f_lineno)
+        if sampler.allow(site):
+            return True, level
+        log_type = level or cls._get_classifier(settings).classify(message)
+        if log_type == 'error':
+            return True, log_type
+        sampler.suppress(site, message)
+        return False, log_type
 
-            log_entry = BBLogEntry(
+    @classmethod
+    def _sampling_summaries(cls, settings: LoggerSettings, force: bool = False) -> List[BBLogEntry]:
+        """
+        Build one 'N similar messages suppressed' entry per call site that had entries
+        dropped by sampling, at most once per `log_sampling_summary_interval_ms`.
+        """
+        sampler = cls._sampler_state[1]
+        if sampler is None or not sampler.pending:
+            return []
+        summaries = []
+        for location, count, seconds, last_message in sampler.due_summaries(force):
+            last_message = str(last_message)
+            if len(last_message) > 200:
+                last_message = last_message[:197] + '...'
+            summaries.append(BBLogEntry(
                 process=cls._get_process_name(),
-                timestamp=cls._last_time.strftime('%Y%m%d%H%M%S'),
-                log_type=log_type,
-                message=message,
-                processing_time=str(cls._delta.total_seconds()) if cls._delta else '0',
-                code_location=code_location
-            )
+                timestamp=datetime.now().strftime('%Y%m%d%H%M%S'),
+                log_type='message',
+                message=f"{count} similar messages suppressed at {location} in the last {seconds:.1f}s "
+                        f"(last: {last_message})",
+                processing_time='0',
+                code_location=location,
+                delimiter=settings.log_delimiter,
+                fields={'suppressed': count}
+            ))
+        return summaries
 
-            if cls._normalize_bool(cls._get_config('log_enable_files')):
-                cls._write_to_log_file(log_entry)
+    @classmethod
+    def _flush_sampling_summaries(cls) -> None:
+        settings = cls._get_settings()
+        for summary in cls._sampling_summaries(settings, force=True):
+            cls._submit(settings, (summary, False, False, False))
 
-            if cls._normalize_bool(cls._get_config('log_enable_terminal_output')):
-                cls._safe_print(log_entry)
+    @classmethod
+    def _dispatch(cls, log_entry: BBLogEntry, telegram: bool = False, slack: bool = False, url_notification: bool = False):
+        """
+        Hand a fully built log entry to every enabled sink.
+        Runs on the caller's thread in synchronous mode and on the writer thread in async mode.
+        """
+        settings = cls._get_settings()
+        if settings.log_enable_files:
+            cls._write_to_log_file(log_entry)
+
+        if settings.log_enable_terminal_output:
+            cls._safe_print(log_entry)
+
+        if settings.log_enable_database:
+            cls._write_to_database(log_entry)
+
+        if settings.log_metrics:
+            cls._record_metrics(log_entry)
+
+        if telegram:
+            cls._notify('telegram', '', log_entry, cls._deliver_telegram)
+        if slack:
+            slack_url = settings.log_notification_slack
+            if slack_url:
+                cls._notify('slack', slack_url, log_entry, partial(cls._deliver_slack, slack_url))
+        if url_notification:
+            url = settings.log_notification_url
+            if url:
+                cls._notify('url', url, log_entry, partial(cls._deliver_webhook, url))
+
+    @classmethod
+    def _get_notifier(cls) -> NotificationDispatcher:
+        settings = cls._get_settings()
+        notifier_settings = (
+            settings.log_notification_timeout_ms,
+            settings.log_notification_retries,
+            settings.log_notification_backoff_ms,
+            settings.log_notification_rate_limit,
+            settings.log_notification_batch_interval_ms,
+            settings.log_notification_max_batch,
+            settings.log_notification_queue_size
+        )
+        notifier = cls._notifier
+        if notifier is not None and cls._notifier_settings == notifier_settings:
+            return notifier
+        with cls._sink_lock:
+            if cls._notifier is None or cls._notifier_settings != notifier_settings:
+                previous = cls._notifier
+                cls._notifier = NotificationDispatcher(*notifier_settings)
+                cls._notifier_settings = notifier_settings
+                if previous is not None:
+                    # Let the old workers deliver what they hold without blocking the caller.
+                    threading.Thread(target=previous.shutdown, daemon=True).start()
+                cls._register_atexit()
+            return cls._notifier
+
+    @classmethod
+    def _notify(cls, channel: str, destination: str, log_entry: BBLogEntry, deliver) -> None:
+        """
+        Hand a notification to the dispatcher. In `log_notification_async` mode (the default)
+        this returns immediately and the entry is delivered, possibly batched with others,
+        by the channel's worker thread.
+        """
+        notifier = cls._get_notifier()
+        if cls._get_settings().log_notification_async:
+            notifier.submit(channel, destination, log_entry, deliver)
+        else:
+            notifier.send(channel, destination, [log_entry], deliver)
+
+    @classmethod
+    def _deliver_webhook(cls, url: str, session: requests.Session, entries: List[BBLogEntry], timeout: float) -> None:
+        # A single entry keeps the original payload; a coalesced burst is sent as one list.
+        # Each entry's JSON is cached on the entry, so retries do not serialize it again.
+        if len(entries) == 1:
+            payload = entries[0].to_json()
+        else:
+            payload = f'{{"count": {len(entries)}, "entries": [{", ".join(entry.to_json() for entry in entries)}]}}'
+        response = session.post(url, data=payload.encode('utf-8'), headers={'Content-Type': 'application/json'},
+                                timeout=timeout)
+        response.raise_for_status()
+
+    @classmethod
+    def _deliver_slack(cls, url: str, session: requests.Session, entries: List[BBLogEntry], timeout: float) -> None:
+        response = session.post(url, json={'text': cls._notification_text(entries)}, timeout=timeout)
+        response.raise_for_status()
+
+    @classmethod
+    def _deliver_telegram(cls, session: requests.Session, entries: List[BBLogEntry], timeout: float) -> None:
+        Notifications.send_telegram_message(message=cls._notification_text(entries), session=session, timeout=timeout)
+
+    @classmethod
+    def _notification_text(cls, entries: List[BBLogEntry], limit: int = 4000) -> str:
+        if len(entries) == 1:
+            text = str(entries[0])
+        else:
+            text = f"{len(entries)} log entries:\n" + "\n".join(str(entry) for entry in entries)
+        return text if len(text) <= limit else text[:limit - 3] + '...'
 
-            if cls._normalize_bool(cls._get_config('log_enable_database')):
-                cls._initialize_database()
-                cls._write_to_database(log_entry)
+    @classmethod
+    def _handle_queued_entry(cls, item):
+        log_entry, telegram, slack, url_notification = item
+        cls._dispatch(log_entry, telegram, slack, url_notification)
 
-            def send_notification(url, log_entry):
+    @classmethod
+    def _get_async_writer(cls) -> Optional[AsyncLogWriter]:
+        writer = cls._async_writer
+        if writer is not None and writer.is_alive():
+            return writer
+        settings = cls._get_settings()
+        with cls._async_lock:
+            if cls._async_writer is None or not cls._async_writer.is_alive():
                 try:
-                    response = requests.post(url, json=log_entry.__dict__)
-                    response.raise_for_status()
-                except requests.RequestException as e:
-                    print(f"Failed to send log to {url}: {e}")
-
-            if telegram:
-                Notifications.send_telegram_message(message=str(log_entry))
-            if slack:
-                slack_url = cls._get_config('log_notification_slack')
-                if slack_url:
-                    send_notification(slack_url, log_entry)
-            if url_notification:
-                url = cls._get_config('log_notification_url')
-                if url:
-                    send_notification(url, log_entry)
+                    cls._async_writer = AsyncLogWriter(
+                        cls._handle_queued_entry,
+                        max_size=settings.log_async_queue_size or 10000,
+                        backpressure=settings.log_async_backpressure or 'block'
+                    )
+                except ValueError as e:
+                    print(f"Failed to start async log writer, logging synchronously: {e}")
+                    return None
+                cls._register_atexit()
+            return cls._async_writer
+
+    @classmethod
+    def _register_atexit(cls):
+        if not cls._atexit_registered:
+            atexit.register(cls.shutdown)
+            cls._atexit_registered = True
+
+    @classmethod
+    def _flush_sinks(cls):
+        file_sink = cls._file_sink
+        if file_sink is not None:
+            try:
+                file_sink.flush()
+            except IOError as e:
+                print(f'Failed to write to log file: {e}')
+        sink = cls._sqlite_sink
+        if sink is not None:
+            try:
+                sink.flush()
+            except sqlite3.Error as e:
+                print(f'Failed to write to database: {e}')
+        metrics = cls._metrics
+        if metrics is not None:
+            try:
+                metrics.flush()
+            except sqlite3.Error as e:
+                print(f'Failed to write log metrics: {e}')
+
+    @classmethod
+    def _close_sinks(cls):
+        with cls._sink_lock:
+            file_sink = cls._file_sink
+            cls._file_sink = None
+            sink = cls._sqlite_sink
+            cls._sqlite_sink = None
+            metrics = cls._metrics
+            cls._metrics = None
+        if file_sink is not None:
+            try:
+                file_sink.close()
+            except IOError as e:
+                print(f'Failed to write to log file: {e}')
+        if sink is not None:
+            try:
+                sink.close()
+            except sqlite3.Error as e:
+                print(f'Failed to write to database: {e}')
+        if metrics is not None:
+            try:
+                metrics.close()
+            except sqlite3.Error as e:
+                print(f'Failed to write log metrics: {e}')
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Log the pending sampling summaries, block until every entry queued in async mode
+        has been written to its sinks, then push any rows buffered by the sinks to disk
+        and send pending notifications.
+
+        :param timeout: Maximum number of seconds to wait. Waits indefinitely if None.
+        :return: True if the queues were drained, False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        cls._flush_sampling_summaries()
+        writer = cls._async_writer
+        drained = writer.flush(timeout) if writer is not None else True
+        cls._flush_sinks()
+        notifier = cls._notifier
+        if notifier is not None:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            drained = notifier.flush(remaining) and drained
+        return drained
+
+    @classmethod
+    def shutdown(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Drain the async queue, stop the writer thread, close the sinks, wait for
+        background compression of rotated segments and stop the read pool. Registered with atexit the first
+        time a writer or sink is created; later `log()` calls start them again on demand.
+
+        :param timeout: Maximum number of seconds to wait. Waits indefinitely if None.
+        :return: True if the writer thread stopped within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        cls._flush_sampling_summaries()
+        with cls._async_lock:
+            writer = cls._async_writer
+            cls._async_writer = None
+        stopped = writer.shutdown(timeout) if writer is not None else True
+        cls._close_sinks()
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        stopped = LogRotation.join(remaining) and stopped
+        notifier = cls._notifier
+        cls._notifier = None
+        if notifier is not None:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            stopped = notifier.shutdown(remaining) and stopped
+        read_pool = cls._read_pool
+        cls._read_pool = None
+        if read_pool is not None:
+            read_pool.shutdown()
+        return stopped
+
+    @classmethod
+    def get_async_stats(cls) -> dict:
+        """
+        Counters of the async writer: enqueued, written, failed, dropped_oldest,
+        dropped_newest, dropped and pending entries. All zero if async mode never started.
+        """
+        writer = cls._async_writer
+        if writer is None:
+            return {
+                'enqueued': 0,
+                'written': 0,
+                'failed': 0,
+                'dropped_oldest': 0,
+                'dropped_newest': 0,
+                'dropped': 0,
+                'pending': 0,
+            }
+        return writer.stats()
+
+    @classmethod
+    def get_notification_stats(cls) -> dict:
+        """
+        Counters of the notification dispatcher per channel ('telegram', 'slack', 'url'):
+        submitted, delivered, messages, failed, dropped, retries and pending entries.
+        """
+        notifier = cls._notifier
+        return notifier.stats() if notifier is not None else {}
+
+    @classmethod
+    def get_sampling_stats(cls) -> dict:
+        """
+        Counters of `log_sampling`: mode, call_sites seen, passed and suppressed entries.
+        Empty if sampling is off.
+        """
+        sampler = cls._sampler_state[1]
+        return sampler.stats() if sampler is not None else {}
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # The writer thread does not survive fork(); the child starts its own on demand.
+        # Sinks detect the new pid themselves and reopen their handles.
+        cls._async_writer = None
+        cls._notifier = None
+        # Pool workers belong to the parent; the child starts its own pool on demand.
+        cls._read_pool = None
+        # The parent reports what it suppressed; the child samples from scratch.
+        cls._sampler_state = (None, None)
+        cls._async_lock = threading.Lock()
+        cls._sink_lock = threading.Lock()
+        LogRotation.reset_after_fork()
+
+
+def _invalidate_config_on_override():
+    override = BBConfig.override
+    if getattr(override, '_invalidates_bblogger_config', False):
+        return
+
+    def override_and_invalidate(*args, **kwargs):
+        result = override(*args, **kwargs)
+        BBLogger.invalidate_config()
+        return result
+
+    override_and_invalidate._invalidates_bblogger_config = True
+    BBConfig.override = staticmethod(override_and_invalidate)
+
+
+_invalidate_config_on_override()
+
+if hasattr(os, 'register_at_fork'):
+    # Flushing first keeps buffered rows from being written twice by parent and child.
+    os.register_at_fork(before=BBLogger._flush_sinks, after_in_child=BBLogger._reset_after_fork)
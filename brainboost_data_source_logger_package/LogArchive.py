@@ -0,0 +1,146 @@
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from brainboost_data_source_logger_package.LogIndex import INDEX_SUFFIX, LogIndex
+from brainboost_data_source_logger_package.LogReader import LogReader
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+
+try:
+    import pyarrow  # noqa: F401
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pq = None
+
+
+class LogArchive:
+    """
+    Columnar (Parquet) archives of closed daily log files.
+
+    Archived days keep their CSV file name with a `.parquet` extension and are
+    picked up transparently by the BBLogger read APIs.
+    """
+
+    ARCHIVE_SUFFIX = '.parquet'
+    CATEGORICAL_COLUMNS = ('log_type', 'process')
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether the optional columnar dependency (pyarrow) is installed."""
+        return pq is not None
+
+    @classmethod
+    def _require_pyarrow(cls) -> None:
+        if pq is None:
+            raise ImportError(
+                "Columnar log archives require pyarrow. "
+                "Install it with: pip install 'brainboost_data_source_logger_package[parquet]'"
+            )
+
+    @classmethod
+    def archive_path_for(cls, log_file_path: str) -> str:
+        return os.path.splitext(log_file_path)[0] + cls.ARCHIVE_SUFFIX
+
+    @classmethod
+    def compact(cls, log_file_path: str, columns: Sequence[str], delimiter: str = ',', remove_source: bool = True,
+                shard_paths: Sequence[str] = ()) -> str:
+        """
+        Convert a closed CSV or JSON Lines day file to Parquet with a datetime `timestamp`, categorical
+        `log_type`/`process` and a float `processing_time`.
+
+        Per-process shards and rotated (possibly compressed) segments of the same day are
+        merged into the archive in timestamp order; `log_file_path` itself may be missing
+        if only shards or segments exist.
+
+        The archive is written to a temporary file and moved into place atomically. The
+        source files and their indexes are removed only after the row counts match.
+
+        :return: Path of the archive file.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        cls._require_pyarrow()
+        columns = list(columns)
+        sources = [path for path in [log_file_path, *shard_paths] if os.path.exists(path)]
+        frames = [cls._read_source(path, columns, delimiter) for path in sources]
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        if len(frames) > 1 and 'timestamp' in df.columns:
+            df = df.sort_values('timestamp', kind='stable', ignore_index=True)
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y%m%d%H%M%S', errors='coerce')
+        if 'processing_time' in df.columns:
+            df['processing_time'] = pd.to_numeric(df['processing_time'], errors='coerce').astype('float64')
+        for column in cls.CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+
+        archive_path = cls.archive_path_for(log_file_path)
+        tmp_path = archive_path + '.tmp'
+        df.to_parquet(tmp_path, engine='pyarrow', index=False)
+        if cls.count_rows(tmp_path) != len(df):
+            os.remove(tmp_path)
+            raise IOError(f"Archive row count mismatch for {log_file_path}")
+        os.replace(tmp_path, archive_path)
+
+        if remove_source:
+            for path in sources:
+                os.remove(path)
+                if os.path.exists(path + INDEX_SUFFIX):
+                    os.remove(path + INDEX_SUFFIX)
+                LogIndex.forget(path)
+        return archive_path
+
+    @classmethod
+    def _read_source(cls, log_file_path: str, columns: List[str], delimiter: str) -> pd.DataFrame:
+        if LogReader.file_format(log_file_path) == 'jsonl':
+            # Extra fields of JSON Lines records are kept as extra columns.
+            return LogReader.raw_frame(list(LogReader.iter_log_file(log_file_path, columns, delimiter)), columns)
+        with LogRotation.open_binary(log_file_path) as f:
+            has_header = f.readline().decode('utf-8').rstrip('\r\n') == delimiter.join(columns)
+        return pd.read_csv(
+            log_file_path,
+            delimiter=delimiter,
+            quotechar="'",
+            encoding='utf-8',
+            header=0 if has_header else None,
+            names=None if has_header else columns,
+            dtype=str,
+            keep_default_na=False
+        )
+
+    @classmethod
+    def count_rows(cls, archive_path: str) -> int:
+        """Row count from the Parquet footer, without reading any data."""
+        cls._require_pyarrow()
+        return pq.ParquetFile(archive_path).metadata.num_rows
+
+    @classmethod
+    def read(cls, archive_path: str, columns: Optional[List[str]] = None, start: Optional[datetime] = None,
+             end: Optional[datetime] = None, filters: Optional[list] = None) -> pd.DataFrame:
+        """
+        Read an archive with column projection and predicate pushdown. `start`/`end`
+        bound `timestamp` inclusively; `filters` uses the pyarrow DNF filter syntax.
+        """
+        cls._require_pyarrow()
+        predicates = list(filters or [])
+        if start is not None:
+            predicates.append(('timestamp', '>=', pd.Timestamp(start)))
+        if end is not None:
+            predicates.append(('timestamp', '<=', pd.Timestamp(end)))
+        return pd.read_parquet(archive_path, engine='pyarrow', columns=columns, filters=predicates or None)
+
+    @classmethod
+    def iter_frames(cls, archive_path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+        """Stream an archive as DataFrames of at most `batch_size` rows."""
+        cls._require_pyarrow()
+        for batch in pq.ParquetFile(archive_path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+
+    @classmethod
+    def frame_to_rows(cls, df: pd.DataFrame) -> Iterator[List[str]]:
+        """Render archived rows back into the string form used by the CSV log files."""
+        if 'timestamp' in df.columns:
+            df = df.assign(timestamp=df['timestamp'].dt.strftime('%Y%m%d%H%M%S'))
+        for row in df.itertuples(index=False, name=None):
+            yield ['' if pd.isna(value) else str(value) for value in row]
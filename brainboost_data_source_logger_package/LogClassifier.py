@@ -0,0 +1,101 @@
+import json
+import re
+from typing import Dict, Optional, Union
+
+DEFAULT_LEVEL = 'message'
+
+# Levels listed here win over any level further down; unknown custom levels rank after them.
+LEVEL_PRIORITY = ('error', 'warning')
+
+DEFAULT_LEVEL_KEYWORDS = {
+    'error': 'error',
+    'errors': 'error',
+    'exception': 'error',
+    'exceptions': 'error',
+    'failed': 'error',
+    'missing': 'error',
+    'warning': 'warning',
+    'aware': 'warning',
+    'careful': 'warning',
+}
+
+
+def _compile_keywords(keywords) -> re.Pattern:
+    # Longest first so that e.g. 'errors' is preferred over 'error' at the same position.
+    alternatives = sorted((re.escape(keyword) for keyword in keywords), key=len, reverse=True)
+    return re.compile(r'\b(' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+
+
+_DEFAULT_PATTERN = _compile_keywords(DEFAULT_LEVEL_KEYWORDS)
+
+
+def parse_level_keywords(value: Union[None, str, Dict[str, str]]) -> Dict[str, str]:
+    """
+    Parse a keyword→level table from config.
+
+    Accepts a dict, a JSON object string, or a comma-separated string of
+    `keyword=level` (or `keyword:level`) pairs.
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return {str(k).strip().lower(): str(v).strip().lower() for k, v in value.items() if str(k).strip()}
+    text = str(value).strip()
+    if text.startswith('{'):
+        return parse_level_keywords(json.loads(text))
+    table = {}
+    for pair in text.split(','):
+        separator = '=' if '=' in pair else ':'
+        if separator not in pair:
+            raise ValueError(f"Invalid keyword mapping: {pair!r}. Expected 'keyword=level'.")
+        keyword, level = pair.split(separator, 1)
+        if keyword.strip():
+            table[keyword.strip().lower()] = level.strip().lower()
+    return table
+
+
+class LogClassifier:
+    """
+    Assign a log level to a message by keyword, scanning it once with a single
+    precompiled pattern. The highest-priority level found wins; messages without
+    any keyword get DEFAULT_LEVEL.
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, str]] = None):
+        if keywords:
+            self.keywords = dict(DEFAULT_LEVEL_KEYWORDS)
+            self.keywords.update({k.lower(): v for k, v in keywords.items()})
+            self._pattern = _compile_keywords(self.keywords)
+        else:
+            self.keywords = DEFAULT_LEVEL_KEYWORDS
+            self._pattern = _DEFAULT_PATTERN
+        levels = set(self.keywords.values())
+        self._ranks = {level: self._rank(level) for level in levels}
+        self._top_level = min(levels, key=self._ranks.get) if levels else DEFAULT_LEVEL
+
+    @staticmethod
+    def _rank(level: str) -> int:
+        if level == DEFAULT_LEVEL:
+            return len(LEVEL_PRIORITY) + 1
+        try:
+            return LEVEL_PRIORITY.index(level)
+        except ValueError:
+            return len(LEVEL_PRIORITY)
+
+    def classify(self, message) -> str:
+        if not isinstance(message, str):
+            message = str(message)
+        best_level = DEFAULT_LEVEL
+        best_rank = self._rank(DEFAULT_LEVEL)
+        keywords = self.keywords
+        for match in self._pattern.finditer(message):
+            level = keywords[match.group(1).lower()]
+            if level == self._top_level:
+                return level
+            rank = self._ranks[level]
+            if rank < best_rank:
+                best_level, best_rank = level, rank
+        return best_level
+
+
+DEFAULT_CLASSIFIER = LogClassifier()
@@ -0,0 +1,256 @@
+import csv
+import io
+import os
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+from brainboost_data_source_logger_package.LogIndex import LOG_FORMATS, LogIndex, detect_format
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+
+
+class LogFileSink:
+    """
+    Keeps the current log file open across `log()` calls.
+
+    The handle is reopened only when the target path changes (daily rollover or a
+    new per-run name). Rows are encoded once and appended through a buffered
+    binary handle; `flush_policy` controls when the buffer is pushed to the OS:
+
+    - 'line': after every row.
+    - 'count': every `flush_every` rows.
+    - 'interval': when `flush_interval_ms` has elapsed since the last flush.
+    - 'error': only when an error-level entry is written.
+
+    Buffered rows are always flushed on rollover, `flush()` and `close()`.
+
+    `log_format` is 'csv' (rows encoded here, after a header row) or 'jsonl' (one
+    JSON object per line, encoded by the caller and passed as `data`). A file
+    already holding the other format is continued in a new segment instead.
+
+    With `index_stride`, the sink also maintains the file's LogIndex as it
+    appends. If another process appends to the same file the index is dropped
+    and readers rebuild it lazily.
+
+    With `rotate_bytes`, a file is continued in a new size segment (see
+    LogRotation) once it reaches that many bytes; `on_segment_closed` is called
+    with the path of every file the sink stops writing to. Several processes may
+    share the segments: before every row the sink moves on to the latest segment
+    if another process rotated past its own, or if its segment was compressed or
+    deleted, so closed segments no longer receive rows.
+    """
+
+    FLUSH_POLICIES = ('line', 'count', 'interval', 'error')
+
+    def __init__(self, columns: Sequence[str], delimiter: str = ',', buffer_size: int = 65536,
+                 flush_policy: str = 'line', flush_every: int = 100, flush_interval_ms: int = 1000,
+                 index_stride: int = 0, rotate_bytes: int = 0,
+                 on_segment_closed: Optional[Callable[[str], None]] = None, log_format: str = 'csv'):
+        flush_policy = str(flush_policy or 'line').lower()
+        if flush_policy not in self.FLUSH_POLICIES:
+            raise ValueError(
+                f"Invalid flush policy: {flush_policy}. Expected one of {', '.join(self.FLUSH_POLICIES)}."
+            )
+        log_format = str(log_format or 'csv').lower()
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Invalid log format: {log_format}. Expected one of {', '.join(LOG_FORMATS)}.")
+        self.log_format = log_format
+        self.columns = list(columns)
+        self.delimiter = delimiter
+        self.buffer_size = max(0, int(buffer_size))
+        self.flush_policy = flush_policy
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval = max(0, int(flush_interval_ms)) / 1000.0
+        self.index_stride = max(0, int(index_stride))
+        self.rotate_bytes = max(0, int(rotate_bytes))
+        self.on_segment_closed = on_segment_closed
+        self._index: Optional[LogIndex] = None
+        self._row_buffer = io.StringIO()
+        self._csv_writer = csv.writer(
+            self._row_buffer,
+            delimiter=delimiter,
+            quotechar="'",
+            quoting=csv.QUOTE_MINIMAL
+        )
+        self._lock = threading.RLock()
+        self._file = None
+        self._pid: Optional[int] = None
+        self._last_flush = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+        self.path: Optional[str] = None
+        # The path requested by the caller; `path` may be one of its size segments.
+        self.base_path: Optional[str] = None
+        # Size segment of `base_path` that `path` is.
+        self.sequence = 0
+        self.offset = 0
+        self.pending = 0
+        self.rows_written = 0
+
+    def encode_row(self, row: Sequence) -> bytes:
+        self._csv_writer.writerow(row)
+        data = self._row_buffer.getvalue()
+        self._row_buffer.seek(0)
+        self._row_buffer.truncate()
+        return data.encode('utf-8')
+
+    def _open_segment(self, base_path: str) -> None:
+        """
+        Open the segment of `base_path` to append to: its last size segment, or the next
+        one if that is full, already compressed or written in the other format.
+        """
+        sequence, latest = LogRotation.latest_segment(base_path)
+        if latest is not None and (LogRotation.is_compressed(latest)
+                                   or (self.rotate_bytes and os.path.getsize(latest) >= self.rotate_bytes)
+                                   or self._holds_other_format(latest)):
+            sequence += 1
+        self._open(LogRotation.segment_path(base_path, sequence))
+        self.base_path = base_path
+        self.sequence = sequence
+
+    def _holds_other_format(self, path: str) -> bool:
+        try:
+            with open(path, 'rb') as log_file:
+                log_format = detect_format(log_file)
+        except OSError:
+            return False
+        return log_format is not None and log_format != self.log_format
+
+    def _rotate(self) -> None:
+        sequence, _ = LogRotation.latest_segment(self.base_path)
+        self._open(LogRotation.segment_path(self.base_path, sequence + 1))
+        self.sequence = sequence + 1
+
+    def _is_closed_segment(self, stat: os.stat_result) -> bool:
+        """Whether the open file was removed (compressed or deleted) or another writer rotated past it."""
+        if stat.st_nlink == 0:
+            return True
+        next_segment = LogRotation.segment_path(self.base_path, self.sequence + 1)
+        return bool(self.rotate_bytes) and os.path.exists(next_segment)
+
+    def _open(self, path: str) -> None:
+        base_path = self.base_path
+        closed_path = self.path if self._pid == os.getpid() else None
+        self._close_file()
+        self.base_path = base_path
+        if closed_path and closed_path != path and self.on_segment_closed is not None:
+            self.on_segment_closed(closed_path)
+        dir_path = os.path.dirname(path)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path, exist_ok=True)
+        # Only the process that creates the file writes its header, so concurrent
+        # writers opening a new day file cannot each add one.
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o666)
+            is_new_file = True
+        except FileExistsError:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+            is_new_file = False
+        # buffering=0 means unbuffered; anything else is the buffer size in bytes.
+        self._file = os.fdopen(fd, 'ab', buffering=self.buffer_size or 0)
+        self._pid = os.getpid()
+        self.path = path
+        self.offset = os.fstat(fd).st_size
+        if is_new_file and self.log_format == 'csv':
+            header = self.encode_row(self.columns)
+            self._file.write(header)
+            self.offset += len(header)
+            self._file.flush()
+        self._last_flush = time.monotonic()
+        self._index = self._open_index(path, is_new_file) if self.index_stride else None
+
+    def _open_index(self, path: str, is_new_file: bool) -> Optional[LogIndex]:
+        index = LogIndex.shared(path, self.columns, self.delimiter, self.index_stride)
+        if is_new_file:
+            index.start_new_file(self.offset, self.log_format == 'csv', self.log_format)
+            return index
+        if not os.path.exists(index.index_path):
+            # Legacy file without an index: readers build it lazily instead of stalling log().
+            return None
+        try:
+            index.refresh()
+        except OSError:
+            return None
+        return index if index.tail_offset == self.offset else None
+
+    def write(self, path: str, row: Sequence, log_type: Optional[str] = None, data: Optional[bytes] = None) -> int:
+        """
+        Append a row to `path`, reopening the handle if the path changed.
+
+        :param data: The row already encoded as one line; required in 'jsonl' format.
+        :return: The byte offset at which the row starts.
+        """
+        with self._lock:
+            if self._file is None or path != self.base_path or self._pid != os.getpid():
+                self._open_segment(path)
+            else:
+                # The file's size includes rows other processes appended; `offset` includes our buffered rows.
+                stat = os.fstat(self._file.fileno())
+                if self._is_closed_segment(stat):
+                    self._open_segment(path)
+                elif self.rotate_bytes and max(self.offset, stat.st_size) >= self.rotate_bytes:
+                    self._rotate()
+            if data is None:
+                data = self.encode_row(row)
+            row_offset = self.offset
+            self._file.write(data)
+            self.offset += len(data)
+            if self._index is not None:
+                self._index.record(row_offset, self.offset)
+            self.pending += 1
+            self.rows_written += 1
+            if self._should_flush(log_type):
+                self._flush_locked()
+            elif self.flush_policy == 'interval' and self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return row_offset
+
+    def _should_flush(self, log_type: Optional[str]) -> bool:
+        if self.flush_policy == 'line':
+            return True
+        if self.flush_policy == 'count':
+            return self.pending >= self.flush_every
+        if self.flush_policy == 'interval':
+            return time.monotonic() - self._last_flush >= self.flush_interval
+        return log_type == 'error'
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            if self._timer is not threading.current_thread():
+                self._timer.cancel()
+            self._timer = None
+        if self._file is not None and self._pid == os.getpid():
+            self._file.flush()
+            if self._index is not None:
+                if os.fstat(self._file.fileno()).st_size != self.offset:
+                    # Another process appended to this file; our row numbers are no longer valid.
+                    self._index.invalidate()
+                    self._index = None
+                else:
+                    self._index.flush()
+        self.pending = 0
+        self._last_flush = time.monotonic()
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if self._pid == os.getpid():
+                self._flush_locked()
+                self._file.close()
+        finally:
+            self._file = None
+            self._index = None
+            self.path = None
+            self.base_path = None
+            self.sequence = 0
+            self.pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_file()
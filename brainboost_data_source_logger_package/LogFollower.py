@@ -0,0 +1,227 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from brainboost_data_source_logger_package.LogIndex import iter_log_rows
+from brainboost_data_source_logger_package.LogReader import LogReader
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+
+
+class _DirectoryWatch:
+    """Linux inotify watch on one directory, through libc, signalling any file change in it."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    _libc = None
+
+    def __init__(self, directory: str):
+        libc = self._load_libc()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        return sys.platform.startswith('linux') and cls._load_libc() is not None
+
+    @classmethod
+    def _load_libc(cls):
+        if cls._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+                cls._libc = libc if hasattr(libc, 'inotify_init1') and hasattr(libc, 'inotify_add_watch') else False
+            except (OSError, AttributeError):
+                cls._libc = False
+        return cls._libc or None
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a change is signalled or `timeout` seconds pass. Returns True on a change."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            self.drain()
+        return bool(ready)
+
+    def drain(self) -> None:
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class LogFollower:
+    """
+    Incremental reader of the log files of the current day, for `BBLogger.follow`.
+
+    The byte offset reached in every file of the day (the shared file, per-process
+    shards and rotated segments) is remembered, so each `read_new` call only parses
+    rows appended since the previous one and a file whose size did not change costs
+    one stat. When the date changes, the rest of the previous day is read before
+    the next day's files, from their start.
+
+    Between reads, `wait` blocks on a Linux inotify watch of the log directory when
+    available, and otherwise sleeps for an interval that doubles from
+    `min_interval_ms` to `max_interval_ms` while nothing is written. inotify waits are
+    capped at `max_interval_ms` too, so a missed event costs at most one interval.
+    """
+
+    def __init__(self, directory: str, day_files: Callable[[str], List[str]], columns: Sequence[str],
+                 delimiter: str = ',', filters: Optional[dict] = None, from_start: bool = False,
+                 use_inotify: bool = True, min_interval_ms: int = 50, max_interval_ms: int = 1000,
+                 current_date: Callable[[], str] = None):
+        self.directory = directory
+        self.day_files = day_files
+        self.columns = list(columns)
+        self.delimiter = delimiter
+        self.predicate = LogReader.compile_filters(filters, self.columns)
+        self.use_inotify = use_inotify and _DirectoryWatch.is_supported()
+        self.min_interval = max(1, int(min_interval_ms)) / 1000.0
+        self.max_interval = max(self.min_interval, max(1, int(max_interval_ms)) / 1000.0)
+        self.interval = self.min_interval
+        self.current_date = current_date or (lambda: datetime.now().strftime('%Y_%m_%d'))
+        self._watch: Optional[_DirectoryWatch] = None
+        self._offsets: Dict[str, int] = {}
+        self._finished = set()
+        self._day = self.current_date()
+        if not from_start:
+            for path in self.day_files(self._day):
+                self._skip_to_end(path)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        # A segment compressed while followed keeps its offset under the uncompressed name.
+        for suffix in LogRotation.COMPRESSION_SUFFIXES.values():
+            if path.endswith(suffix):
+                return path[:-len(suffix)]
+        return path
+
+    def _skip_to_end(self, path: str) -> None:
+        key = self._key(path)
+        if LogRotation.is_compressed(path):
+            self._finished.add(key)
+            return
+        try:
+            with open(path, 'rb') as log_file:
+                size = log_file.seek(0, os.SEEK_END)
+                # Start after the last complete line, in case a row is being written.
+                log_file.seek(max(0, size - 65536))
+                tail = log_file.read()
+        except FileNotFoundError:
+            return
+        newline = tail.rfind(b'\n')
+        self._offsets[key] = size - len(tail) + newline + 1 if newline >= 0 else size - len(tail)
+
+    def read_new(self) -> List[dict]:
+        """Return the entries appended since the previous call that match the filters, in timestamp order."""
+        today = self.current_date()
+        rows = []
+        if today != self._day:
+            rows.extend(self._read_day(self._day))
+            self._day = today
+            self._offsets.clear()
+            self._finished.clear()
+        rows.extend(self._read_day(today))
+        if rows:
+            self.interval = self.min_interval
+        return [LogReader.row_to_dict(row, self.columns) for row in rows]
+
+    def _read_day(self, date: str) -> List[List]:
+        sources = [rows for rows in map(self._read_file, self.day_files(date)) if rows]
+        if len(sources) <= 1:
+            return sources[0] if sources else []
+        ts_index = self.columns.index('timestamp') if 'timestamp' in self.columns else 0
+        return sorted((row for rows in sources for row in rows),
+                      key=lambda row: row[ts_index] if len(row) > ts_index else '')
+
+    def _read_file(self, path: str) -> List[List]:
+        key = self._key(path)
+        if key in self._finished:
+            return []
+        offset = self._offsets.get(key, 0)
+        compressed = LogRotation.is_compressed(path)
+        if not compressed:
+            try:
+                if os.stat(path).st_size <= offset:
+                    return []
+            except FileNotFoundError:
+                # Compressed since it was listed: the next read continues in the compressed copy.
+                return []
+        rows = []
+        with LogRotation.open_binary(path) as log_file:
+            first = offset == 0
+            for row, _, end in iter_log_rows(log_file, offset, self.delimiter, self.columns):
+                offset = end
+                if first:
+                    first = False
+                    if row == self.columns:
+                        continue
+                if self.predicate is None or self.predicate(row):
+                    rows.append(row)
+        self._offsets[key] = offset
+        if compressed:
+            self._finished.add(key)
+        return rows
+
+    def _get_watch(self) -> Optional[_DirectoryWatch]:
+        if self._watch is None and self.use_inotify and os.path.isdir(self.directory):
+            try:
+                self._watch = _DirectoryWatch(self.directory)
+            except OSError as e:
+                print(f"Failed to watch {self.directory} with inotify, polling instead: {e}")
+                self.use_inotify = False
+        return self._watch
+
+    def _next_interval(self) -> float:
+        interval = self.interval
+        self.interval = min(self.max_interval, self.interval * 2)
+        return interval
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the log directory changes (or may have), for at most `timeout` seconds."""
+        watch = self._get_watch()
+        if watch is not None:
+            limit = self.max_interval
+            watch.wait(limit if timeout is None else min(timeout, limit))
+            return
+        interval = self._next_interval()
+        time.sleep(interval if timeout is None else min(timeout, interval))
+
+    async def async_wait(self, timeout: Optional[float] = None) -> None:
+        """`wait` for a coroutine: the inotify descriptor is watched by the event loop."""
+        watch = self._get_watch()
+        if watch is None:
+            interval = self._next_interval()
+            await asyncio.sleep(interval if timeout is None else min(timeout, interval))
+            return
+        loop = asyncio.get_running_loop()
+        changed = loop.create_future()
+        loop.add_reader(watch.fd, lambda: changed.done() or changed.set_result(None))
+        try:
+            limit = self.max_interval
+            await asyncio.wait_for(changed, limit if timeout is None else min(timeout, limit))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(watch.fd)
+        watch.drain()
+
+    def close(self) -> None:
+        if self._watch is not None:
+            self._watch.close()
+            self._watch = None
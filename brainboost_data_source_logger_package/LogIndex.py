@@ -0,0 +1,391 @@
+import csv
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from brainboost_data_source_logger_package.LogJson import LogJson
+
+INDEX_SUFFIX = '.idx'
+LOG_FORMATS = ('csv', 'jsonl')
+
+_MAGIC = b'BBLIDX01'
+# magic, stride, has_header, data_start, inode of the indexed log file
+_HEADER = struct.Struct('<8sIB3xQQ')
+_ENTRY = struct.Struct('<Q')
+
+
+def iter_csv_rows(log_file, offset: int, delimiter: str) -> Iterator[Tuple[List[str], int, int]]:
+    """
+    Parse CSV rows from a binary file handle starting at byte `offset`.
+
+    Yields (row, start_offset, end_offset) for every complete row, i.e. one whose
+    last line ends with a newline. A trailing row that is still being written is
+    not yielded. Blank lines are skipped.
+    """
+    log_file.seek(offset)
+    state = {'position': offset, 'complete': True}
+
+    def lines():
+        for raw in iter(log_file.readline, b''):
+            state['position'] += len(raw)
+            state['complete'] = raw.endswith(b'\n')
+            yield raw.decode('utf-8')
+
+    reader = csv.reader(lines(), delimiter=delimiter, quotechar="'")
+    start = offset
+    for row in reader:
+        if not state['complete']:
+            return
+        end = state['position']
+        if row:
+            yield row, start, end
+        start = end
+
+
+def iter_jsonl_rows(log_file, offset: int, columns: Sequence[str]) -> Iterator[Tuple[List, int, int]]:
+    """
+    Parse JSON Lines records from a binary file handle starting at byte `offset`.
+
+    Yields (row, start_offset, end_offset) like `iter_csv_rows`: the row holds the
+    values of `columns` as strings, followed by a dict of the record's other fields
+    when it has any. Incomplete trailing lines, blank lines and lines that are not
+    JSON objects are skipped.
+    """
+    log_file.seek(offset)
+    position = offset
+    for raw in iter(log_file.readline, b''):
+        start = position
+        position += len(raw)
+        if not raw.endswith(b'\n'):
+            return
+        if not raw.strip():
+            continue
+        try:
+            record = LogJson.loads(raw)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        row = []
+        for column in columns:
+            value = record.pop(column, '')
+            row.append(value if isinstance(value, str) else ('' if value is None else str(value)))
+        if record:
+            row.append(record)
+        yield row, start, position
+
+
+def detect_format(log_file) -> Optional[str]:
+    """
+    Return 'jsonl' if the file's first record is a JSON object, 'csv' if it holds
+    anything else and None if it is empty. The handle is left at offset 0.
+    """
+    log_file.seek(0)
+    head = log_file.read(64).lstrip()
+    log_file.seek(0)
+    if not head:
+        return None
+    return 'jsonl' if head.startswith(b'{') else 'csv'
+
+
+def iter_log_rows(log_file, offset: int, delimiter: str, columns: Sequence[str],
+                  log_format: Optional[str] = None) -> Iterator[Tuple[List, int, int]]:
+    """
+    Parse the rows of a CSV or JSON Lines log file from `offset`, detecting the
+    format from the file's content unless `log_format` is given.
+    """
+    if log_format is None:
+        log_format = detect_format(log_file)
+    if log_format == 'jsonl':
+        return iter_jsonl_rows(log_file, offset, columns)
+    return iter_csv_rows(log_file, offset, delimiter)
+
+
+class LogIndex:
+    """
+    Sidecar row-number → byte-offset table for a CSV or JSON Lines log file.
+
+    The offset of every `stride`-th data row is stored in `<log file>.idx`, so
+    page N costs a seek plus parsing at most `stride + page_size` rows, and the
+    total row count only requires parsing the rows appended since the last
+    refresh. Indexes are extended incrementally by the file writer and rebuilt
+    lazily by readers for files that have none (or whose file was replaced).
+
+    The `.idx` file is only open while new entries are appended to it, so
+    cached indexes hold no file descriptors; the cache keeps the
+    `_cache_limit` most recently used indexes.
+    """
+
+    _cache: 'OrderedDict[tuple, LogIndex]' = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_limit: int = 1024
+
+    def __init__(self, path: str, columns: Sequence[str], delimiter: str = ',', stride: int = 1000,
+                 persist: bool = True):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.columns = list(columns)
+        self.delimiter = delimiter
+        self.stride = max(1, int(stride))
+        self.persist = persist
+        self.offsets = array('Q')
+        self.has_header = False
+        self.data_start = 0
+        self.total_rows = 0
+        self.tail_offset = 0
+        # 'csv' or 'jsonl', detected from the file's first bytes once it has any.
+        self.format: Optional[str] = None
+        self._inode = 0
+        self._size = -1
+        self._persisted = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def shared(cls, path: str, columns: Sequence[str], delimiter: str = ',', stride: int = 1000,
+               persist: bool = True) -> 'LogIndex':
+        """
+        Return the in-process index instance for `path`, shared by the writer and readers.
+        """
+        key = (os.path.abspath(path), tuple(columns), delimiter, int(stride), persist)
+        with cls._cache_lock:
+            index = cls._cache.get(key)
+            if index is None:
+                index = cls(path, columns, delimiter, stride, persist)
+                cls._cache[key] = index
+                while len(cls._cache) > cls._cache_limit:
+                    cls._cache.popitem(last=False)
+            else:
+                cls._cache.move_to_end(key)
+            return index
+
+    @classmethod
+    def forget(cls, path: str) -> None:
+        """
+        Drop the cached indexes of `path`, once the log file was removed (compressed,
+        compacted to Parquet or deleted by retention).
+        """
+        path = os.path.abspath(path)
+        with cls._cache_lock:
+            for key in [key for key in cls._cache if key[0] == path]:
+                del cls._cache[key]
+
+    @classmethod
+    def for_file(cls, path: str, columns: Sequence[str], delimiter: str = ',', stride: int = 1000,
+                 persist: bool = True) -> 'LogIndex':
+        """
+        Return an up-to-date index for `path`.
+
+        :raises FileNotFoundError: If the log file does not exist.
+        """
+        return cls.shared(path, columns, delimiter, stride, persist).refresh()
+
+    # -- loading -----------------------------------------------------------------
+
+    def _reset(self, inode: int) -> None:
+        self.offsets = array('Q')
+        self.format = None
+        self.has_header = False
+        self.data_start = 0
+        self.total_rows = 0
+        self.tail_offset = 0
+        self._inode = inode
+        self._persisted = 0
+
+    def _load(self, inode: int, size: int) -> bool:
+        """Load the persisted index. Returns False if it is missing or belongs to another file."""
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                header = index_file.read(_HEADER.size)
+                body = index_file.read()
+        except OSError:
+            return False
+        if len(header) != _HEADER.size:
+            return False
+        magic, stride, has_header, data_start, indexed_inode = _HEADER.unpack(header)
+        if magic != _MAGIC or stride != self.stride or indexed_inode != inode or data_start > size:
+            return False
+        offsets = array('Q')
+        # Entries are appended by the writer and by readers catching up; keep the strictly
+        # increasing sequence so duplicates from concurrent appends are ignored.
+        last = -1
+        for (offset,) in _ENTRY.iter_unpack(body[:len(body) - len(body) % _ENTRY.size]):
+            if offset >= size:
+                break
+            if offset > last:
+                offsets.append(offset)
+                last = offset
+        if offsets and offsets[0] != data_start:
+            return False
+        self.offsets = offsets
+        self.has_header = bool(has_header)
+        self.data_start = data_start
+        self._inode = inode
+        self._persisted = len(offsets)
+        if offsets:
+            # Resume parsing at the last indexed row; re-parsing it appends the same entry again.
+            self.total_rows = (len(offsets) - 1) * self.stride
+            self.tail_offset = offsets.pop()
+        else:
+            self.total_rows = 0
+            self.tail_offset = data_start
+        return True
+
+    def _iter_rows(self, log_file, offset: int) -> Iterator[Tuple[List, int, int]]:
+        if self.format is None:
+            self.format = detect_format(log_file)
+        return iter_log_rows(log_file, offset, self.delimiter, self.columns, self.format)
+
+    def _detect_header(self, log_file) -> None:
+        self.has_header = False
+        self.data_start = 0
+        for row, _, end in self._iter_rows(log_file, 0):
+            if row == self.columns:
+                self.has_header = True
+                self.data_start = end
+            break
+        self.tail_offset = self.data_start
+
+    def refresh(self) -> 'LogIndex':
+        """
+        Bring the index up to date with the log file, parsing only rows appended since
+        the last refresh, and persist any new entries.
+
+        :raises FileNotFoundError: If the log file does not exist.
+        """
+        with self._lock:
+            stat = os.stat(self.path)
+            if stat.st_ino == self._inode and stat.st_size == self._size:
+                return self
+            if stat.st_ino != self._inode or stat.st_size < self.tail_offset:
+                self._reset(stat.st_ino)
+                if not (self.persist and self._load(stat.st_ino, stat.st_size)):
+                    self._reset(stat.st_ino)
+                    self._persisted = -1  # rewrite the index file from scratch
+            with open(self.path, 'rb') as log_file:
+                if self.total_rows == 0 and self.tail_offset == 0:
+                    self._detect_header(log_file)
+                for _, start, end in self._iter_rows(log_file, self.tail_offset):
+                    if self.total_rows % self.stride == 0:
+                        self.offsets.append(start)
+                    self.total_rows += 1
+                    self.tail_offset = end
+            self._size = stat.st_size
+            self._persist()
+            return self
+
+    # -- persistence -------------------------------------------------------------
+
+    def _persist(self) -> None:
+        if not self.persist:
+            return
+        truncate = self._persisted < 0
+        start = 0 if truncate else self._persisted
+        if not truncate and start >= len(self.offsets):
+            return
+        try:
+            # Entries are appended once per `stride` rows, so the file is opened per write
+            # rather than kept open by every cached index.
+            with open(self.index_path, 'wb' if truncate else 'ab') as index_file:
+                if truncate:
+                    index_file.write(_HEADER.pack(
+                        _MAGIC, self.stride, int(self.has_header), self.data_start, self._inode
+                    ))
+                index_file.write(self.offsets[start:].tobytes() if _little_endian() else
+                                 b''.join(_ENTRY.pack(offset) for offset in self.offsets[start:]))
+            self._persisted = len(self.offsets)
+        except OSError as e:
+            print(f"Failed to write log index {self.index_path}: {e}")
+            self.persist = False
+
+    # -- writer side -------------------------------------------------------------
+
+    def start_new_file(self, data_start: int, has_header: bool, log_format: Optional[str] = None) -> None:
+        """Reset the index for a freshly created (empty) log file."""
+        with self._lock:
+            self._reset(os.stat(self.path).st_ino)
+            self.format = log_format
+            self.has_header = has_header
+            self.data_start = data_start
+            self.tail_offset = data_start
+            self._persisted = -1
+            self._size = -1
+
+    def record(self, start: int, end: int) -> None:
+        """Account for a row the writer appended at [start, end)."""
+        with self._lock:
+            if start != self.tail_offset:
+                # Rows we have not seen yet precede this one; let the next refresh() parse them.
+                self._size = -1
+                return
+            if self.total_rows % self.stride == 0:
+                self.offsets.append(start)
+            self.total_rows += 1
+            self.tail_offset = end
+            # Force the next refresh() to re-stat the file.
+            self._size = -1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._persist()
+
+    def invalidate(self) -> None:
+        """Drop the in-memory and persisted index; the next refresh() rebuilds it."""
+        with self._lock:
+            self._reset(0)
+            self._size = -1
+            try:
+                os.remove(self.index_path)
+            except OSError:
+                pass
+
+    # -- reading -----------------------------------------------------------------
+
+    def total_pages(self, page_size: int) -> int:
+        return (self.total_rows + page_size - 1) // page_size
+
+    def read_rows(self, start_row: int, count: int) -> List[List[str]]:
+        """
+        Read `count` data rows starting at the 0-based `start_row`.
+        """
+        if count <= 0 or start_row >= self.total_rows:
+            return []
+        slot = min(start_row // self.stride, len(self.offsets) - 1)
+        offset = self.offsets[slot]
+        skip = start_row - slot * self.stride
+        rows = []
+        with open(self.path, 'rb') as log_file:
+            for row, _, _ in self._iter_rows(log_file, offset):
+                if skip:
+                    skip -= 1
+                    continue
+                rows.append(row)
+                if len(rows) >= count:
+                    break
+        return rows
+
+    def seek_value(self, value: str, column: int) -> int:
+        """
+        Binary-search the indexed rows of a file sorted by `column` (e.g. the
+        timestamp) and return a byte offset from which streaming will reach the
+        first row whose `column` is >= `value` after skipping at most `stride` rows.
+        """
+        if not self.offsets:
+            return self.data_start
+        low, high = 0, len(self.offsets)
+        with open(self.path, 'rb') as log_file:
+            # Invariant: every indexed row before `low` sorts before `value`.
+            while low < high:
+                middle = (low + high) // 2
+                row = next(self._iter_rows(log_file, self.offsets[middle]), (None,))[0]
+                if row is not None and column < len(row) and row[column] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+        return self.offsets[max(low - 1, 0)]
+
+
+def _little_endian() -> bool:
+    return array('Q', [1]).tobytes()[0] == 1
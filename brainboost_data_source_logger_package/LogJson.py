@@ -0,0 +1,31 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class LogJson:
+    """
+    JSON encoding for JSON Lines log files and notifications. Uses orjson when it is
+    installed and falls back to the standard library otherwise; both produce compact
+    UTF-8 JSON without embedded newlines.
+    """
+
+    ENCODER = 'orjson' if orjson is not None else 'json'
+
+    @staticmethod
+    def dumps(value) -> str:
+        if orjson is not None:
+            return orjson.dumps(value, default=str).decode('utf-8')
+        return json.dumps(value, default=str, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def loads(data):
+        """
+        :raises ValueError: If `data` is not valid JSON.
+        """
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
@@ -0,0 +1,446 @@
+import math
+import os
+import sqlite3
+import struct
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+class _QuantileSketch:
+    """
+    Log-bucketed histogram of non-negative values (the DDSketch layout): a value falls
+    in bin ceil(log(value) / log(GAMMA)), so every quantile is returned within
+    RELATIVE_ACCURACY of a value of the stream. Merging two sketches adds their bins.
+    """
+
+    RELATIVE_ACCURACY = 0.01
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    # Values below a microsecond are counted in the zero bin.
+    MIN_VALUE = 1e-6
+    _LOG_GAMMA = math.log(GAMMA)
+    _ZEROS = struct.Struct('<I')
+    _BIN = struct.Struct('<iI')
+
+    __slots__ = ('zeros', 'bins')
+
+    def __init__(self):
+        self.zeros = 0
+        self.bins: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        if value < self.MIN_VALUE:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._LOG_GAMMA)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other: '_QuantileSketch') -> None:
+        self.zeros += other.zeros
+        bins = self.bins
+        for key, count in other.bins.items():
+            bins[key] = bins.get(key, 0) + count
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """The values at each quantile 0 <= q <= 1 of `qs`, or None for an empty sketch."""
+        keys = sorted(self.bins)
+        cumulative = list(accumulate(self.bins[key] for key in keys))
+        total = self.zeros + (cumulative[-1] if cumulative else 0)
+        values = []
+        for q in qs:
+            rank = q * (total - 1)
+            if not total:
+                values.append(None)
+            elif rank < self.zeros:
+                values.append(0.0)
+            else:
+                key = keys[min(bisect_right(cumulative, rank - self.zeros), len(keys) - 1)]
+                values.append(2 * self.GAMMA ** key / (self.GAMMA + 1))
+        return values
+
+    def to_bytes(self) -> bytes:
+        return self._ZEROS.pack(self.zeros) + b''.join(
+            self._BIN.pack(key, count) for key, count in sorted(self.bins.items())
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> '_QuantileSketch':
+        sketch = cls()
+        if data:
+            sketch.zeros = cls._ZEROS.unpack_from(data)[0]
+            sketch.bins = dict(cls._BIN.iter_unpack(data[cls._ZEROS.size:]))
+        return sketch
+
+
+class _SketchMerge:
+    """SQLite aggregate merging the sketch blobs of a group; a lone blob is returned as is."""
+
+    def __init__(self):
+        self.blob: Optional[bytes] = None
+        self.sketch: Optional[_QuantileSketch] = None
+
+    def step(self, blob: bytes) -> None:
+        if self.blob is None:
+            self.blob = blob
+            return
+        if self.sketch is None:
+            self.sketch = _QuantileSketch.from_bytes(self.blob)
+        self.sketch.merge(_QuantileSketch.from_bytes(blob))
+
+    def finalize(self) -> Optional[bytes]:
+        return self.sketch.to_bytes() if self.sketch is not None else self.blob
+
+
+class _Cell:
+    """The counters of one bucket and key, as kept in memory until the next flush."""
+
+    __slots__ = ('count', 'time_sum', 'time_min', 'time_max', 'sketch')
+
+    def __init__(self):
+        self.count = 0
+        self.time_sum = 0.0
+        self.time_min = math.inf
+        self.time_max = -math.inf
+        self.sketch = _QuantileSketch()
+
+    def add(self, processing_time: float) -> None:
+        self.count += 1
+        self.time_sum += processing_time
+        if processing_time < self.time_min:
+            self.time_min = processing_time
+        if processing_time > self.time_max:
+            self.time_max = processing_time
+        self.sketch.add(processing_time)
+
+    def merge(self, count: int, time_sum: float, time_min: float, time_max: float,
+              sketch: Optional[_QuantileSketch]) -> None:
+        self.count += count
+        self.time_sum += time_sum
+        self.time_min = min(self.time_min, time_min)
+        self.time_max = max(self.time_max, time_max)
+        if sketch is not None:
+            self.sketch.merge(sketch)
+
+
+class LogMetrics:
+    """
+    Rollups of the logged entries, maintained on the write path, for `BBLogger.stats`.
+
+    Every entry is counted in a one-minute bucket under its (log_type, process,
+    code_location) key, together with the sum, minimum, maximum and a quantile sketch
+    of its processing_time. Buckets are kept in memory and added every
+    `flush_interval_ms` (and on flush/close) to three tables of a SQLite database,
+    `metrics_minute`, `metrics_hour` and `metrics_day`, in one transaction that
+    merges them with what other processes already wrote. If that transaction fails
+    (e.g. another process holds the database), the buckets are kept in memory and
+    retried one interval later.
+
+    A query covers its range with the coarsest buckets that fit: whole days from
+    `metrics_day`, the hours around them from `metrics_hour` and the minutes at the
+    edges from `metrics_minute`, so its cost depends on the number of keys, not on
+    the number of entries.
+    """
+
+    KEY_COLUMNS = ('log_type', 'process', 'code_location')
+    # (name, bucket label format, length of the label)
+    RESOLUTIONS = (('minute', '%Y%m%d%H%M', 12), ('hour', '%Y%m%d%H', 10), ('day', '%Y%m%d', 8))
+
+    def __init__(self, db_path: str, flush_interval_ms: int = 1000):
+        self.db_path = db_path
+        self.flush_interval_ms = max(0, int(flush_interval_ms))
+        self.flush_interval = self.flush_interval_ms / 1000.0
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._pending: Dict[tuple, _Cell] = {}
+        self._pending_since: float = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self.entries_recorded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        if self._pid is not None and self._pid != os.getpid():
+            # Inherited across fork(): the parent owns both the connection and the pending counts.
+            self._conn = None
+            self._pending = {}
+            self._timer = None
+        dir_path = os.path.dirname(self.db_path)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.create_aggregate('merge_sketch', 1, _SketchMerge)
+        with conn:
+            for name, _, _ in self.RESOLUTIONS:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS metrics_{name} (bucket TEXT NOT NULL, log_type TEXT NOT NULL, "
+                    f"process TEXT NOT NULL, code_location TEXT NOT NULL, count INTEGER NOT NULL, "
+                    f"time_sum REAL NOT NULL, time_min REAL NOT NULL, time_max REAL NOT NULL, sketch BLOB NOT NULL, "
+                    f"PRIMARY KEY (bucket, log_type, process, code_location)) WITHOUT ROWID;"
+                )
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def record(self, timestamp: str, log_type, process, code_location, processing_time) -> None:
+        """Count one entry; `timestamp` is 'YYYYMMDDHHMMSS' and `processing_time` is in seconds."""
+        try:
+            seconds = max(0.0, float(processing_time))
+        except (TypeError, ValueError):
+            seconds = 0.0
+        key = (str(timestamp)[:12], str(log_type), str(process), str(code_location))
+        with self._lock:
+            if self._pid != os.getpid():
+                self._connect()
+            cell = self._pending.get(key)
+            if cell is None:
+                if not self._pending:
+                    self._pending_since = time.monotonic()
+                cell = self._pending[key] = _Cell()
+            cell.add(seconds)
+            self.entries_recorded += 1
+            if not self.flush_interval or time.monotonic() - self._pending_since >= self.flush_interval:
+                self._flush_locked()
+            elif self._timer is None:
+                self._start_timer()
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"Failed to write log metrics: {e}")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            if self._timer is not threading.current_thread():
+                self._timer.cancel()
+            self._timer = None
+        if self._pid != os.getpid():
+            self._pending = {}
+            return
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            with self._conn:
+                # The write lock is taken before reading, so concurrent writers never lose each other's counts.
+                self._conn.execute("BEGIN IMMEDIATE;")
+                for name, _, length in self.RESOLUTIONS:
+                    cells: Dict[tuple, _Cell] = {}
+                    for (bucket, *key), cell in pending.items():
+                        rolled = (bucket[:length], *key)
+                        merged = cells.get(rolled)
+                        if merged is None:
+                            merged = cells[rolled] = _Cell()
+                        merged.merge(cell.count, cell.time_sum, cell.time_min, cell.time_max, cell.sketch)
+                    self._merge_cells(name, cells)
+        except sqlite3.Error:
+            # The transaction was rolled back (e.g. another process held the database): keep the
+            # counts for the next flush, one interval from now.
+            for key, cell in self._pending.items():
+                kept = pending.get(key)
+                if kept is None:
+                    pending[key] = cell
+                else:
+                    kept.merge(cell.count, cell.time_sum, cell.time_min, cell.time_max, cell.sketch)
+            self._pending = pending
+            self._pending_since = time.monotonic()
+            if self.flush_interval:
+                self._start_timer()
+            raise
+
+    def _merge_cells(self, name: str, cells: Dict[tuple, _Cell]) -> None:
+        conn = self._conn
+        for key, cell in cells.items():
+            found = conn.execute(
+                f"SELECT count, time_sum, time_min, time_max, sketch FROM metrics_{name} "
+                f"WHERE bucket = ? AND log_type = ? AND process = ? AND code_location = ?;",
+                key
+            ).fetchone()
+            if found:
+                cell.merge(*found[:4], _QuantileSketch.from_bytes(found[4]))
+        conn.executemany(
+            f"INSERT OR REPLACE INTO metrics_{name} (bucket, log_type, process, code_location, count, time_sum, "
+            f"time_min, time_max, sketch) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);",
+            [(*key, cell.count, cell.time_sum, cell.time_min, cell.time_max, cell.sketch.to_bytes())
+             for key, cell in cells.items()]
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self._conn is not None and self._pid == os.getpid():
+                    self._conn.close()
+                self._conn = None
+                self._pid = None
+
+    # -- queries ------------------------------------------------------------------------
+
+    @classmethod
+    def _floor(cls, value: datetime, name: str) -> datetime:
+        if name == 'day':
+            return value.replace(hour=0, minute=0, second=0, microsecond=0)
+        if name == 'hour':
+            return value.replace(minute=0, second=0, microsecond=0)
+        return value.replace(second=0, microsecond=0)
+
+    @classmethod
+    def plan(cls, start: datetime, end: datetime, coarsest: str = 'day') -> List[Tuple[str, datetime, datetime]]:
+        """
+        Cover the minutes from `start` up to `end` (exclusive, both on minute boundaries)
+        with (resolution, start, end) ranges of whole buckets, coarsest first in the middle.
+        """
+        names = [name for name, _, _ in cls.RESOLUTIONS]
+        levels = names[:names.index(coarsest) + 1]
+
+        def cover(first: datetime, last: datetime, depth: int) -> List[Tuple[str, datetime, datetime]]:
+            if first >= last:
+                return []
+            name = levels[depth]
+            if depth == 0:
+                return [(name, first, last)]
+            size = timedelta(days=1) if name == 'day' else timedelta(hours=1)
+            inner_first = cls._floor(first, name)
+            if inner_first < first:
+                inner_first += size
+            inner_last = cls._floor(last, name)
+            if inner_first >= inner_last:
+                return cover(first, last, depth - 1)
+            return cover(first, inner_first, depth - 1) + [(name, inner_first, inner_last)] + \
+                cover(inner_last, last, depth - 1)
+
+        return cover(start, end, len(levels) - 1)
+
+    def query(self, t1: datetime, t2: datetime, group_by: Sequence[str] = (),
+              filters: Optional[dict] = None, percentiles: Sequence[float] = ()) -> pd.DataFrame:
+        """
+        Aggregate the entries of every minute from t1's through t2's.
+
+        :param group_by: Key columns and at most one of 'minute', 'hour' and 'day'.
+        :param filters: `{key column: condition}`, as for `LogReader.compile_filters`.
+        :param percentiles: processing_time percentiles (0-100) to estimate from the sketches.
+        :return: One row per group: the group columns, `count` and the `processing_time_`
+                 `sum`, `mean`, `min`, `max` and `p<percentile>` columns, in seconds.
+        :raises ValueError: On an unknown group or filter column.
+        """
+        group_by = list(group_by)
+        names = [name for name, _, _ in self.RESOLUTIONS]
+        unknown = [column for column in group_by if column not in self.KEY_COLUMNS and column not in names]
+        if unknown:
+            raise ValueError(f"Unknown stats group_by column: {unknown[0]}. Expected any of "
+                             f"{', '.join(self.KEY_COLUMNS + tuple(names))}.")
+        time_groups = [column for column in group_by if column in names]
+        if len(time_groups) > 1:
+            raise ValueError("group_by can hold at most one of 'minute', 'hour' and 'day'.")
+        time_group = time_groups[0] if time_groups else None
+        key_columns = [column for column in group_by if column in self.KEY_COLUMNS]
+        lengths = {name: length for name, _, length in self.RESOLUTIONS}
+        group_exprs = ([f"substr(bucket, 1, {lengths[time_group]})"] if time_group else []) + key_columns
+        aggregates = ['sum(count)', 'sum(time_sum)', 'min(time_min)', 'max(time_max)']
+        if percentiles:
+            aggregates.append('merge_sketch(sketch)')
+        group_sql = f" GROUP BY {', '.join(group_exprs)}" if group_exprs else ''
+
+        start = self._floor(t1, 'minute')
+        end = self._floor(t2, 'minute') + timedelta(minutes=1)
+        records = []
+        with self._lock:
+            conn = self._connect()
+            clauses, params = self._compile_filters(conn, filters, start, end)
+            for name, first, last in self.plan(start, end, time_group or 'day'):
+                label_format = next(fmt for resolution, fmt, _ in self.RESOLUTIONS if resolution == name)
+                records.extend(conn.execute(
+                    f"SELECT {', '.join(group_exprs + aggregates)} FROM metrics_{name} "
+                    f"WHERE bucket >= ? AND bucket < ?{clauses}{group_sql};",
+                    (first.strftime(label_format), last.strftime(label_format), *params)
+                ))
+        group_columns = ([time_group] if time_group else []) + key_columns
+        df = pd.DataFrame(records, columns=group_columns + ['count', 'sum', 'min', 'max'] +
+                          (['sketch'] if percentiles else []))
+        # An aggregate without GROUP BY returns a row of NULLs for a range without buckets.
+        df = df[df['count'].notna()]
+        return self._to_frame(self._merge_ranges(df, group_columns), time_group, percentiles)
+
+    @staticmethod
+    def _merge_sketches(blobs) -> bytes:
+        merged = _SketchMerge()
+        for blob in blobs:
+            merged.step(blob)
+        return merged.finalize()
+
+    def _merge_ranges(self, df: pd.DataFrame, group_columns: List[str]) -> pd.DataFrame:
+        # A group can get a row from several ranges of the plan, e.g. a day from its hours and minutes.
+        aggregations = {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+        if 'sketch' in df.columns:
+            aggregations['sketch'] = self._merge_sketches
+        if not group_columns:
+            if len(df) <= 1:
+                return df
+            return pd.DataFrame([{column: df[column].agg(aggregation) if isinstance(aggregation, str)
+                                  else aggregation(df[column]) for column, aggregation in aggregations.items()}])
+        if not df.duplicated(group_columns).any():
+            return df
+        return df.groupby(group_columns, as_index=False, sort=False).agg(aggregations)
+
+    def _compile_filters(self, conn: sqlite3.Connection, filters: Optional[dict], start: datetime,
+                         end: datetime) -> Tuple[str, List[str]]:
+        clauses, params = [], []
+        for column, condition in (filters or {}).items():
+            if column not in self.KEY_COLUMNS:
+                raise ValueError(f"Unknown stats filter column: {column}. Expected one of "
+                                 f"{', '.join(self.KEY_COLUMNS)}.")
+            if callable(condition):
+                # Every key of the range is in the day rollups: test each distinct value once.
+                values = [value for (value,) in conn.execute(
+                    f"SELECT DISTINCT {column} FROM metrics_day WHERE bucket >= ? AND bucket <= ?;",
+                    (start.strftime('%Y%m%d'), end.strftime('%Y%m%d'))
+                ) if condition(value)]
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                values = [str(value) for value in condition]
+            else:
+                values = [str(condition)]
+            clauses.append(f" AND {column} IN ({', '.join('?' for _ in values)})" if values else " AND 0")
+            params.extend(values)
+        return ''.join(clauses), params
+
+    def _to_frame(self, df: pd.DataFrame, time_group: Optional[str], percentiles: Sequence[float]) -> pd.DataFrame:
+        df = df.reset_index(drop=True)
+        df['count'] = df['count'].astype('int64')
+        df.insert(df.columns.get_loc('min'), 'mean', df['sum'] / df['count'])
+        for column in ('sum', 'mean', 'min', 'max'):
+            df[column] = df[column].astype('float64')
+        if percentiles:
+            qs = [percentile / 100.0 for percentile in percentiles]
+            values = [_QuantileSketch.from_bytes(blob).quantiles(qs) for blob in df.pop('sketch')]
+            for position, percentile in enumerate(percentiles):
+                column = pd.Series([row[position] for row in values], index=df.index, dtype='float64')
+                # The sketch is accurate to 1%; the exact extremes bound it.
+                df[f"p{percentile:g}"] = column.clip(df['min'], df['max'])
+        statistics = df.columns[df.columns.get_loc('sum'):]
+        df = df.rename(columns={column: f"processing_time_{column}" for column in statistics})
+        if time_group:
+            label_format = next(fmt for name, fmt, _ in self.RESOLUTIONS if name == time_group)
+            df[time_group] = pd.to_datetime(df[time_group], format=label_format)
+            return df.sort_values([time_group, 'count'], ascending=[True, False], ignore_index=True)
+        return df.sort_values('count', ascending=False, kind='stable', ignore_index=True)
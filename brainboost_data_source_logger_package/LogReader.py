@@ -0,0 +1,201 @@
+import heapq
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from brainboost_data_source_logger_package.LogIndex import LogIndex, detect_format, iter_log_rows
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+
+
+class LogReader:
+    """
+    Helpers shared by the BBLogger read APIs for streaming and filtering log rows.
+
+    A row is the list of the log column values. Rows read from JSON Lines files
+    carry one more element when the record has extra fields: a dict of them, which
+    the frame and dict builders below expand into extra columns.
+    """
+
+    @staticmethod
+    def compile_filters(filters: Optional[dict], columns: Sequence[str]) -> Optional[Callable[[List[str]], bool]]:
+        """
+        Turn a `{column: condition}` mapping into a predicate over raw log rows.
+
+        A condition can be a single value (exact match), a list/tuple/set of allowed
+        values, or a callable receiving the column's value and returning a bool.
+
+        :raises ValueError: If a filter names an unknown column.
+        """
+        if not filters:
+            return None
+        tests = []
+        for column, condition in filters.items():
+            if column not in columns:
+                raise ValueError(f"Unknown log column in filters: {column}")
+            position = list(columns).index(column)
+            if callable(condition):
+                tests.append((position, condition))
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                allowed = frozenset(str(value) for value in condition)
+                tests.append((position, allowed.__contains__))
+            else:
+                expected = str(condition)
+                tests.append((position, expected.__eq__))
+
+        def predicate(row: List[str]) -> bool:
+            for position, test in tests:
+                if position >= len(row) or not test(row[position]):
+                    return False
+            return True
+
+        return predicate
+
+    @staticmethod
+    def iter_log_file(path: str, columns: Sequence[str], delimiter: str = ',', offset: int = 0) -> Iterator[List[str]]:
+        """
+        Stream the data rows of a CSV or JSON Lines log file, plain or compressed,
+        skipping its header row, without loading the file into memory.
+        """
+        columns = list(columns)
+        with LogRotation.open_binary(path) as log_file:
+            first = offset == 0
+            for row, _, _ in iter_log_rows(log_file, offset, delimiter, columns):
+                if first:
+                    first = False
+                    if row == columns:
+                        continue
+                yield row
+
+    @staticmethod
+    def merge_rows(sources: List[Iterator[List]], ts_index: int) -> Iterator[List]:
+        # Each source is in timestamp order; ties keep the order of `sources`.
+        if len(sources) == 1:
+            return sources[0]
+        return heapq.merge(*sources, key=lambda row: row[ts_index] if len(row) > ts_index else '')
+
+    @staticmethod
+    def stream_day_rows(groups: List[List[str]], columns: Sequence[str], delimiter: str, t1: str, t2: str,
+                        seek: bool = False, index_stride: int = 1000) -> Iterator[List]:
+        """
+        Stream the rows of one day with t1 <= timestamp <= t2 ('YYYYMMDDHHMMSS'), in
+        timestamp order, from the files of each writer as returned by
+        `LogRotation.segment_groups`. With `seek`, each writer's first file is entered
+        through its index near t1 instead of being parsed from its start.
+        """
+        ts_index = list(columns).index('timestamp')
+        return LogReader.merge_rows([
+            LogReader._stream_group_rows(group, columns, delimiter, t1, t2, seek, index_stride) for group in groups
+        ], ts_index)
+
+    @staticmethod
+    def _stream_group_rows(paths: List[str], columns: Sequence[str], delimiter: str, t1: str, t2: str,
+                           seek: bool, index_stride: int) -> Iterator[List]:
+        # A writer's segments follow each other in time: start at the last segment that
+        # begins at or before t1 and stop at the first one that begins after t2.
+        first = 0
+        if seek:
+            for position in range(len(paths) - 1, 0, -1):
+                timestamp = LogReader.first_timestamp(paths[position], columns, delimiter)
+                if timestamp is not None and timestamp <= t1:
+                    first = position
+                    break
+        for position in range(first, len(paths)):
+            if position > first:
+                timestamp = LogReader.first_timestamp(paths[position], columns, delimiter)
+                if timestamp is not None and timestamp > t2:
+                    return
+            yield from LogReader._stream_file_rows(paths[position], columns, delimiter, t1, t2,
+                                                   seek and position == first, index_stride)
+
+    @staticmethod
+    def first_timestamp(path: str, columns: Sequence[str], delimiter: str = ',') -> Optional[str]:
+        ts_index = list(columns).index('timestamp')
+        rows = LogReader.iter_log_file(path, columns, delimiter)
+        try:
+            row = next(rows, None)
+        finally:
+            rows.close()
+        return row[ts_index] if row is not None and len(row) > ts_index else None
+
+    @staticmethod
+    def _stream_file_rows(path: str, columns: Sequence[str], delimiter: str, t1: str, t2: str, seek: bool,
+                          index_stride: int) -> Iterator[List]:
+        # Rows are appended in timestamp order, so reading stops at the first row past t2.
+        ts_index = list(columns).index('timestamp')
+        offset = 0
+        if seek and not LogRotation.is_compressed(path):
+            # Skip straight to the rows near t1 instead of parsing the day from its start.
+            try:
+                index = LogIndex.for_file(path, columns, delimiter, stride=index_stride or 1000,
+                                          persist=index_stride > 0)
+                offset = index.seek_value(t1, ts_index)
+            except IOError as e:
+                print(f"Failed to read log index, scanning {path}: {e}")
+        for row in LogReader.iter_log_file(path, columns, delimiter, offset):
+            if len(row) <= ts_index:
+                continue
+            timestamp = row[ts_index]
+            if timestamp < t1:
+                continue
+            if timestamp > t2:
+                return
+            yield row
+
+    @staticmethod
+    def file_format(path: str) -> str:
+        """'jsonl' or 'csv', detected from the content of a plain or compressed log file."""
+        with LogRotation.open_binary(path) as log_file:
+            return detect_format(log_file) or 'csv'
+
+    @staticmethod
+    def raw_frame(rows: List[List], columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        """
+        Build a DataFrame of the raw string values, with one more column per extra
+        field found in JSON Lines rows.
+        """
+        if columns is None:
+            return pd.DataFrame(rows)
+        width = len(columns)
+        if not any(len(row) > width for row in rows):
+            return pd.DataFrame(rows, columns=list(columns))
+        df = pd.DataFrame([row[:width] for row in rows], columns=list(columns))
+        extras = pd.DataFrame([row[width] if len(row) > width else {} for row in rows])
+        for column in extras.columns:
+            if column not in df.columns:
+                df[column] = extras[column].values
+        return df
+
+    @staticmethod
+    def row_to_dict(row: List, columns: Sequence[str]) -> dict:
+        record = dict(zip(columns, row))
+        if len(row) > len(columns):
+            for key, value in row[len(columns)].items():
+                record.setdefault(key, value)
+        return record
+
+    @staticmethod
+    def infer_dtypes(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+        """
+        Convert the log columns that hold only numbers to numeric dtypes, as
+        pandas.read_csv does, so JSON Lines days read like CSV days.
+        """
+        for column in columns:
+            if column in df.columns:
+                try:
+                    df[column] = pd.to_numeric(df[column])
+                except (TypeError, ValueError):
+                    pass
+        return df
+
+    @staticmethod
+    def rows_to_frame(rows: List[List], columns: Sequence[str]) -> pd.DataFrame:
+        """
+        Build a DataFrame from raw rows with a datetime `timestamp` and a numeric
+        `processing_time`, matching `get_logs_between_timestampt_and_timestampt`.
+        """
+        df = LogReader.raw_frame(rows, columns)
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y%m%d%H%M%S', errors='coerce')
+        if 'processing_time' in df.columns:
+            df['processing_time'] = pd.to_numeric(df['processing_time'], errors='coerce')
+        return df
@@ -0,0 +1,420 @@
+import gzip
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from brainboost_data_source_logger_package.LogIndex import INDEX_SUFFIX, LogIndex
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class LogRotation:
+    """
+    Segment naming, compression and retention of rotated log files.
+
+    A log file such as `brainboost_log_2024_01_10.log` can be split into segments:
+
+    - by hour: `brainboost_log_2024_01_10-13h.log`
+    - by size: `brainboost_log_2024_01_10-0001.log`, `-0002`, ... (the first
+      segment keeps the unnumbered name)
+    - per process with `log_file_sharding`: `brainboost_log_2024_01_10-13h.4242-0001.log`
+
+    Closed segments may be compressed to `.gz` (or `.zst` with the optional
+    zstandard package). `segment_groups` lists every file of a log per writer, in
+    the order it was written, and `open_binary` reads plain and compressed files
+    alike, so readers never need to know how a day was rotated.
+    """
+
+    COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+    # A segment is compressed only once it has not been written to for this long. Writers
+    # sharing segments (without log_file_sharding) move past a segment as soon as a later one
+    # exists, so this only has to cover a row being appended while a writer rotates.
+    CLOSE_GRACE_S = 2.0
+
+    _threads: List[threading.Thread] = []
+    _threads_lock = threading.Lock()
+    _pending: Dict[str, tuple] = {}
+    # Row counts of compressed segments, keyed by (path, size, mtime); the most recently used are kept.
+    _row_counts: 'OrderedDict[tuple, int]' = OrderedDict()
+    _row_counts_lock = threading.Lock()
+    _row_counts_limit: int = 1024
+
+    # -- naming ------------------------------------------------------------------
+
+    @classmethod
+    def hour_path(cls, log_file_path: str, hour: str) -> str:
+        """The file of one hour ('00'-'23') of an hourly rotated log."""
+        root, ext = os.path.splitext(log_file_path)
+        return f"{root}-{hour}h{ext}"
+
+    @classmethod
+    def segment_path(cls, log_file_path: str, sequence: int) -> str:
+        """The `sequence`-th size segment of a log file; segment 0 is the file itself."""
+        if not sequence:
+            return log_file_path
+        root, ext = os.path.splitext(log_file_path)
+        return f"{root}-{sequence:04d}{ext}"
+
+    @classmethod
+    def _suffix_pattern(cls) -> str:
+        return '|'.join(re.escape(suffix) for suffix in cls.COMPRESSION_SUFFIXES.values())
+
+    @classmethod
+    def file_pattern(cls, log_file_path: str) -> 're.Pattern':
+        """
+        Match the names of every file holding rows of `log_file_path`. Groups: hour,
+        shard pid, size sequence and compression suffix (each possibly None).
+        """
+        root, ext = os.path.splitext(os.path.basename(log_file_path))
+        return re.compile(
+            rf"^{re.escape(root)}(?:-(\d{{2}})h)?(?:\.(\d+))?(?:-(\d{{4}}))?{re.escape(ext)}({cls._suffix_pattern()})?$"
+        )
+
+    @classmethod
+    def day_file_pattern(cls, log_prefix: str) -> 're.Pattern':
+        """
+        Match every daily log file under a log directory, including its segments,
+        shards and compressed copies. Groups: year, month, day, hour, shard pid,
+        size sequence and compression suffix.
+        """
+        return re.compile(
+            rf"^{re.escape(str(log_prefix))}_log_(\d{{4}})_(\d{{2}})_(\d{{2}})"
+            rf"(?:-(\d{{2}})h)?(?:\.(\d+))?(?:-(\d{{4}}))?\.log({cls._suffix_pattern()})?$"
+        )
+
+    @classmethod
+    def is_compressed(cls, path: str) -> bool:
+        return path.endswith(tuple(cls.COMPRESSION_SUFFIXES.values()))
+
+    @classmethod
+    def segment_groups(cls, log_file_path: str) -> List[List[str]]:
+        """
+        Return the existing files of a log, one list per writer (the shared file first,
+        then each per-process shard by pid), each in write order: by hour, then by
+        size segment.
+        """
+        directory = os.path.dirname(log_file_path)
+        try:
+            names = os.listdir(directory or '.')
+        except OSError:
+            return []
+        pattern = cls.file_pattern(log_file_path)
+        segments = {}
+        for name in names:
+            match = pattern.match(name)
+            if not match:
+                continue
+            hour, pid, sequence, suffix = match.groups()
+            key = (int(pid) if pid is not None else -1, int(hour) if hour is not None else -1,
+                   int(sequence or 0))
+            # While a segment is being compressed both copies exist; the plain one is complete.
+            if key in segments and suffix:
+                continue
+            segments[key] = os.path.join(directory, name)
+        groups = {}
+        for key in sorted(segments):
+            groups.setdefault(key[0], []).append(segments[key])
+        return list(groups.values())
+
+    @classmethod
+    def latest_segment(cls, log_file_path: str) -> Tuple[int, Optional[str]]:
+        """
+        Return (sequence, path) of the last existing size segment of `log_file_path`,
+        or (0, None) if it has none yet.
+        """
+        directory = os.path.dirname(log_file_path)
+        root, ext = os.path.splitext(os.path.basename(log_file_path))
+        pattern = re.compile(rf"^{re.escape(root)}(?:-(\d{{4}}))?{re.escape(ext)}({cls._suffix_pattern()})?$")
+        latest = (0, None)
+        try:
+            names = os.listdir(directory or '.')
+        except OSError:
+            return latest
+        for name in names:
+            match = pattern.match(name)
+            if not match:
+                continue
+            sequence = int(match.group(1) or 0)
+            if latest[1] is None or sequence > latest[0] or (sequence == latest[0] and not match.group(2)):
+                latest = (sequence, os.path.join(directory, name))
+        return latest
+
+    # -- reading -----------------------------------------------------------------
+
+    @classmethod
+    def open_binary(cls, path: str):
+        """
+        Open a plain or compressed log file for binary reading. If a plain segment was
+        compressed after it was listed, its compressed copy is opened instead.
+        """
+        try:
+            return cls._open(path, 'rb')
+        except FileNotFoundError:
+            if cls.is_compressed(path):
+                raise
+            for suffix in cls.COMPRESSION_SUFFIXES.values():
+                if os.path.exists(path + suffix):
+                    return cls._open(path + suffix, 'rb')
+            raise
+
+    @classmethod
+    def _open(cls, path: str, mode: str):
+        if path.endswith(cls.COMPRESSION_SUFFIXES['gzip']):
+            return gzip.open(path, mode)
+        if path.endswith(cls.COMPRESSION_SUFFIXES['zstd']):
+            cls._require_zstandard()
+            return zstandard.open(path, mode)
+        return open(path, mode)
+
+    @classmethod
+    def _require_zstandard(cls) -> None:
+        if zstandard is None:
+            raise ImportError(
+                "zstd compressed logs require zstandard. "
+                "Install it with: pip install 'brainboost_data_source_logger_package[zstd]'"
+            )
+
+    @classmethod
+    def count_rows(cls, path: str, count: Callable[[str], int]) -> int:
+        """
+        Row count of a compressed segment. Compressed segments never change, so `count`
+        (which parses the file) runs once per file.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with cls._row_counts_lock:
+            rows = cls._row_counts.get(key)
+            if rows is not None:
+                cls._row_counts.move_to_end(key)
+                return rows
+        rows = count(path)
+        with cls._row_counts_lock:
+            cls._row_counts[key] = rows
+            while len(cls._row_counts) > cls._row_counts_limit:
+                cls._row_counts.popitem(last=False)
+        return rows
+
+    @classmethod
+    def _forget_row_counts(cls, path: str) -> None:
+        path = os.path.abspath(path)
+        with cls._row_counts_lock:
+            for key in [key for key in cls._row_counts if key[0] == path]:
+                del cls._row_counts[key]
+
+    # -- compression -------------------------------------------------------------
+
+    @classmethod
+    def compress(cls, path: str, method: str = 'gzip') -> str:
+        """
+        Compress a closed segment next to itself and remove the plain file and its index.
+        The compressed copy is written to a temporary file and moved into place first.
+
+        :return: Path of the compressed file.
+        :raises ValueError: If the method is unknown.
+        :raises ImportError: If zstd is requested and zstandard is not installed.
+        :raises IOError: If rows were appended to the file while it was copied; it is left as is.
+        """
+        suffix = cls.COMPRESSION_SUFFIXES.get(method)
+        if suffix is None:
+            raise ValueError(
+                f"Invalid compression: {method}. Expected one of {', '.join(cls.COMPRESSION_SUFFIXES)}."
+            )
+        target = path + suffix
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        with open(path, 'rb') as source, cls._open_for_write(tmp_path, method) as destination:
+            shutil.copyfileobj(source, destination, 1024 * 1024)
+            copied = source.tell()
+        if os.path.getsize(path) != copied:
+            os.remove(tmp_path)
+            raise IOError(f"{path} was appended to while it was compressed")
+        os.replace(tmp_path, target)
+        os.remove(path)
+        if os.path.exists(path + INDEX_SUFFIX):
+            os.remove(path + INDEX_SUFFIX)
+        LogIndex.forget(path)
+        return target
+
+    @classmethod
+    def _open_for_write(cls, path: str, method: str):
+        if method == 'zstd':
+            cls._require_zstandard()
+            return zstandard.open(path, 'wb')
+        return gzip.open(path, 'wb', compresslevel=6)
+
+    @classmethod
+    def closed_segments(cls, log_path: str, log_prefix: str, keep: Iterable[str] = ()) -> List[str]:
+        """
+        Return the plain segments under `log_path` that no longer receive rows: every
+        segment followed by a later one of the same writer, and every file of a past day.
+        Files in `keep` (those still open) are never returned.
+        """
+        keep = {os.path.abspath(path) for path in keep if path}
+        pattern = cls.day_file_pattern(log_prefix)
+        try:
+            names = os.listdir(log_path)
+        except OSError:
+            return []
+        today = datetime.now().strftime('%Y%m%d')
+        writers = {}
+        for name in names:
+            match = pattern.match(name)
+            if not match:
+                continue
+            year, month, day, hour, pid, sequence, suffix = match.groups()
+            date = year + month + day
+            position = (int(hour) if hour is not None else -1, int(sequence or 0))
+            writers.setdefault((date, pid), []).append((position, suffix, os.path.join(log_path, name)))
+        closed = []
+        for (date, _), files in writers.items():
+            last = max(position for position, _, _ in files)
+            for position, suffix, path in files:
+                if suffix or os.path.abspath(path) in keep:
+                    continue
+                if date < today or position < last:
+                    closed.append(path)
+        return sorted(closed)
+
+    @classmethod
+    def enforce_retention(cls, log_path: str, log_prefix: str, max_age_days: int = 0, max_bytes: int = 0,
+                          keep: Iterable[str] = ()) -> List[str]:
+        """
+        Delete the oldest daily log files (segments, compressed segments, their indexes
+        and columnar archives) older than `max_age_days` days, then until the files
+        total at most `max_bytes`. Files in `keep` are never deleted. 0 disables a limit.
+
+        :return: Paths of the deleted files.
+        """
+        keep = {os.path.abspath(path) for path in keep if path}
+        pattern = re.compile(
+            rf"^{re.escape(str(log_prefix))}_log_(\d{{4}})_(\d{{2}})_(\d{{2}})"
+            rf"(?:-(\d{{2}})h)?(?:\.(\d+))?(?:-(\d{{4}}))?(?:\.log(?:{cls._suffix_pattern()})?|\.parquet)$"
+        )
+        try:
+            names = os.listdir(log_path)
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            match = pattern.match(name)
+            if not match:
+                continue
+            year, month, day, hour, _, sequence = match.groups()
+            path = os.path.join(log_path, name)
+            paths = [path] + ([path + INDEX_SUFFIX] if os.path.exists(path + INDEX_SUFFIX) else [])
+            try:
+                size = sum(os.path.getsize(member) for member in paths)
+            except OSError:
+                continue
+            files.append(((year + month + day, int(hour or -1), int(sequence or 0), name), paths, size))
+        files.sort()
+
+        oldest_kept = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y%m%d') if max_age_days else None
+        total = sum(size for _, _, size in files)
+        removed = []
+        for (date, _, _, _), paths, size in files:
+            if os.path.abspath(paths[0]) in keep:
+                continue
+            expired = oldest_kept is not None and date < oldest_kept
+            if not expired and not (max_bytes and total > max_bytes):
+                continue
+            for path in paths:
+                try:
+                    os.remove(path)
+                    removed.append(path)
+                except OSError as e:
+                    print(f"Failed to remove old log file {path}: {e}")
+            LogIndex.forget(paths[0])
+            cls._forget_row_counts(paths[0])
+            total -= size
+        return removed
+
+    @classmethod
+    def maintain(cls, log_path: str, log_prefix: str, compression: Optional[str] = None, max_age_days: int = 0,
+                 max_bytes: int = 0, keep: Callable[[], Iterable[str]] = tuple) -> None:
+        """
+        Compress the closed segments under `log_path` (once they have been idle for
+        CLOSE_GRACE_S) and apply retention. `keep` returns the files still open.
+        """
+        if compression:
+            for path in cls.closed_segments(log_path, log_prefix, keep()):
+                try:
+                    idle = time.time() - os.path.getmtime(path)
+                    if idle < cls.CLOSE_GRACE_S:
+                        time.sleep(cls.CLOSE_GRACE_S - idle)
+                        if time.time() - os.path.getmtime(path) < cls.CLOSE_GRACE_S:
+                            # Still being appended to; a later pass picks it up.
+                            continue
+                    if os.path.abspath(path) in {os.path.abspath(p) for p in keep() if p}:
+                        continue
+                    cls.compress(path, compression)
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError, ImportError) as e:
+                    print(f"Failed to compress log file {path}: {e}")
+        if max_age_days or max_bytes:
+            cls.enforce_retention(log_path, log_prefix, max_age_days, max_bytes, keep())
+
+    @classmethod
+    def maintain_in_background(cls, log_path: str, log_prefix: str, compression: Optional[str] = None,
+                               max_age_days: int = 0, max_bytes: int = 0,
+                               keep: Callable[[], Iterable[str]] = tuple) -> None:
+        """
+        Run `maintain` on a background thread. At most one pass runs per log directory;
+        a request made while one runs is carried out once it finishes.
+        """
+        arguments = (log_prefix, compression, max_age_days, max_bytes, keep)
+        with cls._threads_lock:
+            running = log_path in cls._pending
+            cls._pending[log_path] = arguments
+            if running:
+                return
+            cls._threads = [thread for thread in cls._threads if thread.is_alive()]
+            thread = threading.Thread(target=cls._run_maintenance, args=(log_path,),
+                                      name='BBLoggerLogRotation', daemon=True)
+            cls._threads.append(thread)
+            thread.start()
+
+    @classmethod
+    def _run_maintenance(cls, log_path: str) -> None:
+        while True:
+            with cls._threads_lock:
+                arguments = cls._pending.get(log_path)
+                if arguments is None:
+                    cls._pending.pop(log_path, None)
+                    return
+                cls._pending[log_path] = None
+            try:
+                cls.maintain(log_path, *arguments)
+            except Exception as e:
+                print(f"Log rotation maintenance failed for {log_path}: {e}")
+
+    @classmethod
+    def join(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the background compression and retention passes to finish.
+
+        :return: True if every pass finished within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with cls._threads_lock:
+            threads = list(cls._threads)
+        for thread in threads:
+            if thread is threading.current_thread():
+                continue
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in threads)
+
+    @classmethod
+    def reset_after_fork(cls) -> None:
+        cls._threads = []
+        cls._threads_lock = threading.Lock()
+        cls._pending = {}
+        cls._row_counts_lock = threading.Lock()
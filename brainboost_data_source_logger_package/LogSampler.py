@@ -0,0 +1,148 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Hashable, List, Tuple
+
+
+class _CallSite:
+    __slots__ = ('calls', 'tokens', 'refilled_at', 'last_seen', 'suppressed', 'suppressed_since', 'last_message')
+
+    def __init__(self, tokens: float, now: float):
+        self.calls = 0
+        self.tokens = tokens
+        self.refilled_at = now
+        self.last_seen = now
+        self.suppressed = 0
+        self.suppressed_since = 0.0
+        self.last_message = None
+
+
+class LogSampler:
+    """
+    Per-call-site sampling of log entries, checked before an entry is built.
+
+    A call site is the (file name, first line of the function, line number) tuple of
+    the frame that called `log()`. `mode` selects which of its entries are kept:
+
+    - 'every_n': the first of every `every_n` calls.
+    - 'probability': each call independently with `probability`.
+    - 'token_bucket': up to `burst` calls at once, refilled at `rate_per_s` per second.
+
+    Suppressed entries are counted per call site; `due_summaries` reports them at
+    most once per `summary_interval_ms`, so the log still shows how much was dropped.
+    Call sites idle for longer than that interval are forgotten, and at most
+    `_site_limit` are tracked.
+    """
+
+    MODES = ('every_n', 'probability', 'token_bucket')
+    _site_limit: int = 10000
+
+    def __init__(self, mode: str, every_n: int = 100, probability: float = 0.01, rate_per_s: float = 100.0,
+                 burst: int = 100, summary_interval_ms: int = 10000):
+        mode = str(mode or '').lower()
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid sampling mode: {mode}. Expected one of {', '.join(self.MODES)}.")
+        self.mode = mode
+        self.every_n = max(1, int(every_n))
+        self.probability = min(1.0, max(0.0, float(probability)))
+        self.rate = max(0.0, float(rate_per_s))
+        self.burst = max(1, int(burst))
+        self.summary_interval = max(0, int(summary_interval_ms)) / 1000.0
+        self._sites: Dict[Hashable, _CallSite] = {}
+        self._lock = threading.Lock()
+        self._next_summary = time.monotonic() + self.summary_interval
+        self.pending = False
+        self.passed = 0
+        self.suppressed = 0
+
+    def _get_site(self, site: Hashable, now: float) -> _CallSite:
+        # Called with self._lock held.
+        state = self._sites.get(site)
+        if state is None:
+            if len(self._sites) >= self._site_limit:
+                self._evict_idle_sites(now)
+                if len(self._sites) >= self._site_limit:
+                    self._sites.clear()
+            state = self._sites[site] = _CallSite(float(self.burst), now)
+        else:
+            state.last_seen = now
+        return state
+
+    def _evict_idle_sites(self, now: float) -> None:
+        """Forget the call sites with no unreported suppressed entries that are idle for a summary interval."""
+        cutoff = now - self.summary_interval
+        for site in [site for site, state in self._sites.items() if not state.suppressed and state.last_seen < cutoff]:
+            del self._sites[site]
+
+    def allow(self, site: Hashable) -> bool:
+        """Count a call from `site` and return whether its entry is kept."""
+        if self.mode == 'probability':
+            allowed = random.random() < self.probability
+            if allowed:
+                with self._lock:
+                    self.passed += 1
+            return allowed
+        with self._lock:
+            now = time.monotonic()
+            state = self._get_site(site, now)
+            if self.mode == 'every_n':
+                allowed = state.calls % self.every_n == 0
+                state.calls += 1
+            else:
+                state.tokens = min(float(self.burst), state.tokens + (now - state.refilled_at) * self.rate)
+                state.refilled_at = now
+                allowed = state.tokens >= 1.0
+                if allowed:
+                    state.tokens -= 1.0
+            if allowed:
+                self.passed += 1
+        return allowed
+
+    def suppress(self, site: Hashable, message) -> None:
+        """Record that the entry of a call that `allow` rejected was dropped."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._get_site(site, now)
+            if not state.suppressed:
+                state.suppressed_since = now
+            state.suppressed += 1
+            state.last_message = message
+            self.suppressed += 1
+            self.pending = True
+
+    def due_summaries(self, force: bool = False) -> List[Tuple[str, int, float, object]]:
+        """
+        Return (code location, suppressed count, seconds covered, last suppressed message)
+        for every call site with suppressed entries, once per summary interval (or now,
+        with `force`), and reset their counts.
+        """
+        now = time.monotonic()
+        if not self.pending or (not force and now < self._next_summary):
+            return []
+        summaries = []
+        with self._lock:
+            self._next_summary = now + self.summary_interval
+            self.pending = False
+            for site, state in self._sites.items():
+                if state.suppressed:
+                    summaries.append((self.site_location(site), state.suppressed, now - state.suppressed_since,
+                                      state.last_message))
+                    state.suppressed = 0
+                    state.last_message = None
+            if self.summary_interval:
+                self._evict_idle_sites(now)
+        return summaries
+
+    def stats(self) -> dict:
+        return {
+            'mode': self.mode,
+            'call_sites': len(self._sites),
+            'passed': self.passed,
+            'suppressed': self.suppressed,
+        }
+
+    @staticmethod
+    def site_location(site: Tuple[str, int, int]) -> str:
+        filename, _, lineno = site
+        return f"{os.path.basename(filename)}:{lineno}"
@@ -0,0 +1,230 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Iterable, List, Optional, Sequence
+
+from brainboost_data_source_logger_package.LogArchive import LogArchive
+from brainboost_data_source_logger_package.LogIndex import iter_log_rows
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+
+
+class LogSearchIndex:
+    """
+    SQLite FTS5 full-text index over log messages, queried by `BBLogger.search`.
+
+    `logs_fts` indexes the `message` column of a `logs` table as external content, so
+    the text is not stored twice. With the database sink, this is the `logs` table of
+    `log_sqlite3_path` and SQLiteLogSink adds each batch in its insert transaction. In
+    file mode, the same layout lives in a sidecar database under `log_path`: its
+    `logs` table holds the rows of the log files (and archives) along with the file
+    they came from, and each file is indexed from where the previous search stopped.
+    """
+
+    FTS_TABLE = 'logs_fts'
+    INSERT_BATCH = 50000
+    _available: Optional[bool] = None
+
+    def __init__(self, db_path: str, columns: Sequence[str], delimiter: str = ','):
+        self.db_path = db_path
+        self.columns = list(columns)
+        self.delimiter = delimiter
+
+    # -- shared by the database sink and the sidecar ------------------------------------
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether the sqlite3 module was built with FTS5."""
+        if cls._available is None:
+            try:
+                with closing(sqlite3.connect(':memory:')) as conn:
+                    conn.execute("CREATE VIRTUAL TABLE probe USING fts5(message);")
+                cls._available = True
+            except sqlite3.Error:
+                cls._available = False
+        return cls._available
+
+    @classmethod
+    def _require_fts5(cls) -> None:
+        if not cls.is_available():
+            raise RuntimeError("Log search requires SQLite with the FTS5 extension, which this Python lacks.")
+
+    @classmethod
+    def table_exists(cls, conn: sqlite3.Connection) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (cls.FTS_TABLE,)
+        ).fetchone() is not None
+
+    @classmethod
+    def create(cls, conn: sqlite3.Connection) -> None:
+        """
+        Create the index over an existing `logs` table and index the rows it already holds.
+        Must run inside a write transaction, so that no batch is inserted in between.
+        """
+        cls._require_fts5()
+        if cls.table_exists(conn):
+            return
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {cls.FTS_TABLE} USING fts5(message, content='logs', content_rowid='rowid', "
+            f"prefix='2 3');"
+        )
+        conn.execute(f"INSERT INTO {cls.FTS_TABLE}({cls.FTS_TABLE}) VALUES ('rebuild');")
+
+    @classmethod
+    def add_rows(cls, conn: sqlite3.Connection, first_rowid: int, last_rowid: int) -> None:
+        """Index the messages of the `logs` rows with first_rowid <= rowid <= last_rowid."""
+        conn.execute(
+            f"INSERT INTO {cls.FTS_TABLE}(rowid, message) SELECT rowid, message FROM logs "
+            f"WHERE rowid BETWEEN ? AND ?;",
+            (first_rowid, last_rowid)
+        )
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """
+        Turn free text into an FTS5 query: every word must start a word of the message,
+        case-insensitively. FTS5 operators in `query` are matched as plain text.
+        """
+        terms = [term.replace('"', '""') for term in str(query).split()]
+        return ' '.join(f'"{term}"*' for term in terms if term.strip('"'))
+
+    @classmethod
+    def query(cls, conn: sqlite3.Connection, columns: Sequence[str], query: str, t1: str, t2: str,
+              log_type: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[tuple]:
+        """
+        Return up to `limit` rows matching `query` with t1 <= timestamp <= t2, best match
+        first, each followed by its relevance score (BM25, higher is better).
+        """
+        expression = cls.match_expression(query)
+        if not expression:
+            return []
+        selected = ', '.join(f"logs.{column}" for column in columns)
+        sql = (
+            f"SELECT {selected}, -bm25({cls.FTS_TABLE}) AS score FROM {cls.FTS_TABLE} "
+            f"JOIN logs ON logs.rowid = {cls.FTS_TABLE}.rowid "
+            f"WHERE {cls.FTS_TABLE} MATCH ? AND logs.timestamp BETWEEN ? AND ?"
+        )
+        params = [expression, t1, t2]
+        if log_type is not None:
+            sql += " AND logs.log_type = ?"
+            params.append(str(log_type))
+        sql += f" ORDER BY bm25({cls.FTS_TABLE}), logs.timestamp, logs.rowid LIMIT ? OFFSET ?;"
+        return conn.execute(sql, (*params, limit, offset)).fetchall()
+
+    # -- file mode sidecar --------------------------------------------------------------
+
+    def connect(self) -> sqlite3.Connection:
+        self._require_fts5()
+        dir_path = os.path.dirname(self.db_path)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        with conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS logs ({', '.join(f'{column} TEXT' for column in self.columns)}, "
+                f"source TEXT);"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_source ON logs (source);")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_sources (source TEXT PRIMARY KEY, day TEXT NOT NULL, "
+                "offset INTEGER NOT NULL, complete INTEGER NOT NULL);"
+            )
+            self.create(conn)
+        return conn
+
+    @staticmethod
+    def source_key(path: str) -> str:
+        # A segment keeps its key, and its indexed offset, once it is compressed.
+        for suffix in LogRotation.COMPRESSION_SUFFIXES.values():
+            if path.endswith(suffix):
+                return path[:-len(suffix)]
+        return path
+
+    def update(self, conn: sqlite3.Connection, day: str, paths: Iterable[str]) -> int:
+        """
+        Bring the index of one 'YYYYMMDD' day up to date with its current files: index the
+        rows appended to each since the last update, and drop the rows of files that no
+        longer exist (e.g. merged into a Parquet archive or removed by retention).
+
+        :return: Number of rows added.
+        """
+        paths = list(paths)
+        keys = {self.source_key(path) for path in paths}
+        added = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            for (source,) in conn.execute("SELECT source FROM search_sources WHERE day = ?;", (day,)).fetchall():
+                if source not in keys:
+                    self._remove_source(conn, source)
+            for path in paths:
+                added += self._index_source(conn, day, path)
+        return added
+
+    def _remove_source(self, conn: sqlite3.Connection, source: str) -> None:
+        conn.execute(
+            f"INSERT INTO {self.FTS_TABLE}({self.FTS_TABLE}, rowid, message) "
+            f"SELECT 'delete', rowid, message FROM logs WHERE source = ?;",
+            (source,)
+        )
+        conn.execute("DELETE FROM logs WHERE source = ?;", (source,))
+        conn.execute("DELETE FROM search_sources WHERE source = ?;", (source,))
+
+    def _index_source(self, conn: sqlite3.Connection, day: str, path: str) -> int:
+        key = self.source_key(path)
+        found = conn.execute("SELECT offset, complete FROM search_sources WHERE source = ?;", (key,)).fetchone()
+        offset, complete = found if found else (0, 0)
+        if complete:
+            return 0
+        final = path.endswith(LogArchive.ARCHIVE_SUFFIX) or LogRotation.is_compressed(path)
+        if not final:
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                # Compressed since it was listed; the next update indexes the compressed copy.
+                return 0
+            if size == offset:
+                return 0
+            if size < offset:
+                # Replaced by a shorter file: index it again from the start.
+                self._remove_source(conn, key)
+                offset = 0
+
+        width = len(self.columns)
+        added = 0
+        rows = []
+        if path.endswith(LogArchive.ARCHIVE_SUFFIX):
+            for row in LogArchive.frame_to_rows(LogArchive.read(path, columns=self.columns)):
+                rows.append(row[:width])
+        else:
+            with LogRotation.open_binary(path) as log_file:
+                first = offset == 0
+                for row, _, end in iter_log_rows(log_file, offset, self.delimiter, self.columns):
+                    offset = end
+                    if first:
+                        first = False
+                        if row == self.columns:
+                            continue
+                    rows.append(row[:width] + [''] * (width - len(row)))
+                    if len(rows) >= self.INSERT_BATCH:
+                        added += self._insert_rows(conn, key, rows)
+                        rows = []
+        added += self._insert_rows(conn, key, rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO search_sources (source, day, offset, complete) VALUES (?, ?, ?, ?);",
+            (key, day, offset, int(final))
+        )
+        return added
+
+    def _insert_rows(self, conn: sqlite3.Connection, key: str, rows: List[List[str]]) -> int:
+        if not rows:
+            return 0
+        conn.executemany(
+            f"INSERT INTO logs ({', '.join(self.columns)}, source) "
+            f"VALUES ({', '.join('?' for _ in range(len(self.columns) + 1))});",
+            [(*row, key) for row in rows]
+        )
+        last_rowid = conn.execute("SELECT max(rowid) FROM logs;").fetchone()[0]
+        self.add_rows(conn, last_rowid - len(rows) + 1, last_rowid)
+        return len(rows)
@@ -0,0 +1,30 @@
+from typing import Any, Optional
+
+
+class LoggerSettings:
+    """
+    Immutable snapshot of every BBLogger configuration key, resolved once.
+
+    Each key of `BBLogger._default_config` becomes a plain attribute, already
+    normalized (booleans and integers coerced), so the logging hot path reads
+    attributes instead of going through `BBConfig.get` for every field.
+    """
+
+    def __init__(self, values: dict, generation: int = 0, config_signature: Optional[tuple] = None,
+                 check_interval: float = 1.0):
+        self.__dict__.update(values)
+        self._values = dict(values)
+        self.generation = generation
+        self.config_signature = config_signature
+        self.check_interval = check_interval
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def __setattr__(self, key, value):
+        if '_values' in self.__dict__ and key in self._values:
+            raise AttributeError(f"LoggerSettings is read-only: {key}")
+        super().__setattr__(key, value)
+
+    def __repr__(self):
+        return f"LoggerSettings(generation={self.generation}, {self._values!r})"
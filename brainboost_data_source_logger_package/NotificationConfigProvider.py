@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import requests
+
+
+class NotificationConfigProvider:
+    """
+    Supplies the key/value configuration used by Notifications (Telegram bot token,
+    chat id, ...) without putting a network round-trip on the alert path.
+
+    - `local_file`: if set, the configuration is read from this file (re-read when
+      its mtime changes) and the remote endpoint is never contacted.
+    - `url`: endpoint serving the `key=value` configuration text.
+    - `cache_path`: the last successful fetch is persisted here (mode 0600, as it
+      holds credentials), so a new process can alert before any fetch completes.
+    - `ttl_s`: a configuration older than this is still returned, and refreshed on
+      a background thread.
+    - `negative_ttl_s`: after a failed fetch no new attempt is made for this long.
+    - `timeout_ms`: timeout of each fetch.
+
+    Only a process with neither a cached nor a fetched configuration fetches on the
+    caller's thread, and that fetch is bounded by `timeout_ms`.
+    """
+
+    DEFAULT_URL = "https://storage.googleapis.com/brainboost_subjective_cloud_storage/global.config"
+
+    def __init__(self, url: Optional[str] = DEFAULT_URL, local_file: Optional[str] = None,
+                 cache_path: Optional[str] = None, ttl_s: float = 3600, negative_ttl_s: float = 60,
+                 timeout_ms: int = 3000):
+        self.url = url
+        self.local_file = local_file
+        self.cache_path = cache_path
+        self.ttl = max(0.0, float(ttl_s))
+        self.negative_ttl = max(0.0, float(negative_ttl_s))
+        self.timeout = max(1, int(timeout_ms)) / 1000.0
+        self._config: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._failed_at: Optional[float] = None
+        self._last_error: Optional[Exception] = None
+        self._local_mtime = None
+        self._disk_checked = False
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self.fetches = 0
+
+    @staticmethod
+    def parse_config(config_text: str) -> dict:
+        """
+        Parses `key=value` lines into a dictionary, skipping blank lines and comments.
+        """
+        config = {}
+        for line in config_text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "=" in line:
+                key, value = line.split("=", 1)
+                config[key.strip()] = value.strip()
+        return config
+
+    def get(self) -> dict:
+        """
+        Return the configuration, refreshing it in the background once it is older than the TTL.
+
+        :raises RuntimeError: If no configuration is known and the last fetch failed
+                              less than `negative_ttl_s` ago.
+        :raises requests.RequestException: If no configuration is known and fetching it fails.
+        """
+        if self.local_file:
+            return self._read_local_file()
+        with self._lock:
+            if self._config is None and not self._disk_checked:
+                self._load_disk_cache()
+            if self._config is not None:
+                if time.time() - self._fetched_at >= self.ttl:
+                    self._refresh_in_background()
+                return self._config
+            self._raise_if_recently_failed()
+        with self._fetch_lock:
+            # Another thread may have completed the first fetch while we waited.
+            with self._lock:
+                if self._config is not None:
+                    return self._config
+                self._raise_if_recently_failed()
+            return self.refresh()
+
+    def refresh(self) -> dict:
+        """
+        Fetch the configuration now and update the in-memory and on-disk caches.
+
+        :raises requests.RequestException: If the fetch fails; the failure is cached for `negative_ttl_s`.
+        """
+        try:
+            self.fetches += 1
+            response = requests.get(self.url, allow_redirects=True, timeout=self.timeout)
+            response.raise_for_status()
+            config = self.parse_config(response.text)
+        except requests.RequestException as e:
+            with self._lock:
+                self._failed_at = time.time()
+                self._last_error = e
+            raise
+        with self._lock:
+            self._config = config
+            self._fetched_at = time.time()
+            self._failed_at = None
+            self._last_error = None
+        self._write_disk_cache(config)
+        return config
+
+    def _raise_if_recently_failed(self) -> None:
+        if self._failed_at is not None and time.time() - self._failed_at < self.negative_ttl:
+            raise RuntimeError(f"Notification configuration unavailable: {self._last_error}")
+
+    def _refresh_in_background(self) -> None:
+        # Called with self._lock held.
+        if self._refreshing:
+            return
+        if self._failed_at is not None and time.time() - self._failed_at < self.negative_ttl:
+            return
+        self._refreshing = True
+        threading.Thread(target=self._background_refresh, name='BBLoggerNotificationConfig', daemon=True).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except requests.RequestException as e:
+            print(f"Failed to refresh notification configuration, keeping the cached one: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _read_local_file(self) -> dict:
+        with self._lock:
+            mtime = os.stat(self.local_file).st_mtime_ns
+            if self._config is None or mtime != self._local_mtime:
+                with open(self.local_file, 'r', encoding='utf-8') as f:
+                    self._config = self.parse_config(f.read())
+                self._local_mtime = mtime
+            return self._config
+
+    def _load_disk_cache(self) -> None:
+        # Called with self._lock held.
+        self._disk_checked = True
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(cached, dict) or cached.get('url') != self.url or not isinstance(cached.get('config'), dict):
+            return
+        self._config = cached['config']
+        self._fetched_at = float(cached.get('fetched_at') or 0.0)
+
+    def _write_disk_cache(self, config: dict) -> None:
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            dir_path = os.path.dirname(self.cache_path)
+            if dir_path and not os.path.exists(dir_path):
+                os.makedirs(dir_path, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'url': self.url, 'fetched_at': self._fetched_at, 'config': config}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Failed to write notification configuration cache {self.cache_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -0,0 +1,291 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+class NotificationDispatcher:
+    """
+    Delivers log notifications from background threads so that a slow or failing
+    endpoint never stalls the thread that logged.
+
+    Every channel (a Slack webhook, a URL webhook, Telegram) gets its own queue,
+    worker thread and pooled `requests.Session`. Entries arriving within
+    `batch_interval_ms` of the oldest pending one are coalesced into a single
+    message of at most `max_batch` entries. Each channel sends at most
+    `rate_limit` messages per minute; while it waits for the limiter, entries keep
+    accumulating into the next batch. Requests time out after `timeout_ms` and are
+    retried up to `max_retries` times with exponential backoff on connection
+    errors, timeouts, HTTP 429 and 5xx responses.
+
+    A channel is identified by its name and destination (e.g. the webhook URL);
+    its `deliver(session, entries, timeout)` callable sends one message for a list
+    of entries and raises on failure.
+    """
+
+    RETRY_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, timeout_ms: int = 5000, max_retries: int = 3, backoff_ms: int = 500,
+                 rate_limit: int = 20, batch_interval_ms: int = 1000, max_batch: int = 50,
+                 queue_size: int = 1000):
+        self.timeout = max(1, int(timeout_ms)) / 1000.0
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = max(0, int(backoff_ms)) / 1000.0
+        self.rate_limit = max(0, int(rate_limit))
+        self.batch_interval = max(0, int(batch_interval_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.queue_size = max(1, int(queue_size))
+        self._channels: Dict[tuple, _NotificationChannel] = {}
+        self._lock = threading.Lock()
+
+    def _get_channel(self, channel: str, destination: str, deliver: Callable) -> '_NotificationChannel':
+        key = (channel, destination)
+        state = self._channels.get(key)
+        if state is None:
+            with self._lock:
+                state = self._channels.get(key)
+                if state is None:
+                    state = _NotificationChannel(self, channel, deliver)
+                    self._channels[key] = state
+        return state
+
+    def submit(self, channel: str, destination: str, entry, deliver: Callable) -> bool:
+        """
+        Queue an entry for `channel` and return immediately. `deliver` is used the
+        first time the channel and destination are seen.
+
+        :return: True if the entry was queued, False if the dispatcher is shut down.
+        """
+        return self._get_channel(channel, destination, deliver).submit(entry)
+
+    def send(self, channel: str, destination: str, entries: List, deliver: Callable) -> bool:
+        """
+        Deliver entries on the calling thread, with the channel's session, timeout,
+        retries and rate limit but without queueing or coalescing.
+
+        :return: True if the message was delivered.
+        """
+        return self._get_channel(channel, destination, deliver).send(entries)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Send every pending entry now, skipping the coalescing window, and wait for
+        the deliveries to finish.
+
+        :return: True if every channel drained, False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        drained = True
+        for state in list(self._channels.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            drained = state.flush(remaining) and drained
+        return drained
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Deliver what is pending, ignoring the rate limit, and stop the worker threads.
+
+        :return: True if every worker thread exited within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        channels = list(self._channels.values())
+        for state in channels:
+            state.close()
+        stopped = True
+        for state in channels:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            stopped = state.join(remaining) and stopped
+        return stopped
+
+    def stats(self) -> dict:
+        """
+        Counters per channel name, summed over destinations: submitted, delivered,
+        messages, failed, dropped, retries and pending entries.
+        """
+        totals = {}
+        for (channel, _), state in list(self._channels.items()):
+            counters = totals.setdefault(channel, {})
+            for key, value in state.stats().items():
+                counters[key] = counters.get(key, 0) + value
+        return totals
+
+
+class _NotificationChannel:
+    def __init__(self, dispatcher: NotificationDispatcher, name: str, deliver: Callable):
+        self.dispatcher = dispatcher
+        self.name = name
+        self._deliver = deliver
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flush_requests = 0
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._tokens = float(dispatcher.rate_limit)
+        self._refilled_at = time.monotonic()
+        self.submitted = 0
+        self.delivered = 0
+        self.messages = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+
+    # -- producer side -----------------------------------------------------------
+
+    def submit(self, entry) -> bool:
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._queue) >= self.dispatcher.queue_size:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append((time.monotonic(), entry))
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"BBLoggerNotifications[{self.name}]", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+            return True
+
+    def send(self, entries: List) -> bool:
+        with self._condition:
+            self.submitted += len(entries)
+            wait = self._take_token()
+            while wait > 0:
+                self._condition.wait(wait)
+                wait = self._take_token()
+        return self._deliver_with_retries(entries)
+
+    def flush(self, timeout: Optional[float]) -> bool:
+        with self._condition:
+            self._flush_requests += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+            finally:
+                self._flush_requests -= 1
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def join(self, timeout: Optional[float]) -> bool:
+        thread = self._thread
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'submitted': self.submitted,
+                'delivered': self.delivered,
+                'messages': self.messages,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'retries': self.retries,
+                'pending': len(self._queue) + self._in_flight,
+            }
+
+    # -- worker side -------------------------------------------------------------
+
+    def _take_token(self) -> float:
+        """Consume a rate-limit token. Returns 0 on success, else the seconds until one is available."""
+        limit = self.dispatcher.rate_limit
+        if not limit or self._closed:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(float(limit), self._tokens + (now - self._refilled_at) * limit / 60.0)
+        self._refilled_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) * 60.0 / limit
+
+    def _next_batch(self) -> Optional[List]:
+        dispatcher = self.dispatcher
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                self._condition.notify_all()
+                return None
+            # Coalesce everything that arrives within the window opened by the oldest entry.
+            deadline = self._queue[0][0] + dispatcher.batch_interval
+            while not self._closed and not self._flush_requests and len(self._queue) < dispatcher.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            wait = self._take_token()
+            while wait > 0:
+                self._condition.wait(wait)
+                wait = self._take_token()
+            count = min(dispatcher.max_batch, len(self._queue))
+            batch = [self._queue.popleft()[1] for _ in range(count)]
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._deliver_with_retries(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = requests.Session()
+        return self._session
+
+    def _deliver_with_retries(self, entries: List) -> bool:
+        dispatcher = self.dispatcher
+        session = self._get_session()
+        error = None
+        for attempt in range(dispatcher.max_retries + 1):
+            delay = dispatcher.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+            try:
+                self._deliver(session, entries, dispatcher.timeout)
+                with self._condition:
+                    self.delivered += len(entries)
+                    self.messages += 1
+                return True
+            except requests.HTTPError as e:
+                error = e
+                response = e.response
+                status = response.status_code if response is not None else None
+                if status not in NotificationDispatcher.RETRY_STATUS_CODES:
+                    break
+                retry_after = response.headers.get('Retry-After') if response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except Exception as e:
+                error = e
+                break
+            if attempt < dispatcher.max_retries:
+                with self._condition:
+                    self.retries += 1
+                time.sleep(delay)
+        with self._condition:
+            self.failed += len(entries)
+        print(f"Failed to send {self.name} notification: {error}")
+        return False
@@ -1,16 +1,66 @@
+import os
+from typing import Optional
+
 import requests
 
+from brainboost_data_source_logger_package.NotificationConfigProvider import NotificationConfigProvider
+from brainboost_configuration_package.BBConfig import BBConfig
+
 class Notifications:
-    _cached_config = None  # Cache for configuration
+    _config_provider: Optional[NotificationConfigProvider] = None
+    _config_provider_settings: Optional[tuple] = None
+    _default_config = {
+        'log_notification_config_url': NotificationConfigProvider.DEFAULT_URL,
+        'log_notification_config_file': None,
+        'log_notification_config_cache': os.path.join(
+            os.path.expanduser('~'), '.cache', 'brainboost', 'notifications_config.json'
+        ),
+        'log_notification_config_ttl_s': 3600,
+        'log_notification_config_negative_ttl_s': 60,
+        'log_notification_config_timeout_ms': 3000
+    }
 
     @classmethod
-    def load_config_text(cls):
+    def _get_setting(cls, key: str):
+        try:
+            value = BBConfig.get(key)
+        except Exception:
+            value = None
+        return cls._default_config[key] if value is None else value
+
+    @classmethod
+    def get_config_provider(cls) -> NotificationConfigProvider:
+        """
+        Returns the provider of the notification configuration, rebuilt whenever the
+        `log_notification_config_*` settings change. Set `log_notification_config_file`
+        to use a local file instead of the remote endpoint.
+        """
+        settings = tuple(cls._get_setting(key) for key in cls._default_config)
+        provider = cls._config_provider
+        if provider is None or settings != cls._config_provider_settings:
+            url, local_file, cache_path, ttl_s, negative_ttl_s, timeout_ms = settings
+            provider = NotificationConfigProvider(
+                url=url,
+                local_file=local_file or None,
+                cache_path=cache_path or None,
+                ttl_s=float(ttl_s),
+                negative_ttl_s=float(negative_ttl_s),
+                timeout_ms=int(timeout_ms)
+            )
+            cls._config_provider = provider
+            cls._config_provider_settings = settings
+        return provider
+
+    @classmethod
+    def load_config_text(cls, timeout=None):
         """
         Fetches the raw configuration text from the global.config file in your GCS bucket.
         Uses the recommended public endpoint to avoid unnecessary redirects.
         """
-        url = "https://storage.googleapis.com/brainboost_subjective_cloud_storage/global.config"
-        response = requests.get(url, allow_redirects=True)
+        url = cls._get_setting('log_notification_config_url')
+        if timeout is None:
+            timeout = int(cls._get_setting('log_notification_config_timeout_ms')) / 1000.0
+        response = requests.get(url, allow_redirects=True, timeout=timeout)
         response.raise_for_status()  # Raise an exception if the request failed
         return response.text
 
@@ -19,31 +69,23 @@ class Notifications:
         """
         Parses the configuration text into a dictionary.
         """
-        config = {}
-        for line in config_text.splitlines():
-            line = line.strip()
-            # Skip blank lines or comments
-            if not line or line.startswith("#"):
-                continue
-            if "=" in line:
-                key, value = line.split("=", 1)
-                config[key.strip()] = value.strip()
-        return config
+        return NotificationConfigProvider.parse_config(config_text)
 
     @classmethod
     def get_config(cls):
         """
-        Returns the cached configuration if available; otherwise loads and caches it.
+        Returns the notification configuration from the local file override, the in-memory
+        or on-disk cache, or the remote endpoint, in that order (see NotificationConfigProvider).
         """
-        if cls._cached_config is None:
-            config_text = cls.load_config_text()
-            cls._cached_config = cls.parse_config(config_text)
-        return cls._cached_config
+        return cls.get_config_provider().get()
 
     @classmethod
-    def send_telegram_message(cls, message):
+    def send_telegram_message(cls, message, session=None, timeout=None):
         """
         Sends a message via Telegram Bot API using the cached configuration.
+
+        :param session: Optional requests.Session to reuse pooled connections.
+        :param timeout: Optional request timeout in seconds.
         """
         config = cls.get_config()
         bot_token = config.get("brainboost_notifications_telegram_bot_token")
@@ -57,7 +99,7 @@ class Notifications:
             "chat_id": chat_id,
             "text": message
         }
-        response = requests.post(url, data=payload)
+        response = (session or requests).post(url, data=payload, timeout=timeout)
         response.raise_for_status()
         return response.json()
 
@@ -0,0 +1,90 @@
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from brainboost_data_source_logger_package.LogArchive import LogArchive
+from brainboost_data_source_logger_package.LogReader import LogReader
+
+# (files of each writer, Parquet archive or None, whether to seek to t1 through the index)
+DayTask = Tuple[List[List[str]], Optional[str], bool]
+
+
+class ParallelLogReader:
+    """
+    Reads the days of a timestamp range concurrently, for
+    `get_logs_between_timestampt_and_timestampt` over many days.
+
+    Every day is one task: the worker parses that day's files (or filters its
+    Parquet archive), keeps the rows between t1 and t2 and sends back a DataFrame
+    of those rows only. Results are returned in the order of the days. Tasks carry
+    everything the worker needs, so workers never read the logger configuration.
+
+    'process' workers parse in parallel on several cores; they are started with
+    forkserver (spawn where unavailable) rather than fork, so a worker never
+    inherits a lock held by another thread of the caller. 'thread' workers avoid
+    process start-up and pickling, but only overlap I/O and Parquet decoding.
+    The pool is started on first use and kept until `shutdown`.
+    """
+
+    EXECUTORS = ('process', 'thread')
+
+    def __init__(self, workers: int, executor: str = 'process'):
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Invalid log read executor: {executor}. Expected one of {self.EXECUTORS}.")
+        self.workers = max(1, int(workers))
+        self.executor = executor
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.executor == 'thread':
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='bblogger-read')
+                else:
+                    methods = multiprocessing.get_all_start_methods()
+                    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            return self._pool
+
+    def read_days(self, days: Sequence[DayTask], columns: Sequence[str], delimiter: str, index_stride: int,
+                  dt1: datetime, dt2: datetime) -> List[pd.DataFrame]:
+        """
+        Read the rows with dt1 <= timestamp <= dt2 of every day, one DataFrame per day in the order of `days`.
+
+        :raises concurrent.futures.BrokenExecutor: If a worker died; the pool is discarded.
+        """
+        task = partial(self.read_day, list(columns), delimiter, index_stride, dt1, dt2)
+        try:
+            return list(self._get_pool().map(task, days))
+        except Exception:
+            pool = self._pool
+            if pool is not None and getattr(pool, '_broken', False):
+                with self._lock:
+                    self._pool = None
+                pool.shutdown(wait=False)
+            raise
+
+    @staticmethod
+    def read_day(columns: List[str], delimiter: str, index_stride: int, dt1: datetime, dt2: datetime,
+                 day: DayTask) -> pd.DataFrame:
+        groups, archive_path, seek = day
+        if archive_path:
+            return LogArchive.read(archive_path, columns=columns, start=dt1, end=dt2)
+        rows = list(LogReader.stream_day_rows(
+            groups, columns, delimiter, dt1.strftime('%Y%m%d%H%M%S'), dt2.strftime('%Y%m%d%H%M%S'), seek,
+            index_stride
+        ))
+        return LogReader.rows_to_frame(rows, columns)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=wait)
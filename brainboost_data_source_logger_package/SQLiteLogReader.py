@@ -0,0 +1,139 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from brainboost_data_source_logger_package.LogReader import LogReader
+
+
+class SQLiteLogReader:
+    """
+    Read side of the `logs` table written by SQLiteLogSink, used by the BBLogger read
+    APIs when `log_read_backend` is 'sqlite'.
+
+    Nothing is located with an OFFSET over the table: a day's row count is read from
+    the `log_days` counter, a page starts from the nearest `log_marks` rowid at or
+    before it (so reaching any row costs at most `mark_stride` steps along the
+    rowid), and ranges are streamed in keyset batches on (timestamp, rowid) using the
+    timestamp index. Rows come back as tuples of the stored strings, in log column order.
+    """
+
+    def __init__(self, db_path: str, columns: Sequence[str], batch_size: int = 10000):
+        self.db_path = db_path
+        self.columns = list(columns)
+        self.batch_size = max(1, int(batch_size))
+        self._select = ', '.join(self.columns)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Log database does not exist: {self.db_path}")
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+
+    @staticmethod
+    def day_bounds(day: str) -> Tuple[str, str]:
+        return f"{day}000000", f"{day}235959"
+
+    def count_day(self, day: str) -> int:
+        """Number of rows of a 'YYYYMMDD' day, from the counter maintained on insert."""
+        with closing(self._connect()) as conn:
+            found = conn.execute("SELECT row_count FROM log_days WHERE day = ?;", (day,)).fetchone()
+        return found[0] if found else 0
+
+    def read_day(self, day: str, start: int, count: int) -> List[tuple]:
+        """Return `count` rows of a day starting at its 0-based row `start`, in insertion order."""
+        with closing(self._connect()) as conn:
+            mark = conn.execute(
+                "SELECT position, log_rowid FROM log_marks WHERE day = ? AND position <= ? "
+                "ORDER BY position DESC LIMIT 1;",
+                (day, start)
+            ).fetchone()
+            position, rowid = mark if mark else (0, 0)
+            # NOT INDEXED keeps the scan on the rowid instead of the timestamp index.
+            return conn.execute(
+                f"SELECT {self._select} FROM logs NOT INDEXED WHERE rowid >= ? AND timestamp BETWEEN ? AND ? "
+                f"ORDER BY rowid LIMIT ? OFFSET ?;",
+                (rowid, *self.day_bounds(day), count, start - position)
+            ).fetchall()
+
+    def iter_day(self, day: str) -> Iterator[tuple]:
+        """Stream every row of a day in insertion order, in keyset batches on the rowid."""
+        remaining = self.count_day(day)
+        if not remaining:
+            return
+        with closing(self._connect()) as conn:
+            found = conn.execute(
+                "SELECT log_rowid FROM log_marks WHERE day = ? AND position = 0;", (day,)
+            ).fetchone()
+            last_rowid = found[0] - 1 if found else -1
+            sql = (
+                f"SELECT rowid, {self._select} FROM logs NOT INDEXED WHERE rowid > ? AND timestamp BETWEEN ? AND ? "
+                f"ORDER BY rowid LIMIT ?;"
+            )
+            while remaining > 0:
+                batch = conn.execute(sql, (last_rowid, *self.day_bounds(day), self.batch_size)).fetchall()
+                if not batch:
+                    return
+                last_rowid = batch[-1][0]
+                remaining -= len(batch)
+                for row in batch:
+                    yield row[1:]
+
+    def iter_range(self, t1: str, t2: str, filters: Optional[dict] = None) -> Iterator[tuple]:
+        """
+        Stream the rows with t1 <= timestamp <= t2 ('YYYYMMDDHHMMSS') in (timestamp, rowid) order.
+
+        Value and collection conditions of `filters` become SQL `=`/`IN` clauses; callable
+        conditions are applied to the returned rows, as LogReader.compile_filters does.
+
+        :raises ValueError: If a filter names an unknown column.
+        """
+        clauses, params, predicate = self.compile_filters(filters, self.columns)
+        where = ''.join(f" AND {clause}" for clause in clauses)
+        sql = (
+            f"SELECT rowid, {self._select} FROM logs INDEXED BY idx_logs_timestamp "
+            f"WHERE timestamp >= ? AND timestamp <= ? AND (timestamp > ? OR rowid > ?){where} "
+            f"ORDER BY timestamp, rowid LIMIT ?;"
+        )
+        return self._iter_keyset(sql, t1, t2, params, predicate)
+
+    def _iter_keyset(self, sql: str, t1: str, t2: str, params: List[str], predicate) -> Iterator[tuple]:
+        ts_index = self.columns.index('timestamp') + 1
+        last_timestamp, last_rowid = t1, -1
+        with closing(self._connect()) as conn:
+            while True:
+                batch = conn.execute(
+                    sql, (last_timestamp, t2, last_timestamp, last_rowid, *params, self.batch_size)
+                ).fetchall()
+                for row in batch:
+                    if predicate is None or predicate(row[1:]):
+                        yield row[1:]
+                if len(batch) < self.batch_size:
+                    return
+                last_timestamp, last_rowid = batch[-1][ts_index], batch[-1][0]
+
+    @staticmethod
+    def compile_filters(filters: Optional[dict], columns: Sequence[str]
+                        ) -> Tuple[List[str], List[str], Optional[Callable[[Sequence[str]], bool]]]:
+        """
+        Split a `{column: condition}` mapping into SQL clauses with their parameters and a
+        predicate over rows for the callable conditions.
+
+        :raises ValueError: If a filter names an unknown column.
+        """
+        clauses, params, remaining = [], [], {}
+        for column, condition in (filters or {}).items():
+            if column not in columns:
+                raise ValueError(f"Unknown log column in filters: {column}")
+            if callable(condition):
+                remaining[column] = condition
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                values = sorted({str(value) for value in condition})
+                if not values:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(str(condition))
+        return clauses, params, LogReader.compile_filters(remaining, columns)
@@ -0,0 +1,226 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from brainboost_data_source_logger_package.LogSearchIndex import LogSearchIndex
+
+
+class SQLiteLogSink:
+    """
+    Long-lived, batched writer for the `logs` table.
+
+    One connection is kept open per process. Rows are buffered and written with a
+    single `executemany` transaction once `batch_size` rows are pending or the
+    oldest pending row is older than `flush_interval_ms`.
+
+    The same transaction maintains two tables for SQLiteLogReader: `log_days`, the
+    number of rows per 'YYYYMMDD' day, and `log_marks`, the rowid of every
+    `mark_stride`-th row of each day. A batch gets consecutive rowids because the
+    insert holds the database's write lock until the commit. Once the full-text
+    index of LogSearchIndex exists (created up front with `search_index`, or by the
+    first search), each batch is added to it in the same transaction.
+
+    If a flush fails (the database is locked by another writer, the disk is full),
+    its rows are kept and retried after another `flush_interval_ms` or another
+    `batch_size` rows, not on every write. At most `max_buffered_rows` are kept;
+    the oldest rows past that are dropped and counted in `rows_dropped`.
+    """
+
+    SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    INDEXED_COLUMNS = ('timestamp', 'log_type', 'process')
+    BACKFILL_CHUNK = 100000
+
+    def __init__(self, db_path: str, columns: Sequence[str], batch_size: int = 100,
+                 flush_interval_ms: int = 1000, synchronous: str = 'NORMAL', wal: bool = True,
+                 mark_stride: int = 1000, search_index: bool = False, max_buffered_rows: int = 10000):
+        synchronous = str(synchronous or 'NORMAL').upper()
+        if synchronous not in self.SYNCHRONOUS_LEVELS:
+            raise ValueError(
+                f"Invalid synchronous level: {synchronous}. Expected one of {', '.join(self.SYNCHRONOUS_LEVELS)}."
+            )
+        self.db_path = db_path
+        self.columns = list(columns)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0, int(flush_interval_ms)) / 1000.0
+        self.synchronous = synchronous
+        self.wal = wal
+        self.mark_stride = max(1, int(mark_stride))
+        self.search_index = search_index
+        self.max_buffered_rows = max(self.batch_size, int(max_buffered_rows))
+        self._search_indexed = False
+        self._ts_index = self.columns.index('timestamp') if 'timestamp' in self.columns else None
+        self._insert_sql = (
+            f"INSERT INTO logs ({', '.join(self.columns)}) VALUES ({', '.join(['?' for _ in self.columns])});"
+        )
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._buffer: List[Sequence] = []
+        self._buffer_started: float = 0.0
+        # Buffered row count that triggers a flush; raised after a failed flush.
+        self._flush_at = self.batch_size
+        self._timer: Optional[threading.Timer] = None
+        self.rows_written = 0
+        self.rows_dropped = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        if self._pid is not None and self._pid != os.getpid():
+            # Inherited across fork(): the parent owns both the connection and the pending rows.
+            self._conn = None
+            self._buffer = []
+            self._flush_at = self.batch_size
+            self._timer = None
+        dir_path = os.path.dirname(self.db_path)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(f"PRAGMA synchronous={self.synchronous};")
+        self._create_schema(conn)
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        columns_str = ", ".join([f"{col} TEXT" for col in self.columns])
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS logs ({columns_str});")
+            for column in self.INDEXED_COLUMNS:
+                if column in self.columns:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_logs_{column} ON logs ({column});")
+        if self._ts_index is None:
+            return
+        with conn:
+            # Created and backfilled under the write lock, so no other process counts rows in between.
+            conn.execute("BEGIN IMMEDIATE;")
+            conn.execute("CREATE TABLE IF NOT EXISTS log_days (day TEXT PRIMARY KEY, row_count INTEGER NOT NULL);")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS log_marks (day TEXT NOT NULL, position INTEGER NOT NULL, "
+                "log_rowid INTEGER NOT NULL, PRIMARY KEY (day, position)) WITHOUT ROWID;"
+            )
+            if conn.execute("SELECT 1 FROM log_days LIMIT 1;").fetchone() is None:
+                self._backfill_counters(conn)
+        if self.search_index and 'message' in self.columns and LogSearchIndex.is_available():
+            with conn:
+                conn.execute("BEGIN IMMEDIATE;")
+                LogSearchIndex.create(conn)
+
+    def _backfill_counters(self, conn: sqlite3.Connection) -> None:
+        # A table written before the counters existed is counted once, in bounded chunks.
+        cursor = conn.execute("SELECT rowid, timestamp FROM logs ORDER BY rowid;")
+        while True:
+            chunk = cursor.fetchmany(self.BACKFILL_CHUNK)
+            if not chunk:
+                return
+            days = {}
+            for rowid, timestamp in chunk:
+                days.setdefault(str(timestamp)[:8], []).append(rowid)
+            self._add_to_counters(conn, days)
+
+    def _count_batch(self, conn: sqlite3.Connection, rows: List[Sequence], first_rowid: int) -> None:
+        if self._ts_index is None:
+            return
+        days = {}
+        for offset, row in enumerate(rows):
+            days.setdefault(str(row[self._ts_index])[:8], []).append(first_rowid + offset)
+        self._add_to_counters(conn, days)
+
+    def _add_to_counters(self, conn: sqlite3.Connection, days: dict) -> None:
+        """Add the rowids of new rows, grouped by day and in insertion order, to `log_days` and `log_marks`."""
+        stride = self.mark_stride
+        for day, rowids in days.items():
+            found = conn.execute("SELECT row_count FROM log_days WHERE day = ?;", (day,)).fetchone()
+            count = found[0] if found else 0
+            first_mark = (count + stride - 1) // stride * stride
+            conn.executemany(
+                "INSERT OR REPLACE INTO log_marks (day, position, log_rowid) VALUES (?, ?, ?);",
+                [(day, position, rowids[position - count])
+                 for position in range(first_mark, count + len(rowids), stride)]
+            )
+            conn.execute("INSERT OR REPLACE INTO log_days (day, row_count) VALUES (?, ?);", (day, count + len(rowids)))
+
+    def ensure_schema(self) -> None:
+        with self._lock:
+            self._connect()
+
+    def write(self, row: Sequence) -> None:
+        with self._lock:
+            self._connect()
+            if not self._buffer:
+                self._buffer_started = time.monotonic()
+            self._buffer.append(row)
+            if len(self._buffer) >= self._flush_at:
+                self._flush_locked()
+            elif self.flush_interval and time.monotonic() - self._buffer_started >= self.flush_interval:
+                self._flush_locked()
+            elif self.flush_interval and self._timer is None:
+                self._start_timer()
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"Failed to write logs to database: {e}")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            if self._timer is not threading.current_thread():
+                self._timer.cancel()
+            self._timer = None
+        if self._pid != os.getpid():
+            self._buffer = []
+            return
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            with self._conn:
+                self._conn.executemany(self._insert_sql, rows)
+                last_rowid = self._conn.execute("SELECT max(rowid) FROM logs;").fetchone()[0]
+                first_rowid = last_rowid - len(rows) + 1
+                self._count_batch(self._conn, rows, first_rowid)
+                if self._search_indexed or LogSearchIndex.table_exists(self._conn):
+                    self._search_indexed = True
+                    LogSearchIndex.add_rows(self._conn, first_rowid, last_rowid)
+        except sqlite3.Error:
+            # The transaction was rolled back (e.g. the database was busy or the disk full):
+            # keep the batch, ahead of newer rows, and retry after another interval or batch.
+            self._buffer = rows + self._buffer
+            excess = len(self._buffer) - self.max_buffered_rows
+            if excess > 0:
+                del self._buffer[:excess]
+                self.rows_dropped += excess
+            self._buffer_started = time.monotonic()
+            self._flush_at = len(self._buffer) + self.batch_size
+            if self.flush_interval:
+                self._start_timer()
+            raise
+        self._flush_at = self.batch_size
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self._conn is not None and self._pid == os.getpid():
+                    self._conn.close()
+                self._conn = None
+                self._pid = None
@@ -2,5 +2,6 @@
 
 from .BBLogger import BBLogger
 from .BBLogEntry import BBLogEntry
+from .AsyncBBLogger import AsyncBBLogger
 
-__all__ = ['BBLogger', 'BBLogEntry']
+__all__ = ['BBLogger', 'BBLogEntry', 'AsyncBBLogger']
@@ -14,10 +14,14 @@ setup(
         'requests>=2.25.1',
         'brainboost_configuration_package'
     ],
+    extras_require={
+        'parquet': ['pyarrow'],
+        'zstd': ['zstandard'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
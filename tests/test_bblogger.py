@@ -3,13 +3,51 @@ from brainboost_data_source_logger_package.BBLogger import BBLogger
 from brainboost_configuration_package.BBConfig import BBConfig
 import random
 import string
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import os
+import sqlite3
+import multiprocessing
+import json
+import asyncio
+import requests
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+from brainboost_data_source_logger_package.AsyncLogWriter import AsyncLogWriter
+from brainboost_data_source_logger_package.SQLiteLogSink import SQLiteLogSink
+from brainboost_data_source_logger_package.LogFileSink import LogFileSink
+from brainboost_data_source_logger_package.LogClassifier import LogClassifier, parse_level_keywords
+from brainboost_data_source_logger_package.LogIndex import LogIndex
+from brainboost_data_source_logger_package.LogArchive import LogArchive
+from brainboost_data_source_logger_package.LogRotation import LogRotation
+from brainboost_data_source_logger_package.LogSampler import LogSampler
+from brainboost_data_source_logger_package.NotificationDispatcher import NotificationDispatcher
+from brainboost_data_source_logger_package.NotificationConfigProvider import NotificationConfigProvider
+from brainboost_data_source_logger_package.Notifications import Notifications
+from brainboost_data_source_logger_package.AsyncBBLogger import AsyncBBLogger
+from brainboost_data_source_logger_package.BBLogEntry import BBLogEntry
+from brainboost_data_source_logger_package.LogFollower import LogFollower
+from brainboost_data_source_logger_package.LogMetrics import LogMetrics
 
 def random_message(length=50):
     """Generate a random string of fixed length."""
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
 
+@contextmanager
+def config_overrides(**values):
+    """Temporarily override BBConfig keys, restoring the previous overrides afterwards."""
+    overrides_backup = BBConfig._overrides.copy()
+    try:
+        for key, value in values.items():
+            BBConfig.override(key, value)
+        yield
+    finally:
+        BBConfig._overrides = overrides_backup
+        BBLogger.invalidate_config()
+
 def test_get_config_accepts_uppercase_and_lowercase_keys():
     conf_backup = BBConfig._conf.copy()
     overrides_backup = BBConfig._overrides.copy()
@@ -30,6 +68,7 @@ def test_get_config_accepts_uppercase_and_lowercase_keys():
         BBLogger._config_disabled = False
         BBLogger._log_file_path = None
         BBLogger._last_time = datetime(2024, 1, 2, 3, 4, 5)
+        BBLogger.invalidate_config()
 
         assert BBLogger._get_config("log_path") == "tests/logs_lower"
         assert BBLogger._get_config("LOG_PATH") == "tests/logs_upper"
@@ -46,6 +85,7 @@ def test_get_config_accepts_uppercase_and_lowercase_keys():
         BBLogger._config_disabled = config_disabled_backup
         BBLogger._last_time = last_time_backup
         BBLogger._log_file_path = log_file_path_backup
+        BBLogger.invalidate_config()
 
 def test_bblogger_inserts_millions_of_logs():
     """Test BBLogger by inserting a couple of million log lines."""
@@ -137,6 +177,1214 @@ def test_telegram_integration(monkeypatch):
     assert True
 
 
+def test_async_log_is_written_after_flush(tmp_path):
+    """Entries queued in async mode reach the log file once flush() returns."""
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_enable_database=False,
+        log_async=True,
+    ):
+        try:
+            for i in range(100):
+                BBLogger.log(f"Async log {i}")
+            assert BBLogger.flush(timeout=10)
+            stats = BBLogger.get_async_stats()
+            assert stats['pending'] == 0
+            assert stats['written'] >= 100
+        finally:
+            BBLogger.shutdown(timeout=10)
+
+    log_files = list(tmp_path.glob('*.log'))
+    assert len(log_files) == 1
+    lines = log_files[0].read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 101  # header + entries
+
+@pytest.mark.parametrize("policy, expected_items", [
+    ('drop_newest', [0, 1, 2]),
+    ('drop_oldest', [0, 3, 4]),
+])
+def test_async_writer_backpressure_drops(policy, expected_items):
+    """A full queue drops entries according to the backpressure policy and counts them."""
+    release = threading.Event()
+    handled = []
+
+    def handler(item):
+        release.wait(timeout=10)
+        handled.append(item)
+
+    writer = AsyncLogWriter(handler, max_size=2, backpressure=policy)
+    try:
+        writer.submit(0)
+        # Wait until the writer thread picked up the first item and is blocked in the handler.
+        while writer.stats()['pending'] != 1 or writer._in_flight != 1:
+            threading.Event().wait(0.01)
+        for item in range(1, 5):
+            writer.submit(item)
+        assert writer.dropped == 2
+        release.set()
+        assert writer.flush(timeout=10)
+        assert handled == expected_items
+    finally:
+        release.set()
+        writer.shutdown(timeout=10)
+
+def test_async_writer_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        AsyncLogWriter(lambda item: None, backpressure='spill')
+
+def test_database_sink_batches_rows_on_one_connection(tmp_path):
+    """Rows are buffered until the batch fills or flush() runs, in WAL mode with indexes."""
+    db_path = str(tmp_path / 'logs.sqlite3')
+    with config_overrides(
+        log_sqlite3_path=db_path,
+        log_enable_files=False,
+        log_enable_terminal_output=False,
+        log_enable_database=True,
+        log_sqlite3_batch_size=10,
+        log_sqlite3_flush_interval_ms=0,
+    ):
+        try:
+            for i in range(25):
+                BBLogger.log(f"Database log {i}")
+            sink = BBLogger._sqlite_sink
+            assert sink.rows_written == 20
+            BBLogger.flush()
+            assert sink.rows_written == 25
+        finally:
+            BBLogger.shutdown()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == 25
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list('logs')")}
+        assert {'idx_logs_timestamp', 'idx_logs_log_type', 'idx_logs_process'} <= indexes
+    finally:
+        conn.close()
+
+def test_sqlite_sink_flushes_on_interval(tmp_path):
+    sink = SQLiteLogSink(str(tmp_path / 'logs.sqlite3'), BBLogger._default_config['log_columns'],
+                         batch_size=1000, flush_interval_ms=50)
+    try:
+        sink.write(['20240101000000', 'message', 'proc', 'test.py:1', 'hello', '0'])
+        assert sink.rows_written == 0
+        threading.Event().wait(0.5)
+        assert sink.rows_written == 1
+    finally:
+        sink.close()
+
+def test_sqlite_sink_keeps_rows_of_a_failed_flush(tmp_path):
+    db_path = str(tmp_path / 'logs.sqlite3')
+    sink = SQLiteLogSink(db_path, BBLogger._default_config['log_columns'], batch_size=1000, flush_interval_ms=0)
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for i in range(3):
+            sink.write(['20240101000000', 'message', 'proc', 'test.py:1', f'row {i}', '0'])
+        sink._conn.execute("PRAGMA busy_timeout=0;")
+        blocker.execute("BEGIN EXCLUSIVE;")
+        with pytest.raises(sqlite3.OperationalError):
+            sink.flush()
+        assert sink.rows_written == 0
+        blocker.execute("ROLLBACK;")
+        sink.write(['20240101000000', 'message', 'proc', 'test.py:1', 'row 3', '0'])
+        sink.flush()
+        assert sink.rows_written == 4
+        messages = [row[0] for row in blocker.execute("SELECT message FROM logs ORDER BY rowid")]
+        assert messages == ['row 0', 'row 1', 'row 2', 'row 3']
+    finally:
+        blocker.close()
+        sink.close()
+
+def test_sqlite_sink_backs_off_and_caps_rows_after_a_failed_flush(tmp_path):
+    db_path = str(tmp_path / 'logs.sqlite3')
+    sink = SQLiteLogSink(db_path, BBLogger._default_config['log_columns'], batch_size=2, flush_interval_ms=100,
+                         max_buffered_rows=5)
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        sink.ensure_schema()
+        sink._conn.execute("PRAGMA busy_timeout=0;")
+        blocker.execute("BEGIN EXCLUSIVE;")
+        failed = []
+        for i in range(7):
+            try:
+                sink.write(['20240101000000', 'message', 'proc', 'test.py:1', f'row {i}', '0'])
+            except sqlite3.OperationalError:
+                failed.append(i)
+        # Retried after another batch of rows, not on every write.
+        assert failed == [1, 3, 5]
+        assert sink.rows_dropped == 1
+        blocker.execute("ROLLBACK;")
+        # The timer re-armed by the last failure writes the kept rows.
+        threading.Event().wait(0.5)
+        messages = [row[0] for row in blocker.execute("SELECT message FROM logs ORDER BY rowid")]
+        assert messages == [f'row {i}' for i in range(1, 7)]
+    finally:
+        blocker.close()
+        sink.close()
+
+def test_file_sink_count_policy_buffers_until_flush(tmp_path):
+    log_file = tmp_path / 'sink.log'
+    sink = LogFileSink(BBLogger._default_config['log_columns'], flush_policy='count', flush_every=5)
+    try:
+        for i in range(4):
+            sink.write(str(log_file), ['20240101000000', 'message', 'proc', 'test.py:1', f'row {i}', '0'])
+        assert len(log_file.read_text(encoding='utf-8').splitlines()) == 1  # header only
+        sink.write(str(log_file), ['20240101000000', 'message', 'proc', 'test.py:1', 'row 4', '0'])
+        assert len(log_file.read_text(encoding='utf-8').splitlines()) == 6
+    finally:
+        sink.close()
+
+def test_file_sink_error_policy_flushes_on_error(tmp_path):
+    log_file = tmp_path / 'sink.log'
+    sink = LogFileSink(BBLogger._default_config['log_columns'], flush_policy='error')
+    try:
+        sink.write(str(log_file), ['20240101000000', 'message', 'proc', 'test.py:1', 'fine', '0'], 'message')
+        assert len(log_file.read_text(encoding='utf-8').splitlines()) == 1
+        sink.write(str(log_file), ['20240101000000', 'error', 'proc', 'test.py:1', 'failed', '0'], 'error')
+        assert len(log_file.read_text(encoding='utf-8').splitlines()) == 3
+    finally:
+        sink.close()
+
+def test_file_sink_reopens_on_path_change(tmp_path):
+    """A rollover to a new path writes the header once per file and keeps appending to existing files."""
+    first, second = tmp_path / 'day1.log', tmp_path / 'day2.log'
+    sink = LogFileSink(BBLogger._default_config['log_columns'])
+    try:
+        sink.write(str(first), ['20240101235959', 'message', 'proc', 'test.py:1', 'last of day 1', '0'])
+        sink.write(str(second), ['20240102000000', 'message', 'proc', 'test.py:1', 'first of day 2', '0'])
+        sink.write(str(first), ['20240101235959', 'message', 'proc', 'test.py:1', 'late write', '0'])
+    finally:
+        sink.close()
+    assert len(first.read_text(encoding='utf-8').splitlines()) == 3
+    assert len(second.read_text(encoding='utf-8').splitlines()) == 2
+
+def test_settings_snapshot_is_reused_until_override():
+    """The resolved config is built once and rebuilt only after BBConfig.override."""
+    with config_overrides(log_page_size=100):
+        first = BBLogger._get_settings()
+        assert BBLogger._get_settings() is first
+        assert first.log_page_size == 100
+
+        BBConfig.override('log_page_size', '25')
+        second = BBLogger._get_settings()
+        assert second is not first
+        assert second.log_page_size == 25
+        assert BBLogger._get_settings() is second
+
+def test_settings_snapshot_normalizes_booleans():
+    with config_overrides(log_enable_files='no', log_enable_terminal_output='Yes'):
+        settings = BBLogger._get_settings()
+        assert settings.log_enable_files is False
+        assert settings.log_enable_terminal_output is True
+
+@pytest.mark.parametrize("mode", ['fast', 'traceback'])
+def test_code_location_points_at_caller(mode):
+    with config_overrides(log_code_location=mode):
+        settings = BBLogger._get_settings()
+        expected_line = sys._getframe().f_lineno + 1
+        location = BBLogger._get_code_location(settings, 1)
+    assert location == f"test_bblogger.py:{expected_line}"
+
+def test_code_location_can_be_disabled():
+    with config_overrides(log_code_location='off'):
+        assert BBLogger._get_code_location(BBLogger._get_settings(), 1) == 'Unknown'
+
+@pytest.mark.parametrize("message, expected", [
+    ("all good here", 'message'),
+    ("be careful with that", 'warning'),
+    ("Connection FAILED", 'error'),
+    ("careful: the previous step failed", 'error'),
+    ("errorless run", 'message'),
+])
+def test_default_classifier(message, expected):
+    assert LogClassifier().classify(message) == expected
+
+def test_classifier_uses_custom_keywords():
+    classifier = LogClassifier(parse_level_keywords('timeout=error, deprecated:warning, missing=message'))
+    assert classifier.classify("upstream timeout") == 'error'
+    assert classifier.classify("deprecated call") == 'warning'
+    assert classifier.classify("missing optional field") == 'message'
+
+def test_explicit_level_skips_classification(tmp_path):
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_enable_database=False,
+    ):
+        BBLogger.error("plain text")
+        BBLogger.warning("this failed")
+        BBLogger.log("also plain", level='error')
+        BBLogger.flush()
+    rows = [line.split(',') for line in next(tmp_path.glob('*.log')).read_text(encoding='utf-8').splitlines()[1:]]
+    assert [row[1] for row in rows] == ['error', 'warning', 'error']
+    assert all(row[3].startswith('test_bblogger.py:') for row in rows)
+
+def _write_legacy_log(path, rows):
+    """Write a CSV log file the way the logger did before sidecar indexes existed."""
+    import csv
+    with open(path, 'w', encoding='utf-8', newline='') as log_file:
+        writer = csv.writer(log_file, delimiter=',', quotechar="'", quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(BBLogger._default_config['log_columns'])
+        writer.writerows(rows)
+
+def test_log_index_is_built_lazily_for_legacy_files(tmp_path):
+    log_file = tmp_path / 'legacy.log'
+    rows = [['20240101000000', 'message', 'proc', 'test.py:1', f"it's row {i}\nsecond line", str(i)] for i in range(2500)]
+    _write_legacy_log(log_file, rows)
+
+    index = LogIndex(str(log_file), BBLogger._default_config['log_columns'], stride=100).refresh()
+    assert os.path.exists(index.index_path)
+    assert index.total_rows == 2500
+    assert index.has_header
+    assert index.read_rows(1234, 3) == rows[1234:1237]
+
+    reloaded = LogIndex(str(log_file), BBLogger._default_config['log_columns'], stride=100).refresh()
+    assert reloaded.total_rows == 2500
+    assert list(reloaded.offsets) == list(index.offsets)
+
+def test_log_index_catches_up_with_appended_rows(tmp_path):
+    log_file = tmp_path / 'append.log'
+    rows = [['20240101000000', 'message', 'proc', 'test.py:1', f'row {i}', '0'] for i in range(250)]
+    _write_legacy_log(log_file, rows[:120])
+    index = LogIndex(str(log_file), BBLogger._default_config['log_columns'], stride=50).refresh()
+    assert index.total_rows == 120
+
+    with open(log_file, 'a', encoding='utf-8', newline='') as handle:
+        for row in rows[120:]:
+            handle.write(','.join(row) + '\r\n')
+    index.refresh()
+    assert index.total_rows == 250
+    assert index.read_rows(199, 2) == rows[199:201]
+
+def test_file_sink_maintains_index(tmp_path):
+    log_file = tmp_path / 'indexed.log'
+    sink = LogFileSink(BBLogger._default_config['log_columns'], index_stride=10)
+    rows = [['20240101000000', 'message', 'proc', 'test.py:1', f'row {i}', '0'] for i in range(35)]
+    try:
+        for row in rows:
+            sink.write(str(log_file), row)
+    finally:
+        sink.close()
+    fresh = LogIndex(str(log_file), BBLogger._default_config['log_columns'], stride=10)
+    assert fresh._load(os.stat(log_file).st_ino, os.path.getsize(log_file))
+    assert fresh._persisted == 4
+    assert fresh.refresh().total_rows == 35
+    assert fresh.read_rows(30, 10) == rows[30:]
+
+def test_get_page_and_range_use_index(tmp_path):
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_enable_database=False,
+        log_page_size=7,
+        log_index_stride=5,
+    ):
+        try:
+            for i in range(30):
+                BBLogger.log(f"Indexed log {i}")
+            assert BBLogger.get_total_amount_of_pages() == 5
+            page = BBLogger.get_page(3)
+            assert list(page['message']) == [f"Indexed log {i}" for i in range(14, 21)]
+            assert len(BBLogger.get_page(5)) == 2
+            with pytest.raises(ValueError):
+                BBLogger.get_page(6)
+            date = datetime.now().strftime('%Y_%m_%d')
+            logs = BBLogger.get_logs_in_range(date, 4, 6)
+            assert list(logs['message']) == ["Indexed log 3", "Indexed log 4", "Indexed log 5"]
+        finally:
+            BBLogger.shutdown()
+
+def _write_day_logs(log_path, prefix, day, count, step_seconds=60, start_hour=0):
+    start = datetime.strptime(day, '%Y%m%d') + timedelta(hours=start_hour)
+    rows = []
+    for i in range(count):
+        timestamp = (start + timedelta(seconds=i * step_seconds)).strftime('%Y%m%d%H%M%S')
+        log_type = 'error' if i % 10 == 0 else 'message'
+        rows.append([timestamp, log_type, f'proc{i % 2}', 'test.py:1', f'{day} row {i}', '0.5'])
+    _write_legacy_log(os.path.join(log_path, f"{prefix}_log_{day[:4]}_{day[4:6]}_{day[6:]}.log"), rows)
+    return rows
+
+def test_iter_logs_streams_across_days_with_filters(tmp_path):
+    day1 = _write_day_logs(tmp_path, 'bbtest', '20240101', 100, step_seconds=600)
+    day2 = _write_day_logs(tmp_path, 'bbtest', '20240102', 100, step_seconds=600)
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest'):
+        entries = list(BBLogger.iter_logs('20240101200000', '20240102020000'))
+        expected = [row for row in day1 + day2 if '20240101200000' <= row[0] <= '20240102020000']
+        assert [entry['message'] for entry in entries] == [row[4] for row in expected]
+
+        errors = list(BBLogger.iter_logs('20240101000000', '20240102235959', {'log_type': 'error', 'process': ['proc0']}))
+        assert len(errors) == 20
+        assert all(entry['log_type'] == 'error' and entry['process'] == 'proc0' for entry in errors)
+
+        with pytest.raises(ValueError):
+            BBLogger.iter_logs('20240101000000', '20240102000000', {'no_such_column': 'x'})
+
+def test_iter_log_frames_yields_bounded_chunks(tmp_path):
+    _write_day_logs(tmp_path, 'bbtest', '20240101', 250, step_seconds=60)
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest'):
+        frames = list(BBLogger.get_logs_between_timestampt_and_timestampt('20240101000000', '20240101235959', chunksize=100))
+        assert [len(frame) for frame in frames] == [100, 100, 50]
+        assert str(frames[0]['timestamp'].dtype).startswith('datetime64')
+        full = BBLogger.get_logs_between_timestampt_and_timestampt('20240101000000', '20240101235959')
+        assert list(pd.concat(frames, ignore_index=True)['message']) == list(full['message'])
+
+def test_range_query_seeks_near_t1(tmp_path):
+    rows = _write_day_logs(tmp_path, 'bbtest', '20240101', 3000, step_seconds=20)
+    log_file = tmp_path / 'bbtest_log_2024_01_01.log'
+    index = LogIndex(str(log_file), BBLogger._default_config['log_columns'], stride=100).refresh()
+    offset = index.seek_value('20240101150000', 0)
+    with open(log_file, 'rb') as handle:
+        handle.seek(offset)
+        first_row = handle.readline().decode('utf-8').split(',')
+    assert first_row[0] < '20240101150000'
+    assert offset > os.path.getsize(log_file) // 2
+
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_index_stride=100):
+        df = BBLogger.get_logs_between_timestampt_and_timestampt('20240101150000', '20240101150500')
+    expected = [row[4] for row in rows if '20240101150000' <= row[0] <= '20240101150500']
+    assert list(df['message']) == expected
+    assert len(expected) == 16
+
+def test_log_indexes_do_not_hold_file_descriptors(tmp_path):
+    days = [(datetime(2024, 1, 1) + timedelta(days=i)).strftime('%Y%m%d') for i in range(30)]
+    for day in days:
+        _write_day_logs(tmp_path, 'bbtest', day, 50, step_seconds=600)
+    columns = BBLogger._default_config['log_columns']
+    open_fds = len(os.listdir('/proc/self/fd'))
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_index_stride=10):
+        df = BBLogger.get_logs_between_timestampt_and_timestampt(days[0] + '000000', days[-1] + '235959')
+    assert len(df) == 30 * 50
+    paths = sorted(str(path) for path in tmp_path.glob('bbtest_log_*.log'))
+    for path in paths:
+        assert LogIndex.for_file(path, columns, stride=10).total_rows == 50
+        assert os.path.exists(path + '.idx')
+    assert len(os.listdir('/proc/self/fd')) <= open_fds + 2
+
+    LogRotation.compress(paths[0])
+    assert not any(key[0] == os.path.abspath(paths[0]) for key in LogIndex._cache)
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_parallel_range_read_matches_serial_read(tmp_path, executor):
+    rows = []
+    for day in ('20240101', '20240102', '20240103', '20240104'):
+        rows += _write_day_logs(tmp_path, 'bbtest', day, 500, step_seconds=150)
+    t1, t2 = '20240101120000', '20240104060000'
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest'):
+        serial = BBLogger.get_logs_between_timestampt_and_timestampt(t1, t2)
+    try:
+        with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_read_workers=3,
+                              log_read_executor=executor):
+            parallel = BBLogger.get_logs_between_timestampt_and_timestampt(t1, t2)
+            assert BBLogger._read_pool.executor == executor
+    finally:
+        BBLogger.shutdown()
+    assert BBLogger._read_pool is None
+    assert list(parallel['message']) == [row[4] for row in rows if t1 <= row[0] <= t2]
+    pd.testing.assert_frame_equal(parallel, serial)
+
+@pytest.mark.skipif(not LogArchive.is_available(), reason="pyarrow is not installed")
+def test_compact_logs_archives_closed_days(tmp_path):
+    day1 = _write_day_logs(tmp_path, 'bbtest', '20240101', 100, step_seconds=600)
+    day2 = _write_day_logs(tmp_path, 'bbtest', '20240102', 100, step_seconds=600)
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_page_size=30):
+        archives = BBLogger.compact_logs(before_date='20240102')
+        assert archives == [str(tmp_path / 'bbtest_log_2024_01_01.parquet')]
+        assert not (tmp_path / 'bbtest_log_2024_01_01.log').exists()
+        assert (tmp_path / 'bbtest_log_2024_01_02.log').exists()
+
+        df = BBLogger.read_logs_from_date('20240101')
+        assert len(df) == 100
+        assert str(df['timestamp'].dtype).startswith('datetime64')
+        assert isinstance(df['log_type'].dtype, pd.CategoricalDtype)
+        assert df['processing_time'].dtype == 'float64'
+        assert sum(len(chunk) for chunk in BBLogger.read_logs_from_date('20240101', chunksize=40)) == 100
+
+        assert BBLogger.get_total_amount_of_pages('2024_01_01') == 4
+        assert list(BBLogger.get_logs_in_range('2024_01_01', 3, 5)['message']) == [row[4] for row in day1[2:5]]
+
+        t1, t2 = '20240101120000', '20240102020000'
+        expected = [row[4] for row in day1 + day2 if t1 <= row[0] <= t2]
+        assert len(expected) == 41
+        df = BBLogger.get_logs_between_timestampt_and_timestampt(t1, t2)
+        assert list(df['message']) == expected
+        assert [entry['message'] for entry in BBLogger.iter_logs(t1, t2)] == expected
+        assert len(list(BBLogger.iter_logs(t1, t2, {'log_type': 'error'}))) == 4
+
+
+def _log_from_worker(count):
+    for i in range(count):
+        BBLogger.log(f"worker {os.getpid()} row {i} " + 'x' * 2000)
+    BBLogger.flush()
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires fork()")
+def test_sharded_workers_write_one_header_each(tmp_path):
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_file_sharding=True,
+        log_file_flush_policy='count',
+    ):
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_log_from_worker, args=(200,)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+            assert worker.exitcode == 0
+
+        shards = sorted(tmp_path.glob('bbtest_log_*.*.log'))
+        assert len(shards) == 4
+        for shard in shards:
+            lines = shard.read_text(encoding='utf-8').splitlines()
+            assert lines[0] == ','.join(BBLogger._default_config['log_columns'])
+            assert len(lines) == 201
+            assert all(line.split(',')[4].startswith(f"worker {shard.suffixes[-2][1:]} ") for line in lines[1:])
+
+        df = BBLogger.read_logs_from_date(datetime.now().strftime('%Y%m%d'))
+        assert len(df) == 800
+        assert list(df['timestamp']) == sorted(df['timestamp'])
+
+def test_shards_are_merged_in_timestamp_order(tmp_path):
+    rows = _write_day_logs(tmp_path, 'bbtest', '20240101', 90, step_seconds=60)
+    # Spread the rows over the plain day file and two per-process shards.
+    base = tmp_path / 'bbtest_log_2024_01_01.log'
+    _write_legacy_log(str(base), rows[0::3])
+    _write_legacy_log(str(tmp_path / 'bbtest_log_2024_01_01.101.log'), rows[1::3])
+    _write_legacy_log(str(tmp_path / 'bbtest_log_2024_01_01.20.log'), rows[2::3])
+    messages = [row[4] for row in rows]
+
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_page_size=25, log_index_stride=10):
+        assert BBLogger.get_total_amount_of_pages('2024_01_01') == 4
+        assert list(BBLogger.get_logs_in_range('2024_01_01', 24, 30)['message']) == messages[23:30]
+        df = BBLogger.get_logs_between_timestampt_and_timestampt('20240101001000', '20240101003000')
+        assert list(df['message']) == messages[10:31]
+        assert list(BBLogger.read_logs_from_date('20240101')['message']) == messages
+        chunks = list(BBLogger.read_logs_from_date('20240101', chunksize=40))
+        assert [len(chunk) for chunk in chunks] == [40, 40, 10]
+        assert list(pd.concat(chunks)['message']) == messages
+
+        if LogArchive.is_available():
+            assert BBLogger.compact_logs(before_date='20240102') == [str(tmp_path / 'bbtest_log_2024_01_01.parquet')]
+            assert not list(tmp_path.glob('*.log'))
+            assert list(BBLogger.read_logs_from_date('20240101')['message']) == messages
+
+
+class _StubHookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.delay)
+        self.server.received.append(json.loads(body or b'null'))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.gets += 1
+        body = self.server.body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@contextmanager
+def stub_webhook(statuses=(), delay=0.0, body=''):
+    """Local HTTP endpoint recording the JSON bodies posted to it and serving `body` on GET."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHookHandler)
+    server.received, server.statuses, server.delay = [], list(statuses), delay
+    server.body, server.gets = body, 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, f"http://127.0.0.1:{server.server_address[1]}/hook"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_url_notifications_are_coalesced_off_the_logging_thread():
+    with stub_webhook(delay=0.5) as (server, url), config_overrides(
+        log_enable_terminal_output=False,
+        log_notification_url=url,
+        log_notification_batch_interval_ms=300,
+    ):
+        try:
+            started = time.perf_counter()
+            for i in range(20):
+                BBLogger.log(f"alert {i}", url_notification=True)
+            assert time.perf_counter() - started < 0.5
+            assert BBLogger.flush(timeout=10)
+            stats = BBLogger.get_notification_stats()['url']
+        finally:
+            BBLogger.shutdown(timeout=10)
+    assert stats['delivered'] == 20 and stats['pending'] == 0
+    assert len(server.received) == stats['messages'] < 20
+    messages = [entry['message'] for body in server.received for entry in body.get('entries', [body])]
+    assert messages == [f"alert {i}" for i in range(20)]
+
+def test_notification_dispatcher_retries_server_errors():
+    dispatcher = NotificationDispatcher(backoff_ms=10, batch_interval_ms=0)
+
+    def deliver(session, entries, timeout):
+        response = session.post(url, json=entries, timeout=timeout)
+        response.raise_for_status()
+
+    with stub_webhook(statuses=[500, 503, 200]) as (server, url):
+        dispatcher.submit('url', url, 'alert', deliver)
+        assert dispatcher.flush(timeout=10)
+        assert dispatcher.stats()['url']['retries'] == 2
+        assert dispatcher.stats()['url']['delivered'] == 1
+        assert server.received == [['alert']] * 3
+        dispatcher.shutdown(timeout=10)
+
+def test_notification_dispatcher_rate_limit_coalesces_backlog():
+    delivered = []
+    dispatcher = NotificationDispatcher(rate_limit=1, batch_interval_ms=0)
+
+    def deliver(session, entries, timeout):
+        delivered.append(list(entries))
+
+    dispatcher.submit('url', 'stub', 0, deliver)
+    assert dispatcher.flush(timeout=5)
+    for i in range(1, 6):
+        dispatcher.submit('url', 'stub', i, deliver)
+    # The single token per minute is spent: the burst waits in the queue.
+    assert not dispatcher.flush(timeout=0.3)
+    assert dispatcher.stats()['url']['pending'] == 5
+    # Shutdown delivers the backlog as one message regardless of the limiter.
+    assert dispatcher.shutdown(timeout=5)
+    assert delivered == [[0], [1, 2, 3, 4, 5]]
+
+
+def test_notification_config_provider_caches_on_disk(tmp_path):
+    cache_path = str(tmp_path / 'notifications.json')
+    with stub_webhook(body="# comment\nbot_token = abc\nchat_id=42\n") as (server, url):
+        provider = NotificationConfigProvider(url=url, cache_path=cache_path)
+        assert provider.get() == {'bot_token': 'abc', 'chat_id': '42'}
+        assert provider.get() is provider.get()
+        assert server.gets == 1
+        assert oct(os.stat(cache_path).st_mode & 0o777) == oct(0o600)
+
+        # A new process starts from the disk cache without a round-trip...
+        restarted = NotificationConfigProvider(url=url, cache_path=cache_path)
+        assert restarted.get()['chat_id'] == '42'
+        assert server.gets == 1
+
+        # ...and a stale configuration is served while it is refreshed in the background.
+        server.body = "bot_token=xyz\nchat_id=42\n"
+        stale = NotificationConfigProvider(url=url, cache_path=cache_path, ttl_s=0)
+        assert stale.get()['bot_token'] == 'abc'
+        for _ in range(100):
+            if stale.get()['bot_token'] == 'xyz':
+                break
+            time.sleep(0.05)
+        assert stale.get()['bot_token'] == 'xyz'
+
+def test_notification_config_provider_caches_failures():
+    with stub_webhook() as (server, url):
+        pass  # the port is closed once the server stops
+    provider = NotificationConfigProvider(url=url, negative_ttl_s=60, timeout_ms=500)
+    with pytest.raises(requests.RequestException):
+        provider.get()
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        provider.get()
+    assert time.perf_counter() - started < 0.1
+    assert provider.fetches == 1
+
+def test_notifications_config_local_file_override(tmp_path):
+    config_file = tmp_path / 'global.config'
+    config_file.write_text("brainboost_notifications_telegram_bot_chat_id=7\n", encoding='utf-8')
+    with config_overrides(log_notification_config_file=str(config_file)):
+        assert Notifications.get_config() == {'brainboost_notifications_telegram_bot_chat_id': '7'}
+        with pytest.raises(ValueError):
+            Notifications.send_telegram_message("no token configured")
+
+
+def test_concurrent_logging_keeps_rows_whole_and_deltas_per_thread(tmp_path):
+    import csv
+    busy_threads, rows_per_thread, slow_rows = 8, 300, 5
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_file_flush_policy='count',
+    ):
+        barrier = threading.Barrier(busy_threads + 1)
+
+        def busy(thread_id):
+            barrier.wait()
+            for i in range(rows_per_thread):
+                BBLogger.log(f"busy {thread_id} {i} " + 'y' * (i % 7) * 300)
+
+        def slow():
+            barrier.wait()
+            for i in range(slow_rows):
+                BBLogger.log(f"slow {i}")
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=busy, args=(n,)) for n in range(busy_threads)]
+        threads.append(threading.Thread(target=slow))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        BBLogger.flush()
+
+    log_files = list(tmp_path.glob('*.log'))
+    assert len(log_files) == 1
+    with open(log_files[0], 'r', encoding='utf-8', newline='') as log_file:
+        rows = list(csv.reader(log_file, delimiter=',', quotechar="'"))
+    assert rows[0] == BBLogger._default_config['log_columns']
+    rows = rows[1:]
+    assert len(rows) == busy_threads * rows_per_thread + slow_rows
+    assert all(len(row) == 6 for row in rows)
+
+    for thread_id in range(busy_threads):
+        messages = [row[4].split()[2] for row in rows if row[4].startswith(f"busy {thread_id} ")]
+        assert messages == [str(i) for i in range(rows_per_thread)]
+    slow_times = [float(row[5]) for row in rows if row[4].startswith('slow ')]
+    # Each delta is measured from the slow thread's own previous log, not the busy threads'.
+    assert slow_times[0] == 0
+    assert all(delta >= 0.045 for delta in slow_times[1:])
+
+
+def test_alog_writes_off_loop_with_per_task_timing(tmp_path):
+    import csv
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+    ):
+        async def busy(task_id):
+            for i in range(200):
+                await BBLogger.alog(f"busy {task_id} {i}")
+                await asyncio.sleep(0)
+
+        async def slow():
+            for i in range(4):
+                await AsyncBBLogger.log(f"slow {i}")
+                await asyncio.sleep(0.05)
+
+        slow_line = slow.__code__.co_firstlineno + 2
+
+        async def main():
+            await asyncio.gather(busy(0), busy(1), slow())
+            assert await AsyncBBLogger.flush(timeout=10)
+
+        asyncio.run(main())
+
+    log_files = list(tmp_path.glob('*.log'))
+    assert len(log_files) == 1
+    with open(log_files[0], 'r', encoding='utf-8', newline='') as log_file:
+        rows = list(csv.reader(log_file, delimiter=',', quotechar="'"))[1:]
+    assert len(rows) == 2 * 200 + 4
+    for task_id in range(2):
+        messages = [row[4].split()[2] for row in rows if row[4].startswith(f"busy {task_id} ")]
+        assert messages == [str(i) for i in range(200)]
+    slow_rows = [row for row in rows if row[4].startswith('slow ')]
+    # The code location is the caller's coroutine, and each delta is the task's own.
+    assert all(row[3] == f"test_bblogger.py:{slow_line}" for row in slow_rows)
+    slow_times = [float(row[5]) for row in slow_rows]
+    assert all(delta >= 0.045 for delta in slow_times[1:])
+
+
+@pytest.mark.parametrize('log_async', [False, True])
+def test_log_and_alog_keep_their_order(tmp_path, log_async):
+    import csv
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_async=log_async,
+    ):
+        async def main():
+            for name in 'abc':
+                await BBLogger.alog(name)
+            for name in 'de':
+                BBLogger.log(name)
+            await BBLogger.alog('f')
+            BBLogger.log('g')
+            assert await AsyncBBLogger.flush(timeout=10)
+
+        try:
+            asyncio.run(main())
+        finally:
+            BBLogger.shutdown()
+
+    log_files = list(tmp_path.glob('*.log'))
+    with open(log_files[0], 'r', encoding='utf-8', newline='') as log_file:
+        rows = list(csv.reader(log_file, delimiter=',', quotechar="'"))[1:]
+    assert [row[4] for row in rows] == list('abcdefg')
+
+
+def test_log_entry_is_slotted_and_serializes_like_csv():
+    import csv
+    import io
+    entry = BBLogEntry('worker', '20240101120000', 'error', 'he said "hi"; a,b\nnext', '0.5', 'app.py:1',
+                       config={'token': 'secret'}, delimiter=';')
+    assert not hasattr(entry, '__dict__')
+
+    output = io.StringIO()
+    csv.writer(output, delimiter=';', quotechar='"', quoting=csv.QUOTE_ALL).writerow(entry.row)
+    assert str(entry) == output.getvalue().strip()
+    assert str(entry) is str(entry)
+
+    # Notifications carry the log fields only, never the config.
+    assert json.loads(entry.to_json()) == {
+        'timestamp': '20240101120000', 'log_type': 'error', 'process': 'worker',
+        'code_location': 'app.py:1', 'message': 'he said "hi"; a,b\nnext', 'processing_time': '0.5'
+    }
+    assert entry.to_json() is entry.to_json()
+
+
+def test_size_rotation_compresses_segments_and_reads_across_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(LogRotation, 'CLOSE_GRACE_S', 0)
+    messages = [f"row {i:04d} " + 'x' * 40 for i in range(300)]
+    today = datetime.now()
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_file_rotate_bytes=4096,
+        log_file_compression='gzip',
+        log_page_size=25,
+    ):
+        for message in messages:
+            BBLogger.log(message)
+        assert BBLogger.shutdown(timeout=30)
+
+        groups = BBLogger._get_day_groups(BBLogger._get_log_file_path(today.strftime('%Y_%m_%d')))
+        assert len(groups) == 1 and len(groups[0]) > 3
+        assert all(path.endswith('.log.gz') for path in groups[0][:-1])
+        assert groups[0][-1].endswith('.log')
+
+        assert list(BBLogger.read_logs_from_date(today.strftime('%Y%m%d'))['message']) == messages
+        chunks = list(BBLogger.read_logs_from_date(today.strftime('%Y%m%d'), chunksize=100))
+        assert [message for chunk in chunks for message in chunk['message']] == messages
+        assert BBLogger.get_total_amount_of_pages() == 12
+        assert list(BBLogger.get_page(7)['message']) == messages[150:175]
+        assert list(BBLogger.get_logs_in_range(today.strftime('%Y_%m_%d'), 101, 110)['message']) == messages[100:110]
+        day_start = today.strftime('%Y%m%d') + '000000'
+        day_end = today.strftime('%Y%m%d') + '235959'
+        assert [entry['message'] for entry in BBLogger.iter_logs(day_start, day_end)] == messages
+
+
+def test_shared_segments_are_not_compressed_under_another_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(LogRotation, 'CLOSE_GRACE_S', 0)
+    columns = BBLogger._default_config['log_columns']
+    path = str(tmp_path / f"bbtest_log_{datetime.now().strftime('%Y_%m_%d')}.log")
+    first = LogFileSink(columns, rotate_bytes=2000)
+    second = LogFileSink(columns, rotate_bytes=2000)
+    row = lambda name: ['20240101000000', 'message', 'proc', 'test.py:1', name + ' ' + 'x' * 40, '0']
+    try:
+        second.write(path, row('second 0'))
+        for i in range(60):
+            first.write(path, row(f'first {i}'))
+        assert first.sequence > 0 and second.sequence == 0
+        LogRotation.maintain(str(tmp_path), 'bbtest', compression='gzip', keep=lambda: [first.path])
+        assert os.path.exists(path + '.gz')
+        second.write(path, row('second 1'))
+        assert second.path != path
+    finally:
+        first.close()
+        second.close()
+
+    messages = []
+    for group in LogRotation.segment_groups(path):
+        for segment in group:
+            with LogRotation.open_binary(segment) as log_file:
+                messages += [line.decode('utf-8').split(',')[4].split()[0:2] for line in log_file
+                             if not line.startswith(b'timestamp')]
+    assert sorted(' '.join(message) for message in messages) == sorted(
+        [f'first {i}' for i in range(60)] + ['second 0', 'second 1']
+    )
+
+
+def test_compressed_row_counts_are_bounded_and_dropped_by_retention(tmp_path, monkeypatch):
+    monkeypatch.setattr(LogRotation, '_row_counts', LogRotation._row_counts.__class__())
+    monkeypatch.setattr(LogRotation, '_row_counts_limit', 3)
+    paths = []
+    for day in range(1, 6):
+        path = tmp_path / f'bbtest_log_2024_01_0{day}.log'
+        path.write_text('timestamp\n')
+        paths.append(LogRotation.compress(str(path)))
+    for path in paths:
+        assert LogRotation.count_rows(path, lambda _: 1) == 1
+    assert [os.path.basename(key[0]) for key in LogRotation._row_counts] == [
+        os.path.basename(path) for path in paths[2:]
+    ]
+    LogRotation.enforce_retention(str(tmp_path), 'bbtest', max_age_days=1)
+    assert not LogRotation._row_counts
+
+
+def test_hourly_segments_are_read_in_order_and_pruned_by_retention(tmp_path):
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_file_rotate_hourly=True,
+    ):
+        for hour in (9, 10, 11):
+            for minute in range(3):
+                BBLogger._write_to_log_file(BBLogEntry(
+                    'worker', f"20240105{hour:02d}{minute:02d}00", 'message', f"h{hour} m{minute}", '0', 'app.py:1'
+                ))
+        BBLogger.shutdown()
+
+        assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.log')) == [
+            'bbtest_log_2024_01_05-09h.log', 'bbtest_log_2024_01_05-10h.log', 'bbtest_log_2024_01_05-11h.log'
+        ]
+        df = BBLogger.get_logs_between_timestampt_and_timestampt('20240105100100', '20240105110000')
+        assert list(df['message']) == ['h10 m1', 'h10 m2', 'h11 m0']
+        assert len(BBLogger.read_logs_from_date('20240105')) == 9
+
+    # Size retention deletes the oldest hours first, with their indexes.
+    last_hour = tmp_path / 'bbtest_log_2024_01_05-11h.log'
+    limit = sum(os.path.getsize(path) for path in tmp_path.glob('bbtest_log_2024_01_05-11h.log*'))
+    removed = LogRotation.enforce_retention(str(tmp_path), 'bbtest', max_bytes=limit)
+    assert sorted(os.path.basename(path) for path in removed if path.endswith('.log')) == [
+        'bbtest_log_2024_01_05-09h.log', 'bbtest_log_2024_01_05-10h.log'
+    ]
+    assert last_hour.exists()
+    # Age retention deletes whole days older than the limit.
+    LogRotation.enforce_retention(str(tmp_path), 'bbtest', max_age_days=30)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_jsonl_format_round_trips_fields_through_every_reader(tmp_path):
+    today = datetime.now()
+    with config_overrides(
+        log_path=str(tmp_path),
+        log_prefix='bbtest',
+        log_enable_files=True,
+        log_enable_terminal_output=False,
+        log_format='jsonl',
+        log_page_size=10,
+    ):
+        for i in range(25):
+            BBLogger.log(f"line {i}\nsecond 'quoted' \"line\", with commas", request_id=f"r{i}", attempt=i % 3)
+        BBLogger.error("no extra fields")
+        BBLogger.flush()
+
+        log_files = list(tmp_path.glob('*.log'))
+        assert len(log_files) == 1
+        with open(log_files[0], 'r', encoding='utf-8') as log_file:
+            records = [json.loads(line) for line in log_file]
+        assert len(records) == 26
+        assert records[0]['request_id'] == 'r0' and records[0]['attempt'] == 0
+        assert records[0]['message'] == "line 0\nsecond 'quoted' \"line\", with commas"
+
+        df = BBLogger.read_logs_from_date(today.strftime('%Y%m%d'))
+        assert len(df) == 26
+        assert list(df['request_id'][:3]) == ['r0', 'r1', 'r2']
+        assert df['message'][1] == "line 1\nsecond 'quoted' \"line\", with commas"
+        assert df['timestamp'].dtype.kind == 'i'
+        assert sum(len(chunk) for chunk in BBLogger.read_logs_from_date(today.strftime('%Y%m%d'), chunksize=7)) == 26
+
+        assert BBLogger.get_total_amount_of_pages() == 3
+        page = BBLogger.get_page(3)
+        assert list(page['request_id'][:5]) == ['r20', 'r21', 'r22', 'r23', 'r24']
+        assert page['log_type'].iloc[-1] == 'error'
+        assert list(BBLogger.get_logs_in_range(today.strftime('%Y_%m_%d'), 2, 3)['request_id']) == ['r1', 'r2']
+
+        day = today.strftime('%Y%m%d')
+        entries = list(BBLogger.iter_logs(day + '000000', day + '235959', filters={'log_type': 'error'}))
+        assert entries == [{**entries[0], 'message': 'no extra fields'}] and 'request_id' not in entries[0]
+        frame = BBLogger.get_logs_between_timestampt_and_timestampt(day + '000000', day + '235959')
+        assert list(frame['attempt'][:4]) == [0, 1, 2, 0]
+
+
+def test_switching_log_format_starts_a_new_segment(tmp_path):
+    today = datetime.now().strftime('%Y%m%d')
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_enable_files=True,
+                          log_enable_terminal_output=False):
+        BBLogger.log("written as csv")
+        with config_overrides(log_format='jsonl'):
+            BBLogger.log("written as jsonl", source='new')
+        BBLogger.flush()
+
+        assert len(list(tmp_path.glob('*.log'))) == 2
+        df = BBLogger.read_logs_from_date(today)
+        assert list(df['message']) == ['written as csv', 'written as jsonl']
+        assert list(BBLogger.get_page(1)['message']) == ['written as csv', 'written as jsonl']
+
+
+def test_sampling_keeps_errors_and_summarizes_suppressed_entries(tmp_path):
+    today = datetime.now().strftime('%Y%m%d')
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_enable_files=True,
+                          log_enable_terminal_output=False, log_sampling='every_n', log_sampling_every_n=10,
+                          log_sampling_summary_interval_ms=600000):
+        for i in range(100):
+            BBLogger.log("job failed" if i % 25 == 0 else f"tick {i}")
+        BBLogger.warning("kept: first call of its own site")
+        BBLogger.flush()
+
+        df = BBLogger.read_logs_from_date(today)
+        messages = list(df['message'])
+        assert messages[:12] == ['job failed', 'tick 10', 'tick 20', 'job failed', 'tick 30', 'tick 40',
+                                 'job failed', 'tick 60', 'tick 70', 'job failed', 'tick 80', 'tick 90']
+        assert messages[12] == 'kept: first call of its own site'
+        assert messages[13].startswith('88 similar messages suppressed at test_bblogger.py:')
+        assert messages[13].endswith('(last: tick 99)')
+        assert BBLogger.get_sampling_stats()['suppressed'] == 88
+
+    with config_overrides(log_path=str(tmp_path / 'bucket'), log_prefix='bbtest', log_enable_files=True,
+                          log_enable_terminal_output=False, log_sampling='token_bucket',
+                          log_sampling_rate_per_s=0.001, log_sampling_burst=3, log_sampling_summary_interval_ms=0):
+        for i in range(10):
+            BBLogger.log(f"burst {i}")
+        BBLogger.error("errors bypass the bucket")
+        BBLogger.flush()
+
+        messages = list(BBLogger.read_logs_from_date(today)['message'])
+        assert messages[:3] == ['burst 0', 'burst 1', 'burst 2']
+        # With no summary interval, every suppressed entry is reported as it happens.
+        assert [message.split(' similar')[0] for message in messages[3:10]] == ['1'] * 7
+        assert messages[10:] == ['errors bypass the bucket']
+
+
+def test_sampler_forgets_idle_call_sites(monkeypatch):
+    monkeypatch.setattr(LogSampler, '_site_limit', 100)
+    sampler = LogSampler('every_n', every_n=2, summary_interval_ms=50)
+    for line in range(250):
+        sampler.allow(('app.py', 1, line))
+    assert len(sampler._sites) <= 100
+
+    sampler = LogSampler('every_n', every_n=2, summary_interval_ms=50)
+    assert sampler.allow(('app.py', 1, 10)) and not sampler.allow(('app.py', 1, 10))
+    sampler.suppress(('app.py', 1, 10), 'tick')
+    sampler.allow(('app.py', 1, 20))
+    time.sleep(0.1)
+    sampler.allow(('app.py', 1, 20))
+    assert sampler.due_summaries() == [('app.py:10', 1, pytest.approx(0.1, abs=0.09), 'tick')]
+    assert list(sampler._sites) == [('app.py', 1, 20)]
+    assert sampler.stats()['passed'] == 2
+
+
+def test_sqlite_read_backend_matches_file_backend(tmp_path):
+    today = datetime.now()
+    day = today.strftime('%Y%m%d')
+    t1, t2 = day + '000000', day + '235959'
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_enable_files=True,
+                          log_enable_database=True, log_sqlite3_path=str(tmp_path / 'logs.sqlite3'),
+                          log_enable_terminal_output=False, log_page_size=7, log_index_stride=5):
+        for i in range(40):
+            BBLogger.log(f"entry {i} failed" if i % 6 == 0 else f"entry {i}")
+
+        def read_all():
+            return {
+                'pages': BBLogger.get_total_amount_of_pages(),
+                'page_1': BBLogger.get_page(1),
+                'page_4': BBLogger.get_page(4),
+                'page_6': BBLogger.get_page(6),
+                'range': BBLogger.get_logs_in_range(today.strftime('%Y_%m_%d'), 9, 23),
+                'day': BBLogger.read_logs_from_date(day),
+                'between': BBLogger.get_logs_between_timestampt_and_timestampt(t1, t2),
+                'errors': list(BBLogger.iter_logs(t1, t2, filters={'log_type': 'error'})),
+                'callable': list(BBLogger.iter_logs(t1, t2, filters={
+                    'log_type': ['message', 'warning'], 'message': lambda message: message.endswith('7')})),
+            }
+
+        from_files = read_all()
+        with config_overrides(log_read_backend='sqlite'):
+            from_database = read_all()
+            with pytest.raises(ValueError):
+                BBLogger.iter_logs(t1, t2, filters={'no_such_column': 1})
+
+        assert from_files['pages'] == from_database['pages'] == 6
+        for name in ('page_1', 'page_4', 'page_6', 'range', 'day', 'between'):
+            pd.testing.assert_frame_equal(from_files[name], from_database[name])
+        assert len(from_database['errors']) == 7
+        assert from_files['errors'] == from_database['errors']
+        assert [entry['message'] for entry in from_database['callable']] == ['entry 7', 'entry 17', 'entry 27', 'entry 37']
+
+    # A table written before the counters existed is counted when the reader first opens it.
+    with sqlite3.connect(str(tmp_path / 'logs.sqlite3')) as conn:
+        conn.execute("DROP TABLE log_days;")
+        conn.execute("DROP TABLE log_marks;")
+    BBLogger.shutdown()
+    with config_overrides(log_enable_database=True, log_sqlite3_path=str(tmp_path / 'logs.sqlite3'),
+                          log_read_backend='sqlite', log_page_size=7):
+        assert BBLogger.get_total_amount_of_pages() == 6
+        assert list(BBLogger.get_page(6)['message']) == ['entry 35', 'entry 36 failed', 'entry 37', 'entry 38', 'entry 39']
+
+
+def test_search_ranks_matches_and_indexes_new_entries(tmp_path):
+    day = datetime.now().strftime('%Y%m%d')
+    t1, t2 = day + '000000', day + '235959'
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_enable_files=True,
+                          log_enable_database=True, log_sqlite3_path=str(tmp_path / 'logs.sqlite3'),
+                          log_enable_terminal_output=False):
+        BBLogger.log("disk full on /var")
+        BBLogger.log("cache warmed")
+        BBLogger.log("Disk full, disk quota exceeded on /home")
+        BBLogger.warning("disk almost full")
+        for i in range(20):
+            BBLogger.log(f"request {i} served")
+
+        for backend in ('files', 'sqlite'):
+            with config_overrides(log_read_backend=backend):
+                results = BBLogger.search("disk full", t1, t2)
+                assert sorted(results['message']) == [
+                    "Disk full, disk quota exceeded on /home", "disk almost full", "disk full on /var"
+                ]
+                assert results['score'].is_monotonic_decreasing and results['timestamp'].dtype.kind == 'M'
+                assert list(BBLogger.search("disk", t1, t2, log_type='warning')['message']) == ["disk almost full"]
+                assert len(BBLogger.search("req serv", t1, t2, page=2, page_size=8)) == 8
+                assert BBLogger.search("nothing matches", t1, t2).empty
+
+                # Entries logged after the first search are found by the next one.
+                BBLogger.log(f"{backend} index caught up")
+                assert list(BBLogger.search(f"{backend} caught", t1, t2)['message']) == [f"{backend} index caught up"]
+
+        with pytest.raises(ValueError):
+            BBLogger.search("disk", t2, t1)
+
+
+def test_stats_match_the_raw_logs(tmp_path):
+    day = datetime.now().strftime('%Y%m%d')
+    t1, t2 = day + '000000', day + '235959'
+    try:
+        with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_enable_files=True,
+                              log_enable_terminal_output=False, log_metrics=True):
+            for i in range(30):
+                BBLogger.log(f"request {i} served")
+                if i % 3 == 0:
+                    BBLogger.error(f"request {i} failed")
+            BBLogger.warning("slow disk")
+
+            raw = BBLogger.get_logs_between_timestampt_and_timestampt(t1, t2)
+            by_type = BBLogger.stats(t1, t2, group_by='log_type')
+            assert dict(zip(by_type['log_type'], by_type['count'])) == raw['log_type'].value_counts().to_dict()
+            assert list(by_type['log_type'][:2]) == ['message', 'error']
+
+            totals = BBLogger.stats(t1, t2, percentiles=(50, 99))
+            assert totals['count'][0] == len(raw) == 41
+            assert totals['processing_time_sum'][0] == pytest.approx(raw['processing_time'].sum())
+            assert totals['processing_time_max'][0] == pytest.approx(raw['processing_time'].max())
+            assert totals['processing_time_min'][0] <= totals['processing_time_p50'][0] <= \
+                totals['processing_time_p99'][0] <= totals['processing_time_max'][0]
+
+            errors = BBLogger.stats(t1, t2, group_by=['minute', 'process'], filters={'log_type': 'error'})
+            assert list(errors.columns[:3]) == ['minute', 'process', 'count']
+            assert errors['minute'].dtype.kind == 'M' and errors['count'].sum() == 10
+            assert (errors['process'] == BBLogger._get_process_name()).all()
+            locations = BBLogger.stats(t1, t2, group_by='code_location', filters={'log_type': ['warning']})
+            assert len(locations) == 1 and locations['count'][0] == 1
+
+            with pytest.raises(ValueError):
+                BBLogger.stats(t1, t2, group_by='message')
+            with pytest.raises(ValueError):
+                BBLogger.stats(t1, t2, group_by=['minute', 'hour'])
+    finally:
+        BBLogger.shutdown()
+    assert (tmp_path / 'bbtest_metrics.sqlite3').exists()
+
+
+def test_metrics_keep_counts_of_a_failed_flush(tmp_path):
+    db_path = str(tmp_path / 'metrics.sqlite3')
+    metrics = LogMetrics(db_path, flush_interval_ms=60000)
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for i in range(3):
+            metrics.record('20240101120000', 'message', 'proc', 'app.py:1', '0.5')
+        metrics._conn.execute("PRAGMA busy_timeout=0;")
+        blocker.execute("BEGIN EXCLUSIVE;")
+        with pytest.raises(sqlite3.OperationalError):
+            metrics.flush()
+        for i in range(3):
+            metrics.record('20240101120000', 'message', 'proc', 'app.py:1', '1.5')
+        blocker.execute("ROLLBACK;")
+        metrics.flush()
+        for name in ('minute', 'hour', 'day'):
+            count, time_sum = blocker.execute(f"SELECT count, time_sum FROM metrics_{name}").fetchone()
+            assert (count, time_sum) == (6, pytest.approx(6.0))
+    finally:
+        blocker.close()
+        metrics.close()
+
+
+@pytest.mark.parametrize('inotify', [True, False])
+def test_follow_yields_only_new_matching_entries(tmp_path, inotify):
+    with config_overrides(log_path=str(tmp_path), log_prefix='bbtest', log_enable_files=True,
+                          log_enable_terminal_output=False, log_follow_inotify=inotify,
+                          log_follow_min_interval_ms=10, log_follow_max_interval_ms=200):
+        BBLogger.log("written before following")
+        entries = BBLogger.follow(filters={'log_type': ['message', 'error']}, timeout=5)
+
+        def write():
+            time.sleep(0.2)
+            BBLogger.warning("filtered out")
+            BBLogger.log("first new entry", request_id='r1')
+            time.sleep(0.2)
+            BBLogger.error("second new entry")
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        received = []
+        for entry in entries:
+            received.append(entry['message'])
+            if len(received) == 2:
+                break
+        writer.join()
+        assert received == ["first new entry", "second new entry"]
+
+        assert [entry['message'] for entry in BBLogger.follow(from_start=True, timeout=0.1)] == [
+            "written before following", "filtered out", "first new entry", "second new entry"
+        ]
+
+        async def follow_async():
+            received = []
+            async for entry in AsyncBBLogger.follow(timeout=5):
+                received.append(entry['message'])
+                if len(received) == 2:
+                    return received
+
+        async def main():
+            follower = asyncio.ensure_future(follow_async())
+            await asyncio.sleep(0.2)
+            await AsyncBBLogger.log("async one")
+            await AsyncBBLogger.log("async two")
+            await AsyncBBLogger.flush()
+            return await follower
+
+        assert asyncio.run(main()) == ["async one", "async two"]
+
+
+def test_log_follower_reads_the_previous_day_before_rolling_over(tmp_path):
+    columns = ['timestamp', 'log_type', 'process', 'code_location', 'message', 'processing_time']
+    paths = {'2024_01_01': tmp_path / 'd1.log', '2024_01_02': tmp_path / 'd2.log'}
+    today = ['2024_01_01']
+
+    def append(day, message):
+        with open(paths[day], 'a', encoding='utf-8') as log_file:
+            log_file.write(f"{day.replace('_', '')}235959,message,p,x.py:1,{message},0\n")
+
+    append('2024_01_01', 'old')
+    follower = LogFollower(str(tmp_path), lambda day: [str(paths[day])] if paths[day].exists() else [], columns,
+                           use_inotify=False, current_date=lambda: today[0])
+    assert follower.read_new() == []
+    append('2024_01_01', 'just before midnight')
+    today[0] = '2024_01_02'
+    append('2024_01_02', 'just after midnight')
+    assert [entry['message'] for entry in follower.read_new()] == ['just before midnight', 'just after midnight']
+    assert follower.read_new() == []
+    append('2024_01_02', 'next')
+    assert [entry['message'] for entry in follower.read_new()] == ['next']
 
 
 if __name__ == "__main__":